@@ -0,0 +1,146 @@
+"""Накопительные итоги тренировок по спортсменам.
+
+Итоги хранятся по ключу (спортсмен, начало периода, вид тренировки)
+и обновляются за O(1) на каждую новую тренировку, без пересчёта
+истории. Итоги из параллельных обработчиков складываются через merge,
+а состояние целиком сохраняется в файл и восстанавливается после
+перезапуска.
+"""
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, Tuple, Union
+
+from homework import InfoMessage, Training
+
+PERIODS: Tuple[str, ...] = ('day', 'week')
+SNAPSHOT_VERSION: int = 1
+
+Key = Tuple[str, str, str]
+When = Union[date, datetime]
+
+
+@dataclass
+class Totals:
+    """Сумма показателей за период."""
+    count: int = 0
+    duration: float = 0.0
+    distance: float = 0.0
+    calories: float = 0.0
+    speed_sum: float = 0.0
+
+    def add(self, info: InfoMessage) -> None:
+        self.count += 1
+        self.duration += info.duration
+        self.distance += info.distance
+        self.calories += info.calories
+        self.speed_sum += info.speed
+
+    def merge(self, other: 'Totals') -> None:
+        self.count += other.count
+        self.duration += other.duration
+        self.distance += other.distance
+        self.calories += other.calories
+        self.speed_sum += other.speed_sum
+
+    def get_mean_speed(self) -> float:
+        """Средняя из средних скоростей тренировок за период, км/ч."""
+        return self.speed_sum / self.count if self.count else 0.0
+
+
+def period_start(when: When, period: str = 'day') -> date:
+    """Первый день периода: сам день или понедельник его недели."""
+    day = when.date() if isinstance(when, datetime) else when
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'day':
+        return day
+    raise ValueError(f'неизвестный период {period!r}, ожидался {PERIODS}')
+
+
+class Aggregator:
+    """Итоги по ключу (спортсмен, начало периода, вид тренировки)."""
+
+    def __init__(self, period: str = 'day') -> None:
+        period_start(date.today(), period)
+        self.period = period
+        self._totals: Dict[Key, Totals] = {}
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def key(self, athlete: str, when: When, training_type: str) -> Key:
+        return (athlete, period_start(when, self.period).isoformat(),
+                training_type)
+
+    def add(self, athlete: str, when: When, info: InfoMessage) -> None:
+        """Учесть одно сообщение о тренировке."""
+        key = self.key(athlete, when, info.training_type)
+        totals = self._totals.get(key)
+        if totals is None:
+            totals = self._totals[key] = Totals()
+        totals.add(info)
+
+    def add_training(self, athlete: str, when: When,
+                     training: Training) -> None:
+        """Учесть тренировку, посчитав её через show_training_info."""
+        self.add(athlete, when, training.show_training_info())
+
+    def merge(self, other: 'Aggregator') -> None:
+        """Прибавить итоги другого агрегатора с тем же периодом."""
+        if other.period != self.period:
+            raise ValueError(
+                f'нельзя сложить итоги за {self.period!r} '
+                f'и за {other.period!r}'
+            )
+        for key, totals in other._totals.items():
+            mine = self._totals.get(key)
+            if mine is None:
+                mine = self._totals[key] = Totals()
+            mine.merge(totals)
+
+    def get(self, athlete: str, when: When, training_type: str) -> Totals:
+        """Итоги за период, в который попадает when (пустые, если нет)."""
+        return self._totals.get(
+            self.key(athlete, when, training_type), Totals()
+        )
+
+    def items(self) -> Iterator[Tuple[Key, Totals]]:
+        return iter(sorted(self._totals.items()))
+
+    def save(self, path: str) -> None:
+        """Сохранить состояние в JSON-файл атомарно (через временный файл).
+        """
+        state = {
+            'version': SNAPSHOT_VERSION,
+            'period': self.period,
+            'totals': [
+                [list(key), asdict(totals)] for key, totals in self.items()
+            ],
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as stream:
+                json.dump(state, stream, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> 'Aggregator':
+        """Восстановить состояние, сохранённое save."""
+        with open(path, encoding='utf-8') as stream:
+            state = json.load(stream)
+        if state.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(
+                f'{path}: версия снимка {state.get("version")!r} '
+                f'не поддерживается'
+            )
+        aggregator = cls(state['period'])
+        for key, totals in state['totals']:
+            aggregator._totals[tuple(key)] = Totals(**totals)
+        return aggregator
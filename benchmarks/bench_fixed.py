@@ -0,0 +1,67 @@
+"""Текстовый отчёт по столбцам: форматирование float против тысячных.
+
+Сравниваются пути для пачки синтетических пакетов:
+  float  - compute_batch и render_columns: '%.3f' на каждое значение;
+  fixed  - fixedpoint.render_batch: те же столбцы переводятся в целые
+           тысячные, строки собираются из цифр векторно.
+Печатается время на запись и доля строк, которые fixed отдал
+форматированию float из-за неоднозначного округления.
+
+Запуск: python benchmarks/bench_fixed.py --packages 1000000
+"""
+import argparse
+
+from common import best_of, make_packages
+
+import numpy as np
+
+from fixedpoint import render_batch, to_fixed
+from homework import WORKOUT_TYPES, compute_batch
+from render import render_columns
+
+FIELDS = ('action', 'duration', 'weight', 'height', 'length_pool',
+          'count_pool')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    codes = []
+    columns = {name: [] for name in FIELDS}
+    for workout_type, data in make_packages(args.packages):
+        training = WORKOUT_TYPES[workout_type].training(*data)
+        codes.append(workout_type)
+        for name in FIELDS:
+            columns[name].append(getattr(training, name, 0))
+    codes = np.asarray(codes)
+    arrays = [np.asarray(columns[name]) for name in FIELDS]
+
+    def float_path() -> bytes:
+        distance, speed, calories = compute_batch(codes, *arrays)
+        names = np.asarray([WORKOUT_TYPES[code].training.__name__
+                            for code in ('RUN', 'WLK', 'SWM')])
+        index = np.searchsorted(['RUN', 'SWM', 'WLK'], codes)
+        names = names[np.asarray([0, 2, 1])[index]]
+        return render_columns(names, arrays[1], distance, speed, calories)
+
+    def fixed_path() -> bytes:
+        return render_batch(codes, *arrays)
+
+    assert float_path() == fixed_path()
+    timings = {'float': best_of(float_path, args.repeat),
+               'fixed': best_of(fixed_path, args.repeat)}
+    for name, seconds in timings.items():
+        print(f'{name:<6} {seconds / args.packages * 1e9:8.0f} нс/запись')
+    print(f'ускорение {timings["float"] / timings["fixed"]:.2f}x')
+
+    inexact = np.zeros(len(codes), dtype=bool)
+    for values in (arrays[1], *compute_batch(codes, *arrays)):
+        inexact |= ~to_fixed(values)[2]
+    print(f'через float: {inexact.mean():.4%} строк')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Память на одну запись для обычных и компактных классов тренировок.
+
+Запуск: python benchmarks/bench_memory.py --packages 100000
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, List
+
+from common import Package, make_packages
+
+import homework
+import records
+
+
+def per_record(build: Callable[[Package], object],
+               packages: List[Package]) -> float:
+    """Средний прирост памяти на один объект, в байтах."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(package) for package in packages]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Список-контейнер не относится к записи.
+    container = 8 * len(kept)
+    return (after - before - container) / len(kept)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=100_000)
+    args = parser.parse_args()
+
+    all_packages = list(make_packages(args.packages))
+    rows = [
+        (name, [p for p in all_packages if p[0] == code],
+         lambda module, p: module.read_package(*p))
+        for code, name in (('RUN', 'Running'), ('WLK', 'SportsWalking'),
+                           ('SWM', 'Swimming'))
+    ]
+    rows.append((
+        'InfoMessage', all_packages,
+        lambda module, p: module.read_package(*p).show_training_info(),
+    ))
+    print(f'{"класс":<15} {"homework":>10} {"records":>10}')
+    for name, packages, build in rows:
+        sizes = [
+            per_record(lambda p: build(module, p), packages)
+            for module in (homework, records)
+        ]
+        print(f'{name:<15}' + ''.join(f' {size:>8.0f} Б' for size in sizes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Цена расчёта показателей одной тренировки по видам спорта.
+
+Сравниваются пути:
+  separate  - get_distance(), get_mean_speed(), get_spent_calories()
+              по отдельности, как раньше делал show_training_info:
+              дистанция считается трижды, скорость - дважды;
+  single    - get_metrics(): дистанция, скорость и калории
+              считаются по одному разу.
+
+Запуск: python benchmarks/bench_metrics.py
+"""
+import argparse
+import timeit
+
+from common import make_packages
+
+from homework import read_package
+
+PATHS = {
+    'separate': ('for t in objs: (t.get_distance(), t.get_mean_speed(), '
+                 't.get_spent_calories())'),
+    'single': 'for t in objs: t.get_metrics()',
+}
+
+
+def per_record(workout_type: str, data: list, path: str, number: int,
+               repeat: int) -> float:
+    """Лучшее время пути path на одну запись, в наносекундах."""
+    setup = 'objs = [read_package(workout_type, data) for _ in range(n)]'
+    best = min(timeit.repeat(
+        PATHS[path], setup, number=1, repeat=repeat,
+        globals={'read_package': read_package, 'workout_type': workout_type,
+                 'data': data, 'n': number},
+    ))
+    return best / number * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    packages = {}
+    for workout_type, data in make_packages(1000):
+        packages.setdefault(workout_type, data)
+
+    print(f'{"вид":<5}' + ''.join(f' {path:>10}' for path in PATHS)
+          + f' {"экономия":>10}')
+    for workout_type, data in sorted(packages.items()):
+        ns = [per_record(workout_type, data, path, args.number, args.repeat)
+              for path in PATHS]
+        print(f'{workout_type:<5}' + ''.join(f' {v:>7.0f} нс' for v in ns)
+              + f' {1 - ns[1] / ns[0]:>10.0%}')
+
+
+if __name__ == '__main__':
+    main()
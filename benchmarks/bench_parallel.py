@@ -0,0 +1,47 @@
+"""Масштабирование параллельного режима по числу процессов.
+
+Запуск: python benchmarks/bench_parallel.py --packages 1000000
+"""
+import argparse
+import os
+import tempfile
+
+from common import best_of, write_jsonl
+
+from parallel import run_parallel
+
+
+class _NullSink:
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=200_000)
+    parser.add_argument('--shard-size', type=int, default=1 << 20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, 8, 16, 32, cores} & set(range(1, cores + 1)))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'packages.jsonl')
+        write_jsonl(path, args.packages)
+        baseline = None
+        print(f'{"процессов":>10} {"время, с":>10} {"пакетов/с":>12} '
+              f'{"ускорение":>10}')
+        for count in workers:
+            elapsed = best_of(
+                lambda: run_parallel(path, _NullSink(), workers=count,
+                                     shard_size=args.shard_size),
+                args.repeat,
+            )
+            baseline = baseline or elapsed
+            print(f'{count:>10} {elapsed:>10.3f} '
+                  f'{args.packages / elapsed:>12.0f} '
+                  f'{baseline / elapsed:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
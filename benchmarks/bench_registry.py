@@ -0,0 +1,60 @@
+"""Чтение пакетов: прежний read_package против реестра видов тренировок.
+
+  legacy    - прежняя функция: словарь собирается на каждый вызов;
+  registry  - read_package с модульным реестром WORKOUT_TYPES;
+  bulk      - read_packages на перемешанном потоке;
+  bulk-run  - read_packages на потоке, отсортированном по виду спорта.
+
+Запуск: python benchmarks/bench_registry.py --packages 200000
+"""
+import argparse
+from collections import deque
+from typing import List
+
+from common import best_of, make_packages
+
+from homework import (Running, SportsWalking, Swimming, Training,
+                      read_package, read_packages)
+
+
+def legacy_read_package(workout_type: str, data: List[int]) -> Training:
+    """read_package в том виде, в каком он был до реестра."""
+    train_dict = {
+        "SWM": Swimming,
+        "RUN": Running,
+        "WLK": SportsWalking,
+    }
+    if workout_type not in train_dict:
+        raise KeyError(workout_type)
+    else:
+        return train_dict[workout_type](*data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    packages = list(make_packages(args.packages))
+    grouped = sorted(packages, key=lambda package: package[0])
+    cases = {
+        'legacy': lambda: deque(
+            (legacy_read_package(*p) for p in packages), maxlen=0
+        ),
+        'registry': lambda: deque(
+            (read_package(*p) for p in packages), maxlen=0
+        ),
+        'bulk': lambda: deque(read_packages(packages), maxlen=0),
+        'bulk-run': lambda: deque(read_packages(grouped), maxlen=0),
+    }
+    baseline = None
+    print(f'{"путь":<10} {"нс/пакет":>10} {"ускорение":>10}')
+    for name, case in cases.items():
+        elapsed = best_of(case, args.repeat) / args.packages * 1e9
+        baseline = baseline or elapsed
+        print(f'{name:<10} {elapsed:>10.0f} {baseline / elapsed:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Время запуска короткоживущего вызова калькулятора.
+
+Сравниваются:
+  python     - пустой интерпретатор (python -c pass), нижняя граница;
+  import     - python -c "import homework";
+  cli        - python homework.py <файл>: запуск, импорт и расчёт;
+  client     - python client.py <файл> при запущенном постоянном
+               обработчике (server.py на Unix-сокете).
+
+Для каждого - минимум и медиана по --repeat запускам, в миллисекундах.
+
+Запуск: python benchmarks/bench_startup.py --packages 100 --repeat 30
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from common import BASE_DIR, write_jsonl
+
+
+def measure(command: List[str], repeat: int,
+            env: Dict[str, str]) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, env=env,
+                       cwd=BASE_DIR, check=True)
+        timings.append((time.perf_counter() - start) * 1e3)
+    return timings
+
+
+def wait_for(path: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'обработчик не создал сокет {path}')
+        time.sleep(0.01)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'packages.jsonl')
+        socket_path = os.path.join(tmp, 'homework.sock')
+        write_jsonl(source, args.packages)
+        env = dict(os.environ, HOMEWORK_SOCKET=socket_path)
+        server = subprocess.Popen(
+            [sys.executable, 'server.py', '--unix', socket_path],
+            cwd=BASE_DIR,
+        )
+        try:
+            wait_for(socket_path)
+            commands = {
+                'python': [sys.executable, '-c', 'pass'],
+                'import': [sys.executable, '-c', 'import homework'],
+                'cli': [sys.executable, 'homework.py', source],
+                'client': [sys.executable, 'client.py', source],
+            }
+            print(f'{"вызов":<8} {"мин":>9} {"медиана":>11}')
+            for name, command in commands.items():
+                timings = measure(command, args.repeat, env)
+                print(f'{name:<8} {min(timings):>6.1f} мс'
+                      f' {statistics.median(timings):>8.1f} мс')
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
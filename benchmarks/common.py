@@ -0,0 +1,60 @@
+"""Общие помощники для бенчмарков: синтетические пакеты и замер времени."""
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple, Union
+
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+# Доля видов спорта примерно как в реальном потоке от устройств.
+WORKOUT_MIX: Tuple[Tuple[str, float], ...] = (
+    ('RUN', 0.5),
+    ('WLK', 0.3),
+    ('SWM', 0.2),
+)
+
+Package = Tuple[str, List[Union[int, float]]]
+
+
+def make_package(rnd: random.Random) -> Package:
+    """Сгенерировать один правдоподобный пакет от датчиков."""
+    workout_type = rnd.choices(
+        [code for code, _ in WORKOUT_MIX],
+        [share for _, share in WORKOUT_MIX],
+    )[0]
+    duration = round(rnd.uniform(0.25, 3), 2)
+    weight = rnd.randint(45, 120)
+    if workout_type == 'SWM':
+        return workout_type, [rnd.randint(200, 3000), duration, weight,
+                              rnd.choice([25, 50]), rnd.randint(4, 80)]
+    action = rnd.randint(1000, 30000)
+    if workout_type == 'WLK':
+        return workout_type, [action, duration, weight, rnd.randint(150, 200)]
+    return workout_type, [action, duration, weight]
+
+
+def make_packages(count: int, seed: int = 0) -> Iterator[Package]:
+    """Сгенерировать count пакетов, воспроизводимо по seed."""
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield make_package(rnd)
+
+
+def write_jsonl(path: Union[str, Path], count: int, seed: int = 0) -> None:
+    """Записать count синтетических пакетов в файл JSONL."""
+    with open(path, 'w', encoding='utf-8') as stream:
+        for package in make_packages(count, seed):
+            stream.write(json.dumps(package) + '\n')
+
+
+def best_of(func: Callable[[], object], repeat: int = 3) -> float:
+    """Лучшее время выполнения func за repeat попыток, в секундах."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,101 @@
+"""Генератор нагрузки для server.py: задержка p50/p99 и пропускная способность.
+
+Каждое соединение шлёт пакеты без ожидания ответов, держа в полёте
+не больше --window запросов. Задержка запроса - время от записи
+строки в сокет до прихода соответствующей строки ответа.
+
+Без --port сервер поднимается в этом же процессе на свободном порту:
+    python benchmarks/loadgen.py --connections 8 --requests 20000
+С --port нагружается уже запущенный сервер:
+    python server.py --port 8765 --workers 4 &
+    python benchmarks/loadgen.py --port 8765
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+from common import make_packages
+
+from server import TrainingServer
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    """Процентиль по уже отсортированному списку (ближайший ранг)."""
+    index = min(len(sorted_values) - 1, int(share * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run_connection(host: str, port: int, requests: int, window: int,
+                         seed: int, latencies: List[float]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    lines = [
+        (json.dumps(package) + '\n').encode('utf-8')
+        for package in make_packages(requests, seed)
+    ]
+    sent: Deque[float] = deque()
+    in_flight = asyncio.Semaphore(window)
+
+    async def send() -> None:
+        for line in lines:
+            await in_flight.acquire()
+            sent.append(time.perf_counter())
+            writer.write(line)
+            await writer.drain()
+
+    sender = asyncio.ensure_future(send())
+    for _ in range(requests):
+        await reader.readline()
+        latencies.append(time.perf_counter() - sent.popleft())
+        in_flight.release()
+    await sender
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(host: str, port: Optional[int], connections: int,
+              requests: int, window: int) -> None:
+    listener = None
+    if port is None:
+        listener = await TrainingServer().start(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_connection(host, port, requests, window, seed, latencies)
+        for seed in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    if listener is not None:
+        listener.close()
+        await listener.wait_closed()
+
+    latencies.sort()
+    total = connections * requests
+    print(f'запросов:     {total}')
+    print(f'время:        {elapsed:.3f} с')
+    print(f'пропускная:   {total / elapsed:.0f} пакетов/с')
+    print(f'p50:          {percentile(latencies, 0.50) * 1e3:.3f} мс')
+    print(f'p99:          {percentile(latencies, 0.99) * 1e3:.3f} мс')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=10_000,
+                        help='запросов на одно соединение')
+    parser.add_argument('--window', type=int, default=64,
+                        help='запросов в полёте на одно соединение')
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.connections, args.requests,
+                    args.window))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""Набор бенчмарков горячих путей homework.py с базовыми замерами в JSON.
+
+Случаи:
+  read_package             - пакет -> объект Training;
+  calories:<класс>         - get_spent_calories у каждого подкласса;
+  show_training_info       - объект -> InfoMessage;
+  get_message              - InfoMessage -> строка;
+  main                     - объект -> строка в stdout (в os.devnull).
+
+Пакеты синтетические, со смесью видов спорта из common.WORKOUT_MIX,
+и генерируются блоками по --block штук, так что 10^7 пакетов
+не требуют памяти под весь набор. Время каждого блока - лучшее
+из --repeat попыток, подготовка блока в замер не входит.
+Выделение памяти - пик tracemalloc на первом блоке (до ALLOC_SAMPLE
+записей) пока результаты ещё живы, в байтах на запись.
+
+Запуск:
+    python benchmarks/suite.py --sizes 1e3 1e5 --save baseline.json
+    python benchmarks/suite.py --sizes 1e3 1e5 --compare baseline.json
+С --compare код возврата 1, если какой-то случай стал медленнее
+базового больше чем на --threshold (или стал выделять больше памяти).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from contextlib import redirect_stdout
+from itertools import islice
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from common import Package, make_packages
+
+from homework import (InfoMessage, Running, SportsWalking, Swimming, Training,
+                      main, read_package)
+
+BLOCK: int = 100_000
+ALLOC_SAMPLE: int = 10_000
+SIZES: Tuple[int, ...] = (1_000, 10_000, 100_000)
+THRESHOLD: float = 0.10
+
+# Случай - пара (подготовка блока, замеряемая работа над подготовленным).
+Case = Tuple[Callable[[List[Package]], Any], Callable[[Any], Any]]
+Results = Dict[str, Dict[str, Dict[str, float]]]
+
+
+def _trainings(chunk: List[Package]) -> List[Training]:
+    return [read_package(workout_type, data) for workout_type, data in chunk]
+
+
+def _only(cls: type) -> Callable[[List[Package]], List[Training]]:
+    def setup(chunk: List[Package]) -> List[Training]:
+        return [t for t in _trainings(chunk) if type(t) is cls]
+    return setup
+
+
+def _messages(chunk: List[Package]) -> List[InfoMessage]:
+    return [t.show_training_info() for t in _trainings(chunk)]
+
+
+def _main(trainings: List[Training]) -> None:
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        with redirect_stdout(devnull):
+            for training in trainings:
+                main(training)
+
+
+CASES: Dict[str, Case] = {
+    'read_package': (
+        lambda chunk: chunk,
+        lambda chunk: [read_package(t, d) for t, d in chunk],
+    ),
+    **{
+        f'calories:{cls.__name__}': (
+            _only(cls),
+            lambda objs: [t.get_spent_calories() for t in objs],
+        )
+        for cls in (Running, SportsWalking, Swimming)
+    },
+    'show_training_info': (
+        _trainings,
+        lambda objs: [t.show_training_info() for t in objs],
+    ),
+    'get_message': (
+        _messages,
+        lambda messages: [m.get_message() for m in messages],
+    ),
+    'main': (_trainings, _main),
+}
+
+
+def _size(value: str) -> int:
+    """Размер набора: допускает запись вида 1e6."""
+    return int(float(value))
+
+
+def _chunks(size: int, block: int, seed: int) -> Iterator[List[Package]]:
+    packages = make_packages(size, seed)
+    while True:
+        chunk = list(islice(packages, block))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _length(prepared: Any) -> int:
+    return len(prepared) if isinstance(prepared, list) else 0
+
+
+def measure(case: Case, size: int, block: int = BLOCK, repeat: int = 3,
+            seed: int = 0) -> Dict[str, float]:
+    """Замерить случай на size пакетах.
+
+    Возвращает нс на запись, записей в секунду и байт на запись.
+    Записью считается то, что вернула подготовка: у calories:* это
+    только тренировки нужного вида.
+    """
+    setup, work = case
+    elapsed = 0.0
+    records = 0
+    alloc = 0.0
+    for index, chunk in enumerate(_chunks(size, block, seed)):
+        if index == 0:
+            sample = setup(chunk[:ALLOC_SAMPLE])
+            tracemalloc.start()
+            work(sample)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            alloc = peak / max(_length(sample), 1)
+        best = float('inf')
+        for _ in range(repeat):
+            prepared = setup(chunk)
+            start = perf_counter()
+            work(prepared)
+            best = min(best, perf_counter() - start)
+        elapsed += best
+        records += _length(prepared)
+    records = max(records, 1)
+    return {
+        'records': records,
+        'ns_per_record': elapsed / records * 1e9,
+        'records_per_s': records / elapsed if elapsed else 0.0,
+        'alloc_bytes_per_record': alloc,
+    }
+
+
+def run_suite(sizes: List[int], names: List[str], block: int, repeat: int,
+              seed: int) -> Results:
+    results: Results = {}
+    for name in names:
+        for size in sizes:
+            stats = measure(CASES[name], size, block, repeat, seed)
+            results.setdefault(name, {})[str(size)] = stats
+            print(f'{name:<24} {size:>10} {stats["ns_per_record"]:>9.0f} нс'
+                  f' {stats["records_per_s"]:>12.0f} зап/с'
+                  f' {stats["alloc_bytes_per_record"]:>8.0f} Б/зап',
+                  flush=True)
+    return results
+
+
+def load(path: str) -> Results:
+    """Прочитать замеры, записанные --save."""
+    with open(path, encoding='utf-8') as stream:
+        return json.load(stream)['results']
+
+
+def compare(baseline: Results, current: Results,
+            threshold: float = THRESHOLD) -> List[str]:
+    """Сравнить замеры с базовыми и вернуть список регрессий.
+
+    Сравниваются только пары (случай, размер), которые есть в обоих.
+    """
+    regressions = []
+    for name, by_size in current.items():
+        for size, stats in by_size.items():
+            base = baseline.get(name, {}).get(size)
+            if base is None:
+                continue
+            for key in ('ns_per_record', 'alloc_bytes_per_record'):
+                ratio = stats[key] / base[key] if base[key] else 1.0
+                if ratio > 1 + threshold:
+                    regressions.append(
+                        f'{name} [{size}] {key}: {base[key]:.0f} -> '
+                        f'{stats[key]:.0f} ({ratio - 1:+.0%})'
+                    )
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--sizes', type=_size, nargs='+', default=SIZES,
+                        help='размеры наборов, например 1e3 1e5 1e7')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES),
+                        default=list(CASES))
+    parser.add_argument('--block', type=_size, default=BLOCK)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help='записать замеры в JSON')
+    parser.add_argument('--compare', help='сравнить с базовым JSON')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='допустимое ухудшение, доля (0.10 = 10%%)')
+    return parser
+
+
+def cli() -> int:
+    args = build_parser().parse_args()
+    results = run_suite(list(args.sizes), args.cases, args.block,
+                        args.repeat, args.seed)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as stream:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results,
+            }, stream, indent=2, ensure_ascii=False)
+    if args.compare:
+        regressions = compare(load(args.compare), results, args.threshold)
+        for line in regressions:
+            print(f'регрессия: {line}')
+        if regressions:
+            return 1
+        print('регрессий нет')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
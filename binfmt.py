@@ -0,0 +1,225 @@
+"""Двоичный формат файлов с пакетами от датчиков и с результатами.
+
+Файл - заголовок из 16 байт и за ним записи фиксированной длины
+(little-endian):
+
+    пакет, 56 байт:     workout_type u1, 7 байт выравнивания,
+                        action i8, duration f8, weight f8, height f8,
+                        length_pool f8, count_pool i8
+    результат, 40 байт: workout_type u1, 7 байт выравнивания,
+                        duration f8, distance f8, speed f8, calories f8
+
+workout_type - номер кода в WORKOUT_CODES. Поля, которые виду спорта
+не нужны, заполнены нулями. Заголовок: сигнатура (4 байта), версия (u2),
+длина записи (u2) и 8 зарезервированных байт. Записи только дописываются
+в конец, поэтому файлы можно склеивать и дополнять без перезаписи.
+
+Чтение отображает файл в память (np.memmap): столбцы записей - это
+представления над страницами файла без копирования, и их можно сразу
+передавать в compute_batch.
+"""
+import os
+import struct
+from typing import Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+from homework import InfoMessage, compute_batch
+
+WORKOUT_CODES: Tuple[str, ...] = ('RUN', 'WLK', 'SWM')
+TRAINING_NAMES: Tuple[str, ...] = ('Running', 'SportsWalking', 'Swimming')
+
+PACKAGE_DTYPE = np.dtype([
+    ('workout_type', 'u1'),
+    ('_pad', 'V7'),
+    ('action', '<i8'),
+    ('duration', '<f8'),
+    ('weight', '<f8'),
+    ('height', '<f8'),
+    ('length_pool', '<f8'),
+    ('count_pool', '<i8'),
+])
+RESULT_DTYPE = np.dtype([
+    ('workout_type', 'u1'),
+    ('_pad', 'V7'),
+    ('duration', '<f8'),
+    ('distance', '<f8'),
+    ('speed', '<f8'),
+    ('calories', '<f8'),
+])
+
+VERSION: int = 1
+HEADER = struct.Struct('<4sHH8x')
+PACKAGE_MAGIC: bytes = b'WKPK'
+RESULT_MAGIC: bytes = b'WKRS'
+
+Package = Tuple[str, List[Union[int, float]]]
+PathLike = Union[str, 'os.PathLike[str]']
+
+_CODE_INDEX = {code: index for index, code in enumerate(WORKOUT_CODES)}
+# Какие поля пакета заполняются из data, по видам спорта.
+_PACKAGE_FIELDS = {
+    'RUN': ('action', 'duration', 'weight'),
+    'WLK': ('action', 'duration', 'weight', 'height'),
+    'SWM': ('action', 'duration', 'weight', 'length_pool', 'count_pool'),
+}
+_ZEROS = dict.fromkeys(PACKAGE_DTYPE.names[2:], 0)
+_INTEGER_FIELDS = tuple(
+    name for name in PACKAGE_DTYPE.names[2:]
+    if PACKAGE_DTYPE[name].kind == 'i'
+)
+# Значения по умолчанию у Swimming.
+_DEFAULTS = {
+    'RUN': _ZEROS,
+    'WLK': _ZEROS,
+    'SWM': dict(_ZEROS, length_pool=1, count_pool=1),
+}
+
+
+def _header(magic: bytes, dtype: np.dtype) -> bytes:
+    return HEADER.pack(magic, VERSION, dtype.itemsize)
+
+
+def packages_to_array(packages: Iterable[Package]) -> np.ndarray:
+    """Перевести пакеты (workout_type, data) в массив записей.
+
+    Как и у read_package, неизвестный код даёт KeyError, а неверное
+    число параметров - TypeError. Дробное значение в целом поле
+    (action, count_pool) даёт ValueError: запись в i8 его бы обрезала.
+    """
+    rows = []
+    for workout_type, data in packages:
+        if workout_type not in _CODE_INDEX:
+            raise KeyError(
+                "вызывающая сторона передала workout_type, "
+                "которого в нашем словаре нет - " + workout_type
+                + ". Проверьте данные на ввод, пожалуйста"
+            )
+        names = _PACKAGE_FIELDS[workout_type]
+        if not 3 <= len(data) <= len(names):
+            raise TypeError(
+                f'{workout_type}: ожидалось от 3 до {len(names)} '
+                f'параметров, получено {len(data)}'
+            )
+        values = dict(_DEFAULTS[workout_type], **dict(zip(names, data)))
+        for name in _INTEGER_FIELDS:
+            value = values[name]
+            if not isinstance(value, (int, np.integer)) and not float(
+                    value).is_integer():
+                raise ValueError(
+                    f'{workout_type}: {name} = {value!r} - не целое число'
+                )
+        rows.append((_CODE_INDEX[workout_type], b'') + tuple(
+            values[name] for name in PACKAGE_DTYPE.names[2:]
+        ))
+    return np.array(rows, dtype=PACKAGE_DTYPE)
+
+
+def array_to_packages(records: np.ndarray) -> Iterator[Package]:
+    """Перевести массив записей обратно в пакеты (workout_type, data)."""
+    for record in records.tolist():
+        workout_type = WORKOUT_CODES[record[0]]
+        values = dict(zip(PACKAGE_DTYPE.names, record))
+        yield workout_type, [
+            values[name] for name in _PACKAGE_FIELDS[workout_type]
+        ]
+
+
+def compute_records(records: np.ndarray) -> np.ndarray:
+    """Посчитать массив пакетов в массив результатов."""
+    codes = records['workout_type']
+    distance, speed, calories = compute_batch(
+        np.asarray(WORKOUT_CODES)[codes],
+        records['action'],
+        records['duration'],
+        records['weight'],
+        records['height'],
+        records['length_pool'],
+        records['count_pool'],
+    )
+    results = np.zeros(len(records), dtype=RESULT_DTYPE)
+    results['workout_type'] = codes
+    results['duration'] = records['duration']
+    results['distance'] = distance
+    results['speed'] = speed
+    results['calories'] = calories
+    return results
+
+
+def messages_to_array(messages: Iterable[InfoMessage]) -> np.ndarray:
+    """Перевести сообщения InfoMessage в массив результатов."""
+    messages = list(messages)
+    results = np.zeros(len(messages), dtype=RESULT_DTYPE)
+    names = {name: index for index, name in enumerate(TRAINING_NAMES)}
+    results['workout_type'] = [
+        names[message.training_type] for message in messages
+    ]
+    for field in ('duration', 'distance', 'speed', 'calories'):
+        results[field] = [getattr(message, field) for message in messages]
+    return results
+
+
+def array_to_messages(results: np.ndarray) -> Iterator[InfoMessage]:
+    """Перевести массив результатов в сообщения InfoMessage."""
+    for code, _, duration, distance, speed, calories in results.tolist():
+        yield InfoMessage(
+            TRAINING_NAMES[code], duration, distance, speed, calories
+        )
+
+
+def _check(path: PathLike, head: bytes, size: int, magic: bytes,
+           dtype: np.dtype) -> None:
+    """Проверить заголовок и длину файла размером size байт."""
+    if len(head) < HEADER.size:
+        raise ValueError(f'{path}: файл короче заголовка')
+    file_magic, version, itemsize = HEADER.unpack(head)
+    if (file_magic, version, itemsize) != (magic, VERSION, dtype.itemsize):
+        raise ValueError(
+            f'{path}: ожидался формат {magic!r} v{VERSION}, '
+            f'а в заголовке {file_magic!r} v{version}'
+        )
+    if (size - HEADER.size) % dtype.itemsize:
+        raise ValueError(f'{path}: последняя запись обрезана')
+
+
+def _append(path: PathLike, magic: bytes, records: np.ndarray) -> None:
+    with open(path, 'a+b') as stream:
+        size = stream.seek(0, os.SEEK_END)
+        if size == 0:
+            stream.write(_header(magic, records.dtype))
+        else:
+            # Дописывать можно только в файл того же формата.
+            stream.seek(0)
+            _check(path, stream.read(HEADER.size), size, magic,
+                   records.dtype)
+        stream.write(records.tobytes())
+
+
+def _open(path: PathLike, magic: bytes, dtype: np.dtype) -> np.ndarray:
+    with open(path, 'rb') as stream:
+        head = stream.read(HEADER.size)
+    size = os.path.getsize(path)
+    _check(path, head, size, magic, dtype)
+    if size == HEADER.size:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size)
+
+
+def write_packages(path: PathLike, packages: Iterable[Package]) -> None:
+    """Дописать пакеты в двоичный файл."""
+    _append(path, PACKAGE_MAGIC, packages_to_array(packages))
+
+
+def open_packages(path: PathLike) -> np.ndarray:
+    """Отобразить файл с пакетами в память как массив записей."""
+    return _open(path, PACKAGE_MAGIC, PACKAGE_DTYPE)
+
+
+def write_results(path: PathLike, results: np.ndarray) -> None:
+    """Дописать массив результатов в двоичный файл."""
+    _append(path, RESULT_MAGIC, results.astype(RESULT_DTYPE, copy=False))
+
+
+def open_results(path: PathLike) -> np.ndarray:
+    """Отобразить файл с результатами в память как массив записей."""
+    return _open(path, RESULT_MAGIC, RESULT_DTYPE)
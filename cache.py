@@ -0,0 +1,179 @@
+"""Кэш результатов расчёта по пакету от датчиков.
+
+Повторная обработка часто видит одинаковые пакеты (повторные отправки
+с устройств, переимпорт архивов). ResultCache стоит перед
+read_package + show_training_info: ключ - нормализованный пакет
+(workout_type, tuple(data)) вместе с типами значений, так что
+1 и 1.0 не смешиваются (в CSV и JSONL они выводятся по-разному),
+и с версией вида из реестра (WorkoutType.version): после повторной
+регистрации или правки описания вида старые результаты, в том числе
+в файле, не находятся.
+
+В памяти хранится не больше maxsize записей, вытесняется самая давно
+использованная (LRU); с ttl запись старше ttl секунд считается
+отсутствующей. С path результаты дополнительно пишутся в файл SQLite,
+и следующий запуск (или другой процесс) берёт их оттуда вместо
+пересчёта. Ошибки расчёта не кэшируются.
+
+Возвращаемый InfoMessage общий для всех попаданий: менять его нельзя.
+"""
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple, Union
+
+from homework import WORKOUT_TYPES, InfoMessage, read_package
+
+MAXSIZE: int = 1 << 16
+FLUSH_EVERY: int = 1024
+
+Key = Tuple[str, Tuple[Union[int, float], ...], Tuple[type, ...],
+            Optional[str]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    package TEXT PRIMARY KEY,
+    training_type TEXT NOT NULL,
+    duration NOT NULL,
+    distance REAL NOT NULL,
+    speed REAL NOT NULL,
+    calories REAL NOT NULL,
+    created REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class CacheStats:
+    """Счётчики кэша."""
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def get_message(self) -> str:
+        lookups = self.hits + self.disk_hits + self.misses
+        ratio = (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        return (f'кэш: попаданий {self.hits}, с диска {self.disk_hits}, '
+                f'промахов {self.misses} ({ratio:.1%} попаданий), '
+                f'вытеснено {self.evictions}, устарело {self.expirations}')
+
+
+def normalize(workout_type: str, data: List[Union[int, float]]) -> Key:
+    """Ключ кэша для пакета."""
+    data = tuple(data)
+    workout = WORKOUT_TYPES.get(workout_type)
+    return (workout_type, data, tuple(map(type, data)),
+            None if workout is None else workout.version)
+
+
+def _package(key: Key) -> str:
+    """Ключ строки в файле: пакет и версия вида."""
+    workout_type, data, _, version = key
+    return repr((workout_type, data, version))
+
+
+class ResultCache:
+    """LRU-кэш InfoMessage по пакету, с TTL и хранилищем на диске."""
+
+    def __init__(self, maxsize: int = MAXSIZE, ttl: Optional[float] = None,
+                 path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time) -> None:
+        if maxsize < 1:
+            raise ValueError('maxsize должен быть положительным')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        # Ключ -> (время расчёта, сообщение); порядок - от давних к свежим.
+        self._entries: 'OrderedDict[Key, Tuple[float, InfoMessage]]' = (
+            OrderedDict()
+        )
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending: List[tuple] = []
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute(_SCHEMA)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> 'ResultCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and self.clock() - created > self.ttl
+
+    def _remember(self, key: Key, created: float, info: InfoMessage) -> None:
+        entries = self._entries
+        entries[key] = created, info
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _load(self, key: Key) -> Optional[Tuple[float, InfoMessage]]:
+        row = self._db.execute(
+            'SELECT training_type, duration, distance, speed, calories, '
+            'created FROM results WHERE package = ?', (_package(key),)
+        ).fetchone()
+        if row is None:
+            return None
+        *values, created = row
+        return created, InfoMessage(*values)
+
+    def get(self, workout_type: str,
+            data: List[Union[int, float]]) -> InfoMessage:
+        """Сообщение о тренировке из кэша или, при промахе, расчётом."""
+        key = normalize(workout_type, data)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not self._expired(entry[0]):
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry[1]
+            del self._entries[key]
+            self.stats.expirations += 1
+        if self._db is not None:
+            entry = self._load(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._remember(key, *entry)
+                self.stats.disk_hits += 1
+                return entry[1]
+        info = read_package(workout_type, data).show_training_info()
+        self.stats.misses += 1
+        created = self.clock()
+        self._remember(key, created, info)
+        if self._db is not None:
+            self._pending.append((
+                _package(key), info.training_type, info.duration,
+                info.distance, info.speed, info.calories, created,
+            ))
+            if len(self._pending) >= FLUSH_EVERY:
+                self.flush()
+        return info
+
+    def clear(self) -> None:
+        """Очистить кэш в памяти; файл на диске не трогается."""
+        self._entries.clear()
+
+    def flush(self) -> None:
+        """Записать накопленные результаты на диск."""
+        if self._db is None or not self._pending:
+            return
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)',
+                self._pending,
+            )
+        self._pending = []
+
+    def close(self) -> None:
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
@@ -0,0 +1,106 @@
+"""Тонкий клиент постоянного процесса-обработчика.
+
+Короткоживущие вызовы из cron и обёрток тратят больше времени
+на запуск интерпретатора и импорт, чем на сам расчёт. Постоянный
+обработчик - это server.py на Unix-сокете (или TCP-порту), который
+импортирует всё один раз:
+    python server.py --unix /tmp/homework.sock &
+    export HOMEWORK_SOCKET=/tmp/homework.sock
+    python client.py packages.jsonl
+
+Клиент импортирует только socket, threading и typing, пересылает
+файл (или стандартный ввод) обработчику и печатает ответы: отчёт -
+в stdout, строки с ошибками - в stderr, как и pipeline.cli. Если
+HOMEWORK_SOCKET не задан, обработчик недоступен или переданы ещё
+какие-то параметры, кроме пути к JSONL-файлу, клиент считает
+всё сам через pipeline.cli с теми же аргументами.
+Адрес вида host:port означает TCP, иначе - путь к Unix-сокету.
+"""
+import os
+import socket
+import sys
+import threading
+from typing import BinaryIO, Optional, Sequence
+
+ENV_SOCKET = 'HOMEWORK_SOCKET'
+BUFFER_SIZE = 64 << 10
+ERROR_PREFIXES = ('ошибка: '.encode('utf-8'), b'{"error"')
+
+
+def connect(address: str) -> socket.socket:
+    """Подключиться к обработчику по адресу host:port или пути сокета."""
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return socket.create_connection((host, int(port)))
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _send(sock: socket.socket, src: BinaryIO) -> None:
+    try:
+        while True:
+            chunk = src.read(BUFFER_SIZE)
+            if not chunk:
+                break
+            sock.sendall(chunk)
+        sock.shutdown(socket.SHUT_WR)
+    except OSError:
+        pass
+
+
+def forward(sock: socket.socket, src: BinaryIO, out: BinaryIO,
+            err: BinaryIO) -> int:
+    """Переслать src обработчику, ответы записать в out, ошибки - в err.
+
+    Отправка идёт в отдельном потоке, чтобы большой файл не упёрся
+    в непрочитанные ответы. Возвращает число строк с ошибками.
+    """
+    sender = threading.Thread(target=_send, args=(sock, src), daemon=True)
+    sender.start()
+    errors = 0
+    with sock.makefile('rb') as replies:
+        for line in replies:
+            if line.startswith(ERROR_PREFIXES):
+                errors += 1
+                err.write(line)
+            else:
+                out.write(line)
+    sender.join()
+    return errors
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки."""
+    argv = sys.argv[1:] if argv is None else argv
+    address = os.environ.get(ENV_SOCKET)
+    path = argv[0] if argv else '-'
+    if (address and len(argv) <= 1 and not path.endswith('.csv')
+            and (path == '-' or not path.startswith('-'))):
+        try:
+            sock = connect(address)
+        except OSError:
+            pass
+        else:
+            src = sys.stdin.buffer if path == '-' else open(path, 'rb')
+            try:
+                with sock:
+                    errors = forward(sock, src, sys.stdout.buffer,
+                                     sys.stderr.buffer)
+            finally:
+                if src is not sys.stdin.buffer:
+                    src.close()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            return 1 if errors else 0
+    from pipeline import cli
+
+    return cli(argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,507 @@
+"""Распределённый пересчёт: координатор и обработчики через общий каталог.
+
+Координатор режет входной файл на диапазоны (как parallel.split_ranges)
+и кладёт по файлу-заданию на каждый в рабочий каталог; обработчики
+(узлы) - отдельные процессы, на этой или на других машинах с тем же
+каталогом, например по NFS, - забирают задания, считают и кладут
+результат рядом. Координатор склеивает результаты строго в порядке
+диапазонов, так что отчёт не зависит от числа узлов и порядка
+их работы, и складывает итоги по видам тренировок (aggregate.Totals).
+
+Рабочий каталог (R - идентификатор прогона):
+    todo/R-000007.json            задание ждёт обработчика;
+    running/R-000007.node1.json   задание взял обработчик node1;
+    done/R-000007.result          результат: строка JSON с метаданными
+                                  и за ней готовый фрагмент отчёта;
+    failed/R-000007.node1.json    обработчик не смог посчитать задание;
+    stop                          обработчикам пора завершаться.
+
+Координатор при запуске очищает каталог от прошлых прогонов и берёт
+только файлы со своим идентификатором, поэтому результат, который
+запоздавший узел прошлого прогона допишет позже, в отчёт не попадёт.
+
+Задание забирается атомарным os.rename из todo в running, поэтому
+его получает ровно один обработчик; результат пишется во временный
+файл и переименовывается. Пока задание считается, узел раз в heartbeat
+секунд обновляет время изменения файла в running (аренду). Упавшее
+задание (файл в failed, погибший процесс узла или задание, аренду
+которого не обновляли дольше lease секунд) возвращается в todo,
+но не больше max_attempts раз. Локальный узел, который падает
+снова и снова, перезапускается не больше max_restarts раз, после
+чего прогон прерывается с его кодом выхода (WorkerError).
+
+Запуск на одной машине с тремя локальными узлами:
+    python cluster.py run packages.jsonl --nodes 3 --totals totals.json
+Узлы можно запускать и отдельно (--nodes 0 и --dir у координатора):
+    python cluster.py run packages.jsonl --nodes 0 --dir /shared/work
+    python cluster.py worker --dir /shared/work --id node1
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from typing import (BinaryIO, Callable, Dict, List, Optional, Sequence,
+                    Tuple)
+
+from aggregate import Totals
+from parallel import compute_range, split_ranges
+from pipeline import (FORMATS, SHARD_SIZE, ErrorHandler, MalformedRecord,
+                      detect_format, report_error)
+from render import OUTPUT_FORMATS, header, iter_batches, render
+from sinks import open_sink
+
+TODO, RUNNING, DONE, FAILED = 'todo', 'running', 'done', 'failed'
+STOP = 'stop'
+LEASE: float = 300.0
+HEARTBEAT: float = 10.0
+MAX_ATTEMPTS: int = 3
+MAX_RESTARTS: int = 3
+POLL: float = 0.02
+
+TotalsByType = Dict[str, Totals]
+
+
+class WorkerError(RuntimeError):
+    """Локальный узел падает снова и снова; returncode - его код выхода."""
+
+    def __init__(self, worker_id: str, returncode: int,
+                 restarts: int) -> None:
+        super().__init__(f'узел {worker_id} завершился с кодом '
+                         f'{returncode} после {restarts} перезапусков')
+        self.worker_id = worker_id
+        self.returncode = returncode
+
+
+@dataclass
+class Task:
+    """Задание: диапазон [start, end) входного файла."""
+    shard: int
+    path: str
+    start: int
+    end: int
+    fmt: str = 'jsonl'
+    output_format: str = 'text'
+    attempt: int = 1
+    run: str = ''
+
+    def get_name(self) -> str:
+        return _task_name(self.run, self.shard)
+
+
+def _task_name(run: str, shard: int) -> str:
+    return f'{run}-{shard:06d}'
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as stream:
+            stream.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _read_task(path: str) -> Task:
+    with open(path, encoding='utf-8') as stream:
+        raw = json.load(stream)
+    raw.pop('error', None)
+    return Task(**raw)
+
+
+def _write_task(path: str, task: Task, **extra: str) -> None:
+    data = dict(asdict(task), **extra)
+    _write_atomic(path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+
+def compute_shard(task: Task) -> bytes:
+    """Посчитать задание и вернуть содержимое файла результата."""
+    line_count, messages, errors = compute_range(
+        task.path, task.start, task.end, task.fmt
+    )
+    totals: TotalsByType = {}
+    for info in messages:
+        item = totals.get(info.training_type)
+        if item is None:
+            item = totals[info.training_type] = Totals()
+        item.add(info)
+    meta = {
+        'shard': task.shard,
+        'line_count': line_count,
+        'written': len(messages),
+        'errors': [[error.line_no, error.line, error.reason, error.code]
+                   for error in errors],
+        'totals': {name: asdict(item) for name, item in totals.items()},
+    }
+    report = b''.join(render(batch, task.output_format)
+                      for batch in iter_batches(messages))
+    return json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n' + (
+        report
+    )
+
+
+def prepare(workdir: str) -> None:
+    """Создать подкаталоги рабочего каталога."""
+    for name in (TODO, RUNNING, DONE, FAILED):
+        os.makedirs(os.path.join(workdir, name), exist_ok=True)
+
+
+class Worker:
+    """Узел: забирает задания из каталога и кладёт результаты."""
+
+    def __init__(self, workdir: str, worker_id: Optional[str] = None,
+                 process: Callable[[Task], bytes] = compute_shard,
+                 poll: float = POLL, heartbeat: float = HEARTBEAT) -> None:
+        if heartbeat <= 0:
+            raise ValueError('heartbeat должен быть положительным')
+        self.workdir = workdir
+        # Точка отделяет идентификатор узла в именах файлов, а в имени
+        # хоста (node1.example.com) точки обычны.
+        self.worker_id = worker_id or (
+            f"{socket.gethostname().replace('.', '_')}-{os.getpid()}"
+        )
+        if '.' in self.worker_id:
+            raise ValueError('в идентификаторе узла не должно быть точек')
+        self.process = process
+        self.poll = poll
+        self.heartbeat = heartbeat
+        prepare(workdir)
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.workdir, *parts)
+
+    def claim(self) -> Optional[Tuple[str, Task]]:
+        """Забрать первое свободное задание: (путь в running, задание)."""
+        for name in sorted(os.listdir(self._path(TODO))):
+            if not name.endswith('.json'):
+                continue
+            shard = name[:-len('.json')]
+            todo = self._path(TODO, name)
+            running = self._path(RUNNING, f'{shard}.{self.worker_id}.json')
+            try:
+                # rename сохраняет время изменения: задание, долго
+                # лежавшее в todo, нужно освежить до переименования,
+                # иначе координатор успеет счесть аренду просроченной.
+                os.utime(todo)
+                os.rename(todo, running)
+            except FileNotFoundError:
+                continue
+            return running, _read_task(running)
+        return None
+
+    def run_once(self) -> bool:
+        """Обработать одно задание; False, если заданий нет."""
+        claimed = self.claim()
+        if claimed is None:
+            return False
+        running, task = claimed
+        done = threading.Event()
+        beat = threading.Thread(target=self._keep_lease,
+                                args=(running, done), daemon=True)
+        beat.start()
+        try:
+            result = self.process(task)
+        except Exception as error:
+            _write_task(
+                self._path(FAILED, f'{task.get_name()}.{self.worker_id}.json'),
+                task, error=f'{type(error).__name__}: {error}',
+            )
+        else:
+            _write_atomic(self._path(DONE, f'{task.get_name()}.result'),
+                          result)
+        finally:
+            done.set()
+            beat.join()
+        try:
+            os.remove(running)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _keep_lease(self, running: str, done: threading.Event) -> None:
+        """Обновлять аренду задания, пока оно считается."""
+        while not done.wait(self.heartbeat):
+            try:
+                os.utime(running)
+            except FileNotFoundError:
+                # Координатор уже вернул задание в очередь.
+                return
+
+    def run(self) -> None:
+        """Работать, пока в каталоге не появится файл stop."""
+        while not os.path.exists(self._path(STOP)):
+            if not self.run_once():
+                time.sleep(self.poll)
+
+
+class Coordinator:
+    """Раздаёт задания и собирает результаты по порядку."""
+
+    def __init__(self, workdir: str, lease: float = LEASE,
+                 max_attempts: int = MAX_ATTEMPTS,
+                 poll: float = POLL) -> None:
+        self.workdir = workdir
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.poll = poll
+        self.retries = 0
+        self.run = uuid.uuid4().hex[:12]
+        prepare(workdir)
+        self._clear()
+
+    def _clear(self) -> None:
+        """Убрать задания и результаты прошлых прогонов и файл stop."""
+        for name in (TODO, RUNNING, DONE, FAILED):
+            for entry in os.listdir(self._path(name)):
+                if entry.endswith('.tmp'):
+                    # Недописанный файл живого узла: его os.replace
+                    # не должен упасть, а имя без идентификатора
+                    # прогона всё равно не будет прочитано.
+                    continue
+                try:
+                    os.remove(self._path(name, entry))
+                except FileNotFoundError:
+                    pass
+        if os.path.exists(self._path(STOP)):
+            os.remove(self._path(STOP))
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.workdir, *parts)
+
+    def submit(self, path: str, fmt: str = 'jsonl',
+               shard_size: int = SHARD_SIZE,
+               output_format: str = 'text') -> int:
+        """Положить задания на весь файл; вернуть их число."""
+        path = os.path.abspath(path)
+        ranges = split_ranges(path, shard_size)
+        for shard, (start, end) in enumerate(ranges):
+            task = Task(shard, path, start, end, fmt, output_format,
+                        run=self.run)
+            _write_task(self._path(TODO, f'{task.get_name()}.json'), task)
+        return len(ranges)
+
+    def _requeue(self, source: str, task: Task, reason: str) -> None:
+        if os.path.exists(self._path(DONE, f'{task.get_name()}.result')):
+            os.remove(source)
+            return
+        if task.attempt >= self.max_attempts:
+            raise RuntimeError(
+                f'диапазон {task.shard} не посчитан за {task.attempt} '
+                f'попыток: {reason}'
+            )
+        task.attempt += 1
+        self.retries += 1
+        _write_task(self._path(TODO, f'{task.get_name()}.json'), task)
+        os.remove(source)
+
+    def check(self, dead_workers: Sequence[str] = ()) -> None:
+        """Вернуть в очередь упавшие, брошенные и просроченные задания."""
+        mine = f'{self.run}-'
+        for name in os.listdir(self._path(FAILED)):
+            if not name.startswith(mine) or not name.endswith('.json'):
+                # Чужой прогон или отчёт об ошибке ещё дописывается
+                # во временный файл.
+                continue
+            path = self._path(FAILED, name)
+            with open(path, encoding='utf-8') as stream:
+                reason = json.load(stream).get('error', '')
+            self._requeue(path, _read_task(path), reason)
+        now = time.time()
+        for name in os.listdir(self._path(RUNNING)):
+            if not name.startswith(mine):
+                continue
+            path = self._path(RUNNING, name)
+            worker_id = name.split('.')[1]
+            try:
+                expired = now - os.path.getmtime(path) > self.lease
+                if worker_id in dead_workers or expired:
+                    task = _read_task(path)
+                else:
+                    continue
+            except FileNotFoundError:
+                continue
+            self._requeue(path, task, f'узел {worker_id} не ответил')
+
+    def wait_result(self, shard: int,
+                    watchdog: Callable[[], Sequence[str]] = tuple
+                    ) -> bytes:
+        """Дождаться результата диапазона, по пути возвращая упавшие
+        задания в очередь; watchdog сообщает погибшие узлы.
+        """
+        path = self._path(DONE, f'{_task_name(self.run, shard)}.result')
+        while not os.path.exists(path):
+            self.check(watchdog())
+            time.sleep(self.poll)
+        with open(path, 'rb') as stream:
+            data = stream.read()
+        os.remove(path)
+        return data
+
+    def collect(self, shards: int, out: BinaryIO,
+                on_error: ErrorHandler = report_error,
+                output_format: str = 'text',
+                watchdog: Callable[[], Sequence[str]] = tuple
+                ) -> Tuple[int, int, TotalsByType]:
+        """Склеить результаты всех диапазонов по порядку в out.
+
+        Возвращает (успешно, с ошибками, итоги по видам тренировок).
+        """
+        written = errors = line_offset = 0
+        totals: TotalsByType = {}
+        if header(output_format):
+            out.write(header(output_format))
+        for shard in range(shards):
+            data = self.wait_result(shard, watchdog)
+            meta_line, _, report = data.partition(b'\n')
+            meta = json.loads(meta_line)
+            out.write(report)
+            for line_no, line, reason, code in meta['errors']:
+                on_error(MalformedRecord(line_offset + line_no, line,
+                                         reason, code))
+            for name, raw in meta['totals'].items():
+                totals.setdefault(name, Totals()).merge(Totals(**raw))
+            written += meta['written']
+            errors += len(meta['errors'])
+            line_offset += meta['line_count']
+        return written, errors, totals
+
+    def stop(self) -> None:
+        """Попросить обработчиков завершиться."""
+        _write_atomic(self._path(STOP), b'')
+
+
+def _spawn(workdir: str, worker_id: str,
+           heartbeat: float = HEARTBEAT) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), 'worker',
+         '--dir', workdir, '--id', worker_id, '--heartbeat', str(heartbeat)],
+    )
+
+
+def run_cluster(path: str, out: BinaryIO, fmt: str = 'jsonl',
+                nodes: int = 2, workdir: Optional[str] = None,
+                shard_size: int = SHARD_SIZE,
+                on_error: ErrorHandler = report_error,
+                output_format: str = 'text', lease: float = LEASE,
+                max_attempts: int = MAX_ATTEMPTS,
+                max_restarts: int = MAX_RESTARTS
+                ) -> Tuple[int, int, TotalsByType]:
+    """Посчитать файл силами nodes локальных узлов-процессов.
+
+    Погибший узел перезапускается, а его задания возвращаются в очередь;
+    узел, погибший больше max_restarts раз, прерывает прогон
+    (WorkerError). Без workdir используется временный каталог; с nodes=0
+    узлы должны быть запущены отдельно на том же workdir, поэтому
+    workdir обязателен.
+    """
+    if nodes < 0:
+        raise ValueError('nodes не может быть отрицательным')
+    if not nodes and workdir is None:
+        raise ValueError('без локальных узлов нужен общий workdir: '
+                         'во временный каталог никто не придёт')
+    with ExitStack() as stack:
+        tmp = workdir or stack.enter_context(tempfile.TemporaryDirectory())
+        coordinator = Coordinator(tmp, lease, max_attempts)
+        shards = coordinator.submit(path, fmt, shard_size, output_format)
+        # Аренда обновляется с запасом: три раза за срок lease.
+        heartbeat = lease / 3
+        workers = {f'node{index}': _spawn(tmp, f'node{index}', heartbeat)
+                   for index in range(nodes)}
+        restarts = dict.fromkeys(workers, 0)
+
+        def watchdog() -> List[str]:
+            dead = []
+            for worker_id, process in workers.items():
+                if process.poll() is None:
+                    continue
+                if restarts[worker_id] >= max_restarts:
+                    raise WorkerError(worker_id, process.returncode,
+                                      restarts[worker_id])
+                dead.append(worker_id)
+                restarts[worker_id] += 1
+                workers[worker_id] = _spawn(tmp, worker_id, heartbeat)
+            return dead
+
+        try:
+            return coordinator.collect(shards, out, on_error, output_format,
+                                       watchdog)
+        finally:
+            coordinator.stop()
+            for process in workers.values():
+                process.wait()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Пересчёт файла с пакетами силами нескольких узлов.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='координатор')
+    run.add_argument('path')
+    run.add_argument('-f', '--format', choices=FORMATS)
+    run.add_argument('-o', '--output', default='-')
+    run.add_argument('-t', '--output-format', choices=OUTPUT_FORMATS,
+                     default='text')
+    run.add_argument('--nodes', type=int, default=2,
+                     help='локальных узлов, 0 - узлы запущены отдельно')
+    run.add_argument('--dir', help='общий рабочий каталог')
+    run.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    run.add_argument('--lease', type=float, default=LEASE,
+                     help='через сколько секунд забрать задание у узла')
+    run.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+    run.add_argument('--max-restarts', type=int, default=MAX_RESTARTS,
+                     help='сколько раз перезапускать упавший локальный узел')
+    run.add_argument('--totals', help='записать итоги по видам в JSON')
+    worker = commands.add_parser('worker', help='узел-обработчик')
+    worker.add_argument('--dir', required=True)
+    worker.add_argument('--id')
+    worker.add_argument('--heartbeat', type=float, default=HEARTBEAT,
+                        help='как часто в секундах обновлять аренду; '
+                             'должно быть заметно меньше --lease')
+    return parser
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'worker':
+        Worker(args.dir, args.id, heartbeat=args.heartbeat).run()
+        return 0
+    if args.nodes < 0:
+        parser.error('--nodes не может быть отрицательным')
+    if not args.nodes and args.dir is None:
+        parser.error('с --nodes 0 нужен --dir: узлы, запущенные отдельно, '
+                     'должны видеть тот же каталог')
+    try:
+        with open_sink(args.output) as out:
+            _, errors, totals = run_cluster(
+                args.path, out, args.format or detect_format(args.path),
+                args.nodes, args.dir, args.shard_size,
+                output_format=args.output_format, lease=args.lease,
+                max_attempts=args.max_attempts,
+                max_restarts=args.max_restarts,
+            )
+    except WorkerError as error:
+        print(error, file=sys.stderr)
+        # Погибший от сигнала процесс даёт отрицательный код.
+        return error.returncode if error.returncode > 0 else 1
+    if args.totals:
+        with open(args.totals, 'w', encoding='utf-8') as stream:
+            json.dump({name: asdict(item) for name, item in totals.items()},
+                      stream, ensure_ascii=False, indent=2)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
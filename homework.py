@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from typing import ClassVar, Dict, List, Tuple, Union, Callable
+from dataclasses import MISSING, dataclass, fields
+from typing import (Any, Callable, ClassVar, Dict, Iterable, Iterator, List,
+                    Optional, Sequence, Tuple, Type)
 
 
 @dataclass
@@ -23,16 +24,37 @@ class InfoMessage:
             self.duration, self.distance, self.speed, self.calories)
 
 
+def _owner(cls: type, name: str) -> type:
+    """Класс, в котором определён атрибут name."""
+    return next(klass for klass in cls.__mro__ if name in vars(klass))
+
+
 @dataclass
 class Training:
-    """Базовый класс тренировки."""
+    """Базовый класс тренировки.
+
+    Наследники задают формулы в _mean_speed и _spent_calories: они
+    получают уже посчитанные дистанцию и скорость, поэтому get_metrics
+    считает всё за один проход. Если наследник переопределил публичный
+    get_mean_speed или get_spent_calories, get_metrics вызывает его.
+    """
     action: int
     duration: float
     weight: float
     LEN_STEP: ClassVar[float] = 0.65
     M_IN_KM: ClassVar[int] = 1000
     HOUR_IN_MIN: ClassVar[int] = 60
+    _own_speed: ClassVar[bool] = True
+    _own_calories: ClassVar[bool] = True
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Формула из _mean_speed годится, только если get_mean_speed
+        # не переопределён ниже неё; так же для калорий.
+        cls._own_speed = issubclass(_owner(cls, '_mean_speed'),
+                                    _owner(cls, 'get_mean_speed'))
+        cls._own_calories = issubclass(_owner(cls, '_spent_calories'),
+                                       _owner(cls, 'get_spent_calories'))
 
     def get_distance(self) -> float:
         """Получить дистанцию в км."""
@@ -40,7 +62,9 @@ class Training:
 
     def get_mean_speed(self) -> float:
         """Получить среднюю скорость движения."""
-        full_distance = self.get_distance()
+        return self._mean_speed(self.get_distance())
+
+    def _mean_speed(self, full_distance: float) -> float:
         return full_distance / self.duration
 
     def get_spent_calories(self) -> float:
@@ -50,14 +74,31 @@ class Training:
             + ' должна быть прописана реализация'
         )
 
+    def _spent_calories(self, mean_speed: float) -> float:
+        return self.get_spent_calories()
+
+    def get_metrics(self) -> Tuple[float, float, float]:
+        """Получить дистанцию, скорость и калории за один проход."""
+        distance = self.get_distance()
+        if self._own_speed:
+            mean_speed = self._mean_speed(distance)
+        else:
+            mean_speed = self.get_mean_speed()
+        if self._own_calories:
+            calories = self._spent_calories(mean_speed)
+        else:
+            calories = self.get_spent_calories()
+        return distance, mean_speed, calories
+
     def show_training_info(self) -> InfoMessage:
         """Вернуть информационное сообщение о выполненной тренировке."""
+        distance, mean_speed, calories = self.get_metrics()
         return InfoMessage(
             type(self).__name__,
             self.duration,
-            self.get_distance(),
-            self.get_mean_speed(),
-            self.get_spent_calories(),
+            distance,
+            mean_speed,
+            calories,
         )
 
 
@@ -69,8 +110,10 @@ class Running(Training):
 
     def get_spent_calories(self) -> float:
         """Получить количество затраченных калорий при беге."""
+        return self._spent_calories(self.get_mean_speed())
+
+    def _spent_calories(self, mean_speed: float) -> float:
         time_in_min = self.duration * self.HOUR_IN_MIN
-        mean_speed = self.get_mean_speed()
         part_of_formula = self.COEFF_RUN * mean_speed - self.COEFF_RUN_2
         return part_of_formula * self.weight / self.M_IN_KM * time_in_min
 
@@ -84,9 +127,12 @@ class SportsWalking(Training):
 
     def get_spent_calories(self) -> float:
         """Получить количество затраченных калорий при хотьбе."""
+        return self._spent_calories(self.get_mean_speed())
+
+    def _spent_calories(self, mean_speed: float) -> float:
         time_in_minutes = self.duration * self.HOUR_IN_MIN
         part_of_formula = self.COEFF_WALK * self.weight
-        part_of_formula_2 = self.get_mean_speed()**2 // self.height
+        part_of_formula_2 = mean_speed**2 // self.height
         part_of_formula_3 = part_of_formula_2 * self.COEFF_WALK_2 * self.weight
         return (part_of_formula + part_of_formula_3) * time_in_minutes
 
@@ -102,30 +148,198 @@ class Swimming(Training):
 
     def get_spent_calories(self) -> float:
         """Получить количество затраченных калорий при плавании."""
-        part_of_formula = self.get_mean_speed() + self.COEFF_SWIMING
+        return self._spent_calories(self.get_mean_speed())
+
+    def _spent_calories(self, mean_speed: float) -> float:
+        part_of_formula = mean_speed + self.COEFF_SWIMING
         return part_of_formula * self.COEFF_SWIMING_2 * self.weight
 
-    def get_mean_speed(self) -> float:
-        """Получить среднюю скорость при плавании в бассейне."""
+    def _mean_speed(self, full_distance: float) -> float:
+        """Средняя скорость в бассейне считается по длине дорожек."""
         all_dist_pool = self.length_pool * self.count_pool
         return all_dist_pool / self.M_IN_KM / self.duration
 
 
+@dataclass(frozen=True)
+class WorkoutType:
+    """Вид тренировки в реестре: класс и допустимое число параметров.
+
+    version меняется вместе с формулами вида (например, хэш описания
+    из workouts): по нему кэш результатов отличает старые расчёты.
+    """
+    code: str
+    training: Type[Training]
+    min_arity: int
+    max_arity: int
+    version: str = ''
+
+
+WORKOUT_TYPES: Dict[str, WorkoutType] = {}
+
+
+def register(code: str, training: Type[Training],
+             version: Optional[str] = None) -> Type[Training]:
+    """Зарегистрировать класс тренировки под кодом пакета.
+
+    Число параметров конструктора считается здесь один раз,
+    а не при каждом чтении пакета. Без version версией служит
+    полное имя класса.
+    """
+    if version is None:
+        version = f'{training.__module__}.{training.__qualname__}'
+    params = [field for field in fields(training) if field.init]
+    required = [
+        field for field in params
+        if field.default is MISSING and field.default_factory is MISSING
+    ]
+    WORKOUT_TYPES[code] = WorkoutType(
+        code, training, len(required), len(params), version
+    )
+    return training
+
+
+register("SWM", Swimming)
+register("RUN", Running)
+register("WLK", SportsWalking)
+
+
+def _unknown_workout_type(workout_type: str) -> KeyError:
+    return KeyError(
+        "вызывающая сторона передала workout_type, "
+        "которого в нашем словаре нет - " + workout_type
+        + ". Проверьте данные на ввод, пожалуйста"
+    )
+
+
+def _wrong_arity(workout: WorkoutType, data: Sequence[Any]) -> TypeError:
+    return TypeError(
+        f"{workout.code}: {workout.training.__name__} ожидает от "
+        f"{workout.min_arity} до {workout.max_arity} параметров, "
+        f"получено {len(data)}"
+    )
+
+
 def read_package(workout_type: str, data: List[int]) -> Training:
     """Прочитать данные полученные от датчиков."""
-    train_dict: Dict[str, str] = {
-        "SWM": Swimming,
-        "RUN": Running,
-        "WLK": SportsWalking,
-    }
-    if workout_type not in train_dict:
-        raise KeyError(
-            "вызывающая сторона передала workout_type, "
-            "которого в нашем словаре нет - " + workout_type
-            + ". Проверьте данные на ввод, пожалуйста"
-        )
-    else:
-        return train_dict[workout_type](*data)
+    workout = WORKOUT_TYPES.get(workout_type)
+    if workout is None:
+        raise _unknown_workout_type(workout_type)
+    if not workout.min_arity <= len(data) <= workout.max_arity:
+        raise _wrong_arity(workout, data)
+    return workout.training(*data)
+
+
+def read_packages(packages: Iterable[Tuple[str, List[int]]]
+                  ) -> Iterator[Training]:
+    """Прочитать поток пакетов.
+
+    Для подряд идущих пакетов одного вида реестр не опрашивается
+    повторно, что выгодно на файлах, отсортированных по виду спорта.
+    """
+    last_type = None
+    for workout_type, data in packages:
+        if workout_type != last_type:
+            workout = WORKOUT_TYPES.get(workout_type)
+            if workout is None:
+                raise _unknown_workout_type(workout_type)
+            last_type = workout_type
+            training = workout.training
+            min_arity = workout.min_arity
+            max_arity = workout.max_arity
+        if not min_arity <= len(data) <= max_arity:
+            raise _wrong_arity(workout, data)
+        yield training(*data)
+
+
+# Векторные ядра видов тренировок, которых нет среди встроенных
+# в compute_batch: код -> функция от столбцов по именам полей,
+# возвращающая (дистанция, скорость, калории).
+BATCH_KERNELS: Dict[str, Callable[[Dict[str, Any]], Tuple[Any, Any, Any]]] = {}
+
+
+def compute_batch(workout_types: Sequence[str],
+                  actions: Sequence[int],
+                  durations: Sequence[float],
+                  weights: Sequence[float],
+                  heights: Sequence[float],
+                  length_pools: Sequence[float],
+                  count_pools: Sequence[int],
+                  **extra_columns: Sequence[float]) -> Tuple[Any, Any, Any]:
+    """Посчитать дистанцию, скорость и калории для пачки тренировок.
+
+    Все аргументы - столбцы одинаковой длины (списки или массивы NumPy),
+    по одному элементу на тренировку. Поля, которые виду спорта
+    не нужны (например, height у бега), игнорируются. Формулы и порядок
+    операций те же, что в методах классов, поэтому результат совпадает
+    с show_training_info() бит в бит. Нулевая длительность вместо
+    ZeroDivisionError даёт inf/nan в соответствующих строках.
+    Остальные виды считаются ядрами из BATCH_KERNELS; их собственные
+    поля (например, cadence из описания в workouts) передаются
+    именованными столбцами extra_columns той же длины.
+    """
+    import numpy as np
+
+    types = np.asarray(workout_types)
+    action = np.asarray(actions, dtype=np.float64)
+    duration = np.asarray(durations, dtype=np.float64)
+    weight = np.asarray(weights, dtype=np.float64)
+    height = np.asarray(heights, dtype=np.float64)
+    length_pool = np.asarray(length_pools, dtype=np.float64)
+    count_pool = np.asarray(count_pools, dtype=np.float64)
+
+    distance = np.empty(types.shape, dtype=np.float64)
+    speed = np.empty(types.shape, dtype=np.float64)
+    calories = np.empty(types.shape, dtype=np.float64)
+
+    run = types == 'RUN'
+    wlk = types == 'WLK'
+    swm = types == 'SWM'
+    unknown = ~(run | wlk | swm)
+    extra = []
+    if unknown.any():
+        for code in np.unique(types[unknown]).tolist():
+            if code not in BATCH_KERNELS:
+                raise _unknown_workout_type(str(code))
+            extra.append((BATCH_KERNELS[code], types == code))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for mask, cls in ((run, Running), (wlk, SportsWalking)):
+            dist = action[mask] * cls.LEN_STEP / cls.M_IN_KM
+            distance[mask] = dist
+            speed[mask] = dist / duration[mask]
+
+        time_in_min = duration[run] * Running.HOUR_IN_MIN
+        part_of_formula = Running.COEFF_RUN * speed[run] - Running.COEFF_RUN_2
+        calories[run] = (part_of_formula * weight[run] / Running.M_IN_KM
+                         * time_in_min)
+
+        time_in_min = duration[wlk] * SportsWalking.HOUR_IN_MIN
+        part_of_formula = SportsWalking.COEFF_WALK * weight[wlk]
+        part_of_formula_2 = np.floor_divide(speed[wlk] ** 2, height[wlk])
+        part_of_formula_3 = (part_of_formula_2 * SportsWalking.COEFF_WALK_2
+                             * weight[wlk])
+        calories[wlk] = (part_of_formula + part_of_formula_3) * time_in_min
+
+        distance[swm] = action[swm] * Swimming.LEN_STEP / Swimming.M_IN_KM
+        speed[swm] = (length_pool[swm] * count_pool[swm] / Swimming.M_IN_KM
+                      / duration[swm])
+        part_of_formula = speed[swm] + Swimming.COEFF_SWIMING
+        calories[swm] = (part_of_formula * Swimming.COEFF_SWIMING_2
+                         * weight[swm])
+
+        columns = {
+            'action': action, 'duration': duration, 'weight': weight,
+            'height': height, 'length_pool': length_pool,
+            'count_pool': count_pool,
+        }
+        for name, values in extra_columns.items():
+            columns[name] = np.asarray(values, dtype=np.float64)
+        for kernel, mask in extra:
+            distance[mask], speed[mask], calories[mask] = kernel(
+                {name: column[mask] for name, column in columns.items()}
+            )
+
+    return distance, speed, calories
 
 
 def main(training: Callable[[str], Training]) -> None:
@@ -135,11 +349,11 @@ def main(training: Callable[[str], Training]) -> None:
 
 
 if __name__ == "__main__":
-    packages: List[Tuple[Union[str, int]]] = [
-        ("SWM", [720, 1, 80, 25, 40]),
-        ("RUN", [15000, 1, 75]),
-        ("WLK", [9000, 1, 75, 180]),
-    ]
-    for workout_type, data in packages:
-        training = read_package(workout_type, data)
-        main(training)
+    import sys
+
+    # pipeline импортирует homework: пусть получит этот модуль,
+    # а не выполнит файл второй раз.
+    sys.modules.setdefault('homework', sys.modules[__name__])
+    from pipeline import cli
+
+    sys.exit(cli())
@@ -0,0 +1,202 @@
+"""Включаемая по требованию инструментовка горячих путей.
+
+enable() подменяет read_package, Training.show_training_info,
+InfoMessage.get_message и render.render_rows обёртками, которые
+считают вызовы и ошибки, строят гистограмму времени вызова
+(корзины по степеням двойки в наносекундах) и ведут счётчик
+пакетов по видам спорта. disable() возвращает исходные функции.
+Пока инструментовка выключена, в коде нет ни одной лишней проверки:
+вызываются те же самые функции, что и без этого модуля.
+
+read_package подменяется и во всех уже загруженных модулях,
+которые импортировали его по имени (например, pipeline).
+Обёртки наследуются процессами, созданными через fork, но их
+статистика в родительский процесс не возвращается.
+
+Из командной строки: python pipeline.py packages.jsonl --profile text
+или переменная окружения HOMEWORK_PROFILE=json; сводка печатается
+в stderr (или в --profile-output) при выходе.
+"""
+import atexit
+import json
+import sys
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import homework
+import render
+
+PROFILE_FORMATS: Tuple[str, ...] = ('text', 'json')
+BUCKETS: int = 48
+
+
+@dataclass
+class Stage:
+    """Статистика одного этапа."""
+    calls: int = 0
+    errors: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    # histogram[i] - число вызовов длительностью от 2**(i-1) до 2**i нс.
+    histogram: List[int] = field(default_factory=lambda: [0] * BUCKETS)
+
+    def record(self, elapsed: int) -> None:
+        self.calls += 1
+        self.total_ns += elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+        self.histogram[min(elapsed.bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, share: float) -> int:
+        """Оценка процентиля сверху: граница его корзины, но не больше max.
+        """
+        rank = share * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= rank:
+                return min(1 << bucket, self.max_ns)
+        return 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns / self.calls if self.calls else 0.0,
+            'p50_ns': self.percentile(0.50),
+            'p99_ns': self.percentile(0.99),
+            'max_ns': self.max_ns,
+            'histogram': {
+                str(1 << bucket): count
+                for bucket, count in enumerate(self.histogram) if count
+            },
+        }
+
+
+STAGES: Dict[str, Stage] = {}
+WORKOUT_COUNTS: Dict[str, int] = {}
+
+# Исходные функции, подменённые enable(): (владелец, имя, функция).
+_originals: List[Tuple[Any, str, Callable]] = []
+_atexit_registered = False
+
+
+def _timed(stage: Stage, func: Callable) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            stage.errors += 1
+            raise
+        finally:
+            stage.record(perf_counter_ns() - start)
+    return wrapper
+
+
+def _counting(func: Callable) -> Callable:
+    counts = WORKOUT_COUNTS
+
+    @wraps(func)
+    def wrapper(workout_type, data):
+        counts[workout_type] = counts.get(workout_type, 0) + 1
+        return func(workout_type, data)
+    return wrapper
+
+
+def _patch(owner: Any, name: str, wrapper: Callable) -> None:
+    _originals.append((owner, name, owner.__dict__[name]))
+    setattr(owner, name, wrapper)
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset() -> None:
+    """Обнулить собранную статистику."""
+    for name in STAGES:
+        STAGES[name] = Stage()
+    WORKOUT_COUNTS.clear()
+    if is_enabled():
+        disable()
+        enable()
+
+
+def enable() -> None:
+    """Подменить горячие функции обёртками со сбором статистики."""
+    if is_enabled():
+        return
+    targets = (
+        ('read_package', homework, 'read_package'),
+        ('show_training_info', homework.Training, 'show_training_info'),
+        ('get_message', homework.InfoMessage, 'get_message'),
+        ('render_rows', render, 'render_rows'),
+    )
+    for stage_name, owner, name in targets:
+        stage = STAGES.setdefault(stage_name, Stage())
+        wrapper = _timed(stage, owner.__dict__[name])
+        if name == 'read_package':
+            original = homework.read_package
+            wrapper = _counting(wrapper)
+            for module in list(sys.modules.values()):
+                if (module is not homework
+                        and getattr(module, 'read_package', None)
+                        is original):
+                    _patch(module, name, wrapper)
+        _patch(owner, name, wrapper)
+
+
+def disable() -> None:
+    """Вернуть исходные функции; собранная статистика сохраняется."""
+    while _originals:
+        owner, name, func = _originals.pop()
+        setattr(owner, name, func)
+
+
+def summary() -> Dict[str, Any]:
+    return {
+        'stages': {name: stage.as_dict() for name, stage in STAGES.items()},
+        'workout_types': dict(sorted(WORKOUT_COUNTS.items())),
+    }
+
+
+def report(fmt: str = 'text') -> str:
+    """Сводка в виде текста или JSON."""
+    if fmt == 'json':
+        return json.dumps(summary(), ensure_ascii=False, indent=2) + '\n'
+    lines = [f'{"этап":<20} {"вызовов":>10} {"ошибок":>8} {"среднее":>10}'
+             f' {"p50 <=":>10} {"p99 <=":>10} {"макс":>10}']
+    for name, stage in STAGES.items():
+        data = stage.as_dict()
+        lines.append(
+            f'{name:<20} {data["calls"]:>10} {data["errors"]:>8}'
+            f' {data["mean_ns"]:>7.0f} нс {data["p50_ns"]:>7} нс'
+            f' {data["p99_ns"]:>7} нс {data["max_ns"]:>7} нс'
+        )
+    for workout_type, count in sorted(WORKOUT_COUNTS.items()):
+        lines.append(f'пакетов {workout_type}: {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def _write_report(fmt: str, path: Optional[str]) -> None:
+    if path is None:
+        sys.stderr.write(report(fmt))
+    else:
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(report(fmt))
+
+
+def enable_at_exit(fmt: str = 'text', path: Optional[str] = None) -> None:
+    """Включить инструментовку и вывести сводку при выходе из процесса."""
+    global _atexit_registered
+    if fmt not in PROFILE_FORMATS:
+        raise ValueError(f'формат сводки {fmt!r} не поддерживается')
+    enable()
+    if not _atexit_registered:
+        atexit.register(_write_report, fmt, path)
+        _atexit_registered = True
@@ -0,0 +1,147 @@
+"""Параллельная обработка файла с пакетами на нескольких ядрах.
+
+Файл режется на диапазоны байт, выровненные по концу строки.
+Каждый процесс-обработчик сам читает свой диапазон, считает тренировки
+и возвращает готовый фрагмент отчёта одной строкой байт, а не объекты
+InfoMessage. Родительский процесс пишет фрагменты строго в порядке
+диапазонов, поэтому результат не зависит от числа процессов.
+"""
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import TYPE_CHECKING, BinaryIO, Deque, List, Optional, Tuple
+
+from homework import InfoMessage
+from pipeline import (SHARD_SIZE, ErrorHandler, MalformedRecord, compute,
+                      iter_lines, iter_packages, report_error)
+from render import header, iter_batches, render
+
+if TYPE_CHECKING:
+    from streamstats import StreamStats
+
+
+@dataclass
+class ShardResult:
+    """Результат обработки одного диапазона файла."""
+    line_count: int
+    report: bytes
+    written: int
+    errors: List[Tuple[int, str, str, str]]
+    stats: Optional['StreamStats'] = None
+
+
+def split_ranges(path: str,
+                 shard_size: int = SHARD_SIZE) -> List[Tuple[int, int]]:
+    """Разбить файл на диапазоны [start, end), кончающиеся на перевод строки.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, 'rb') as stream:
+        while start < size:
+            stream.seek(min(start + shard_size, size))
+            stream.readline()
+            end = min(stream.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def compute_range(path: str, start: int, end: int, fmt: str = 'jsonl'
+                  ) -> Tuple[int, List[InfoMessage], List[MalformedRecord]]:
+    """Посчитать пакеты диапазона файла.
+
+    Возвращает число строк диапазона, сообщения и ошибочные записи
+    (номера строк - от начала диапазона).
+    """
+    with open(path, 'rb') as stream:
+        stream.seek(start)
+        data = stream.read(end - start)
+    line_count = data.count(b'\n')
+    if data and not data.endswith(b'\n'):
+        line_count += 1
+    errors: List[MalformedRecord] = []
+    packages = iter_packages(iter_lines(BytesIO(data)), fmt, errors.append)
+    messages = [info for _, info in compute(packages, errors.append)]
+    return line_count, messages, errors
+
+
+def process_range(path: str, start: int, end: int, fmt: str = 'jsonl',
+                  output_format: str = 'text',
+                  stats: Optional['StreamStats'] = None) -> ShardResult:
+    """Посчитать все пакеты диапазона файла.
+
+    С stats (пустым) в результат попадает статистика диапазона.
+    """
+    line_count, messages, errors = compute_range(path, start, end, fmt)
+    if stats is not None:
+        for info in messages:
+            stats.add(info)
+    return ShardResult(
+        line_count,
+        b''.join(render(batch, output_format)
+                 for batch in iter_batches(messages)),
+        len(messages),
+        [(error.line_no, error.line, error.reason, error.code)
+         for error in errors],
+        stats,
+    )
+
+
+def _emit(result: ShardResult, out: BinaryIO, line_offset: int,
+          on_error: ErrorHandler) -> None:
+    out.write(result.report)
+    for line_no, line, reason, code in result.errors:
+        on_error(MalformedRecord(line_offset + line_no, line, reason, code))
+
+
+def run_parallel(path: str, out: BinaryIO, fmt: str = 'jsonl',
+                 workers: Optional[int] = None,
+                 shard_size: int = SHARD_SIZE,
+                 on_error: ErrorHandler = report_error,
+                 output_format: str = 'text',
+                 stats: Optional['StreamStats'] = None) -> Tuple[int, int]:
+    """Обработать файл несколькими процессами и вернуть
+    (успешно, с ошибками).
+
+    workers=None - по числу ядер. В обработке одновременно не больше
+    2 * workers диапазонов, так что память ограничена независимо
+    от размера файла. Статистику диапазонов обработчики считают сами,
+    а в stats она складывается в порядке диапазонов.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = split_ranges(path, shard_size)
+    written = errors = line_offset = 0
+
+    def emit(result: ShardResult) -> None:
+        nonlocal written, errors, line_offset
+        _emit(result, out, line_offset, on_error)
+        written += result.written
+        errors += len(result.errors)
+        line_offset += result.line_count
+        if stats is not None:
+            stats.merge(result.stats)
+
+    if header(output_format):
+        out.write(header(output_format))
+    if workers == 1:
+        for start, end in ranges:
+            emit(process_range(path, start, end, fmt, output_format,
+                               None if stats is None else stats.new()))
+        return written, errors
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for start, end in ranges:
+            pending.append(
+                executor.submit(process_range, path, start, end, fmt,
+                                output_format,
+                                None if stats is None else stats.new())
+            )
+            if len(pending) >= 2 * workers:
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+    return written, errors
@@ -0,0 +1,378 @@
+"""Потоковая обработка файлов с пакетами от блока датчиков.
+
+Конвейер собран из генераторов: чтение блоками -> разбор строк ->
+read_package -> show_training_info -> форматирование -> запись.
+В памяти одновременно находится только один блок файла, поэтому
+размер входных данных не ограничен.
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from typing import (TYPE_CHECKING, BinaryIO, Callable, Iterable, Iterator,
+                    List, Optional, Sequence, TextIO, Tuple, Union)
+
+from homework import InfoMessage, read_package
+from render import OUTPUT_FORMATS, header, write_messages
+from validate import Reject, validate
+
+if TYPE_CHECKING:
+    from cache import ResultCache
+    from sinks import Sink
+    from streamstats import StreamStats
+
+CHUNK_SIZE: int = 1 << 20
+SHARD_SIZE: int = 8 << 20
+FORMATS: Tuple[str, ...] = ('jsonl', 'csv')
+# Коды причин отказа в дополнение к validate.REASON_CODES.
+PARSE_ERROR: str = 'parse_error'
+COMPUTE_ERROR: str = 'compute_error'
+
+Package = Tuple[int, str, List[Union[int, float]]]
+
+
+@dataclass
+class MalformedRecord:
+    """Строка входного файла, которую не удалось обработать."""
+    line_no: int
+    line: str
+    reason: str
+    code: str = ''
+
+    def get_message(self) -> str:
+        if self.code:
+            return f'строка {self.line_no} [{self.code}]: {self.reason}'
+        return f'строка {self.line_no}: {self.reason}'
+
+
+ErrorHandler = Callable[[MalformedRecord], None]
+
+
+def iter_lines(stream: BinaryIO,
+               chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """Читать поток блоками и отдавать пары (номер строки, строка)."""
+    line_no = 0
+    tail = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (tail + chunk).split(b'\n')
+        tail = lines.pop()
+        for line in lines:
+            line_no += 1
+            yield line_no, line
+    if tail:
+        yield line_no + 1, tail
+
+
+def _number(value: str) -> Union[int, float]:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def parse_jsonl(line: str) -> Tuple[str, List[Union[int, float]]]:
+    """Разобрать строку вида ["SWM", [720, 1, 80, 25, 40]]."""
+    record = json.loads(line)
+    if isinstance(record, dict):
+        return record['workout_type'], record['data']
+    workout_type, data = record
+    return workout_type, data
+
+
+def parse_csv(line: str) -> Tuple[str, List[Union[int, float]]]:
+    """Разобрать строку вида SWM,720,1,80,25,40."""
+    workout_type, *data = line.split(',')
+    return workout_type.strip(), [_number(value) for value in data]
+
+
+PARSERS = {
+    'jsonl': parse_jsonl,
+    'csv': parse_csv,
+}
+
+
+def report_error(record: MalformedRecord) -> None:
+    print(record.get_message(), file=sys.stderr)
+
+
+def reject_writer(stream: TextIO) -> ErrorHandler:
+    """Обработчик, пишущий отказы в stream построчно в JSONL."""
+    def write(record: MalformedRecord) -> None:
+        stream.write(json.dumps(asdict(record), ensure_ascii=False) + '\n')
+    return write
+
+
+def iter_packages(lines: Iterable[Tuple[int, bytes]],
+                  fmt: str = 'jsonl',
+                  on_error: ErrorHandler = report_error) -> Iterator[Package]:
+    """Разобрать строки в пакеты (номер строки, тип тренировки, данные)."""
+    parse = PARSERS[fmt]
+    for line_no, raw in lines:
+        line = raw.decode('utf-8', errors='replace').strip()
+        if not line:
+            continue
+        try:
+            workout_type, data = parse(line)
+        except (ValueError, KeyError, TypeError) as error:
+            on_error(MalformedRecord(line_no, line, f'не разобрана: {error}',
+                                     PARSE_ERROR))
+            continue
+        yield line_no, workout_type, data
+
+
+def try_compute(workout_type: str, data: List[Union[int, float]],
+                cache: Optional['ResultCache'] = None
+                ) -> Tuple[Optional[InfoMessage], str]:
+    """Посчитать один пакет: (сообщение, '') или (None, причина ошибки)."""
+    try:
+        if cache is not None:
+            return cache.get(workout_type, data), ''
+        return read_package(workout_type, data).show_training_info(), ''
+    except KeyError:
+        return None, f'неизвестный тип тренировки {workout_type!r}'
+    except (TypeError, ValueError) as error:
+        return None, f'некорректные данные {data!r}: {error}'
+    except ZeroDivisionError:
+        return None, f'деление на ноль в данных {data!r}'
+    except ArithmeticError as error:
+        return None, f'переполнение в данных {data!r}: {error}'
+
+
+def compute(packages: Iterable[Package],
+            on_error: ErrorHandler = report_error,
+            cache: Optional['ResultCache'] = None
+            ) -> Iterator[Tuple[int, InfoMessage]]:
+    """Посчитать тренировки, пропуская пакеты с некорректными данными.
+
+    Пакеты сначала проходят validate, поэтому до расчёта доходят
+    только чистые данные и исключения на плохих записях не бросаются.
+    """
+    def reject(item: Reject) -> None:
+        on_error(MalformedRecord(item.key, f'{item.workout_type} {item.data}',
+                                 item.reason, item.code))
+
+    for line_no, workout_type, data in validate(packages, reject):
+        info, reason = try_compute(workout_type, data, cache)
+        if info is None:
+            on_error(MalformedRecord(line_no, f'{workout_type} {data}',
+                                     reason, COMPUTE_ERROR))
+        else:
+            yield line_no, info
+
+
+def _observe(messages: Iterable[InfoMessage],
+             on_result: Callable[[InfoMessage], None]
+             ) -> Iterator[InfoMessage]:
+    for info in messages:
+        on_result(info)
+        yield info
+
+
+def run(src: BinaryIO, out: BinaryIO, fmt: str = 'jsonl',
+        chunk_size: int = CHUNK_SIZE,
+        on_error: ErrorHandler = report_error,
+        output_format: str = 'text',
+        cache: Optional['ResultCache'] = None,
+        on_result: Optional[Callable[[InfoMessage], None]] = None
+        ) -> Tuple[int, int]:
+    """Обработать весь поток и вернуть (успешно, с ошибками).
+
+    Результаты пишутся в двоичный поток out пачками по BATCH_SIZE.
+    С cache одинаковые пакеты берутся из кэша, а не считаются заново.
+    on_result получает каждое сообщение перед записью (например,
+    StreamStats.add).
+    """
+    errors = 0
+
+    def count_error(record: MalformedRecord) -> None:
+        nonlocal errors
+        errors += 1
+        on_error(record)
+
+    packages = iter_packages(iter_lines(src, chunk_size), fmt, count_error)
+    messages = (
+        info for _, info in compute(packages, count_error, cache)
+    )
+    if on_result is not None:
+        messages = _observe(messages, on_result)
+    written = write_messages(messages, out, output_format)
+    return written, errors
+
+
+def detect_format(path: str) -> str:
+    """Определить формат входного файла по расширению."""
+    return 'csv' if path.endswith('.csv') else 'jsonl'
+
+
+def positive_int(text: str) -> int:
+    """Тип argparse: целое больше нуля."""
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(
+            f'ожидалось целое больше нуля, получено {text!r}'
+        )
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Расчёт тренировок по файлу с пакетами от датчиков.'
+    )
+    parser.add_argument('path', nargs='?', default='-',
+                        help='файл с пакетами, "-" - стандартный ввод')
+    parser.add_argument('-f', '--format', choices=FORMATS,
+                        help='формат входа (по умолчанию - по расширению)')
+    parser.add_argument('-o', '--output', default='-',
+                        help='файл для отчёта, "-" - стандартный вывод')
+    parser.add_argument('-t', '--output-format', choices=OUTPUT_FORMATS,
+                        default='text', help='формат отчёта')
+    parser.add_argument('--chunk-size', type=positive_int, default=CHUNK_SIZE,
+                        help='размер блока чтения в байтах')
+    parser.add_argument('-j', '--workers', type=int,
+                        help='обработать файл несколькими процессами, '
+                             '0 - по числу ядер; только для файла, '
+                             'несовместим с --cache-*')
+    parser.add_argument('--shard-size', type=positive_int,
+                        default=SHARD_SIZE,
+                        help='размер диапазона файла на один процесс')
+    parser.add_argument('--profile', choices=('text', 'json'),
+                        default=os.environ.get('HOMEWORK_PROFILE'),
+                        help='собрать статистику горячих путей и вывести '
+                             'сводку при выходе')
+    parser.add_argument('--profile-output',
+                        help='файл для сводки, по умолчанию - stderr')
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help='кэшировать результаты стольких различных '
+                             'пакетов, 0 - без кэша')
+    parser.add_argument('--cache-ttl', type=float,
+                        help='срок жизни записи кэша в секундах')
+    parser.add_argument('--cache-file',
+                        help='файл SQLite для кэша между запусками')
+    parser.add_argument('--workouts',
+                        help='файл JSON с описаниями дополнительных видов '
+                             'тренировок')
+    parser.add_argument('--compress',
+                        help='сжатие отчёта: gzip, bz2, xz, zstd '
+                             '(по умолчанию - по расширению файла)')
+    parser.add_argument('--rotate-bytes', type=positive_int,
+                        help='делить отчёт на файлы не больше стольких байт')
+    parser.add_argument('--background-write', action='store_true',
+                        help='писать отчёт в отдельном потоке')
+    parser.add_argument('--stats',
+                        help='записать в этот файл JSON лучших по калориям '
+                             'и перцентили скорости по видам тренировок')
+    parser.add_argument('--stats-top', type=int, default=10,
+                        help='сколько лучших по калориям хранить')
+    parser.add_argument('--rejects',
+                        help='писать отклонённые записи с кодом причины '
+                             'в этот файл JSONL вместо stderr')
+    return parser
+
+
+def _check_args(parser: argparse.ArgumentParser,
+                args: argparse.Namespace) -> None:
+    """Отказать в сочетаниях параметров, которые иначе молча не работают."""
+    if args.workers is not None and args.workers < 0:
+        parser.error('-j: ожидалось целое не меньше нуля')
+    if args.workers is not None and args.path == '-':
+        # Процессы делят файл по смещениям, стандартный ввод так не делится.
+        parser.error('-j работает только с файлом, не со стандартным вводом')
+    if args.workers is not None and (
+            args.cache_size or args.cache_file
+            or args.cache_ttl is not None):
+        # Кэш живёт в одном процессе; молча его терять не годится.
+        parser.error('--cache-size, --cache-ttl и --cache-file '
+                     'не работают вместе с -j')
+    if args.output == '-' and (args.compress or args.rotate_bytes):
+        parser.error('--compress и --rotate-bytes работают только '
+                     'с отчётом в файл (-o)')
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    _check_args(parser, args)
+    fmt = args.format or detect_format(args.path)
+    if args.workouts:
+        from workouts import register_file
+
+        register_file(args.workouts)
+    if args.profile:
+        from instrument import enable_at_exit
+
+        enable_at_exit(args.profile, args.profile_output)
+    rejects = (open(args.rejects, 'w', encoding='utf-8') if args.rejects
+               else None)
+    on_error = report_error if rejects is None else reject_writer(rejects)
+    stats = None
+    if args.stats:
+        from streamstats import StreamStats
+
+        stats = StreamStats(args.stats_top)
+    try:
+        if args.workers is not None:
+            code = _cli_parallel(args, fmt, on_error, stats)
+        else:
+            code = _cli_serial(args, fmt, on_error, stats)
+    finally:
+        if rejects is not None:
+            rejects.close()
+    if stats is not None:
+        with open(args.stats, 'w', encoding='utf-8') as stream:
+            json.dump(stats.summary(), stream, ensure_ascii=False, indent=2)
+    return code
+
+
+def _open_output(args: argparse.Namespace) -> 'Sink':
+    """Приёмник отчёта: файл пишется атомарно, при ошибке не меняется."""
+    from sinks import open_sink
+
+    return open_sink(args.output, args.compress, args.rotate_bytes,
+                     args.background_write,
+                     header=header(args.output_format))
+
+
+def _cli_serial(args: argparse.Namespace, fmt: str,
+                on_error: ErrorHandler,
+                stats: Optional['StreamStats'] = None) -> int:
+    src = (sys.stdin.buffer if args.path == '-'
+           else open(args.path, 'rb'))
+    cache = None
+    if args.cache_size or args.cache_file:
+        from cache import MAXSIZE, ResultCache
+
+        cache = ResultCache(args.cache_size or MAXSIZE, args.cache_ttl,
+                            args.cache_file)
+    try:
+        with _open_output(args) as out:
+            _, errors = run(src, out, fmt, args.chunk_size, on_error,
+                            args.output_format, cache,
+                            None if stats is None else stats.add)
+    finally:
+        if src is not sys.stdin.buffer:
+            src.close()
+        if cache is not None:
+            cache.close()
+            print(cache.stats.get_message(), file=sys.stderr)
+    return 1 if errors else 0
+
+
+def _cli_parallel(args: argparse.Namespace, fmt: str,
+                  on_error: ErrorHandler,
+                  stats: Optional['StreamStats'] = None) -> int:
+    from parallel import run_parallel
+
+    with _open_output(args) as out:
+        _, errors = run_parallel(args.path, out, fmt, args.workers or None,
+                                 args.shard_size, on_error,
+                                 args.output_format, stats)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
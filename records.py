@@ -0,0 +1,114 @@
+"""Компактные неизменяемые варианты классов тренировок.
+
+Классы повторяют публичный интерфейс homework (get_distance,
+get_mean_speed, get_spent_calories, show_training_info, get_message)
+и называются так же, но хранят поля в __slots__ вместо __dict__
+и запрещают изменение полей после создания. Формулы и константы
+берутся из homework, поэтому результаты совпадают бит в бит.
+
+Память на один объект без учёта значений полей (CPython 3.11, 64 бит,
+замер: python benchmarks/bench_memory.py; у InfoMessage - вместе с тремя
+новыми float, которые создаёт расчёт):
+
+    класс           homework   records
+    Running             97 Б      57 Б
+    SportsWalking      104 Б      64 Б
+    Swimming           113 Б      73 Б
+    InfoMessage        184 Б     144 Б
+"""
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, List
+
+import homework
+
+# Атрибуты, которые dataclass генерирует сам; при копировании класса
+# их нужно пересоздать, а не переносить. __init_subclass__ не нужен:
+# флаги переопределений, которые он считает, переносятся как есть.
+_GENERATED = frozenset((
+    '__dict__', '__weakref__', '__dataclass_fields__',
+    '__dataclass_params__', '__init__', '__repr__', '__eq__', '__hash__',
+    '__match_args__', '__setattr__', '__delattr__', '__init_subclass__',
+))
+
+
+def _getstate(self) -> List[Any]:
+    return [getattr(self, field.name) for field in fields(self)]
+
+
+def _setstate(self, state: List[Any]) -> None:
+    for field, value in zip(fields(self), state):
+        object.__setattr__(self, field.name, value)
+
+
+def _slotted(source: type, base: type = object) -> type:
+    """Скопировать dataclass source в неизменяемый класс со __slots__.
+
+    Методы и ClassVar-константы переносятся как есть, наследование
+    строится от base, а не от родителя source.
+    """
+    namespace = {
+        name: value for name, value in vars(source).items()
+        if name not in _GENERATED
+    }
+    namespace['__module__'] = __name__
+    draft = dataclass(frozen=True)(type(source.__name__, (base,), namespace))
+    own = tuple(
+        field.name for field in fields(draft)
+        if field.name in namespace.get('__annotations__', {})
+    )
+    namespace = {
+        name: value for name, value in vars(draft).items()
+        if name not in own and name not in ('__dict__', '__weakref__')
+    }
+    namespace['__slots__'] = own
+    namespace['__getstate__'] = _getstate
+    namespace['__setstate__'] = _setstate
+    return type(draft)(draft.__name__, (base,), namespace)
+
+
+InfoMessage = _slotted(homework.InfoMessage)
+
+
+def _show_training_info(self) -> InfoMessage:
+    """Вернуть информационное сообщение о выполненной тренировке."""
+    distance, mean_speed, calories = self.get_metrics()
+    return InfoMessage(
+        type(self).__name__,
+        self.duration,
+        distance,
+        mean_speed,
+        calories,
+    )
+
+
+Training = _slotted(homework.Training)
+Training.show_training_info = _show_training_info
+Running = _slotted(homework.Running, Training)
+SportsWalking = _slotted(homework.SportsWalking, Training)
+Swimming = _slotted(homework.Swimming, Training)
+
+TRAININGS: Dict[str, Callable[..., Training]] = {
+    'SWM': Swimming,
+    'RUN': Running,
+    'WLK': SportsWalking,
+}
+_BY_NAME: Dict[str, type] = {
+    cls.__name__: cls for cls in (Training, Running, SportsWalking, Swimming)
+}
+
+
+def read_package(workout_type: str, data: List[int]) -> Training:
+    """Прочитать данные от датчиков в компактный объект тренировки."""
+    if workout_type not in TRAININGS:
+        raise KeyError(
+            "вызывающая сторона передала workout_type, "
+            "которого в нашем словаре нет - " + workout_type
+            + ". Проверьте данные на ввод, пожалуйста"
+        )
+    return TRAININGS[workout_type](*data)
+
+
+def from_training(training: homework.Training) -> Training:
+    """Перевести обычный объект тренировки в компактный."""
+    cls = _BY_NAME[type(training).__name__]
+    return cls(*(getattr(training, field.name) for field in fields(training)))
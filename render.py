@@ -0,0 +1,148 @@
+"""Пакетное форматирование результатов тренировок.
+
+Вместо get_message() на каждое сообщение пачка результатов
+превращается в текст одной операцией форматирования по шаблону,
+повторённому на всю пачку, и пишется в поток одним вызовом write.
+Кроме русского текста из InfoMessage.RESULT_STRING поддерживаются
+машиночитаемые CSV и JSONL. В JSONL inf и nan (например, от
+compute_batch при нулевой длительности) пишутся как null: голые
+inf и nan - не JSON.
+"""
+import json
+import math
+from itertools import chain, islice
+from operator import attrgetter
+from string import Formatter
+from typing import (Any, BinaryIO, Dict, Iterable, Iterator, List, Sequence,
+                    Tuple)
+
+from homework import InfoMessage
+
+BATCH_SIZE: int = 4096
+FIELDS: Tuple[str, ...] = (
+    'training_type', 'duration', 'distance', 'speed', 'calories',
+)
+OUTPUT_FORMATS: Tuple[str, ...] = ('text', 'csv', 'jsonl')
+CSV_HEADER: str = ','.join(FIELDS) + '\n'
+
+Row = Tuple[str, float, float, float, float]
+
+as_row = attrgetter(*FIELDS)
+
+
+def _printf_template(template: str) -> str:
+    """Перевести шаблон str.format в шаблон оператора %.
+
+    Для '{:.3f}' и '%.3f' Python использует одно и то же
+    преобразование, а % заметно быстрее.
+    """
+    parts = []
+    for literal, field, spec, _ in Formatter().parse(template):
+        parts.append(literal.replace('%', '%%'))
+        if field is not None:
+            parts.append('%' + (spec or 's'))
+    return ''.join(parts)
+
+
+ROW_TEMPLATES: Dict[str, str] = {
+    'text': _printf_template(InfoMessage.RESULT_STRING) + '\n',
+    'csv': '%s,%s,%s,%s,%s\n',
+    'jsonl': (
+        '{"training_type": %s, "duration": %s, "distance": %s, '
+        '"speed": %s, "calories": %s}\n'
+    ),
+}
+
+
+def _jsonl_rows(rows: Sequence[Row], nulls: bool = False) -> List[Any]:
+    quoted: Dict[str, str] = {}
+    values: List[Any] = []
+    for training_type, *numbers in rows:
+        if training_type not in quoted:
+            quoted[training_type] = json.dumps(training_type)
+        values.append(quoted[training_type])
+        if nulls:
+            values.extend(number if math.isfinite(number) else 'null'
+                          for number in numbers)
+        else:
+            values.extend(numbers)
+    return values
+
+
+# Так %s выводит inf и nan в шаблоне JSONL.
+_NON_FINITE: Tuple[str, ...] = (': inf', ': -inf', ': nan')
+
+
+def render_rows(rows: Sequence[Row], output_format: str = 'text') -> str:
+    """Отформатировать пачку строк (тип, длительность, дистанция,
+    скорость, калории) одной операцией.
+    """
+    if not rows:
+        return ''
+    template = ROW_TEMPLATES[output_format] * len(rows)
+    if output_format == 'jsonl':
+        text = template % tuple(_jsonl_rows(rows))
+        # Проверять готовый текст дешевле, чем каждое число; при
+        # подозрении пачка просто форматируется заново с null.
+        if any(token in text for token in _NON_FINITE):
+            text = template % tuple(_jsonl_rows(rows, nulls=True))
+        return text
+    return template % tuple(chain.from_iterable(rows))
+
+
+def render(messages: Sequence[InfoMessage],
+           output_format: str = 'text') -> bytes:
+    """Отформатировать пачку сообщений в байты UTF-8."""
+    rows = [as_row(message) for message in messages]
+    return render_rows(rows, output_format).encode('utf-8')
+
+
+def render_columns(training_types: Iterable[str],
+                   durations: Iterable[float],
+                   distances: Iterable[float],
+                   speeds: Iterable[float],
+                   calories: Iterable[float],
+                   output_format: str = 'text') -> bytes:
+    """Отформатировать столбцы, например результат compute_batch."""
+    columns = [
+        column.tolist() if hasattr(column, 'tolist') else column
+        for column in (training_types, durations, distances, speeds,
+                       calories)
+    ]
+    rows = list(zip(*columns))
+    return render_rows(rows, output_format).encode('utf-8')
+
+
+def header(output_format: str) -> bytes:
+    """Заголовок, который пишется один раз в начало потока."""
+    return CSV_HEADER.encode('utf-8') if output_format == 'csv' else b''
+
+
+def iter_batches(items: Iterable[Any],
+                 size: int = BATCH_SIZE) -> Iterator[List[Any]]:
+    """Разбить поток на списки не длиннее size."""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_messages(messages: Iterable[InfoMessage], stream: BinaryIO,
+                   output_format: str = 'text',
+                   batch_size: int = BATCH_SIZE,
+                   with_header: bool = True) -> int:
+    """Записать сообщения в двоичный поток пачками и вернуть их число.
+
+    Каждая пачка уходит в поток одним вызовом write.
+    """
+    prefix = header(output_format) if with_header else b''
+    count = 0
+    for batch in iter_batches(messages, batch_size):
+        stream.write(prefix + render(batch, output_format))
+        prefix = b''
+        count += len(batch)
+    if prefix:
+        stream.write(prefix)
+    return count
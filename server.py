@@ -0,0 +1,188 @@
+"""asyncio-сервер для приёма пакетов прямо от устройств.
+
+Протокол построчный, через TCP или Unix-сокет: клиент пишет пакеты
+в формате JSONL (["RUN", [15000, 1, 75]]), сервер на каждую строку
+отвечает одной строкой в том же порядке - текстом InfoMessage
+или JSON-объектом, смотря по output_format. Ошибка в пакете
+не рвёт соединение: вместо результата приходит строка
+"ошибка: [код] ..." (или {"error": "...", "code": "..."} в JSONL),
+код причины - из validate.REASON_CODES, pipeline.PARSE_ERROR
+или pipeline.COMPUTE_ERROR.
+
+Клиент может слать пакеты, не дожидаясь ответов. Сервер читает
+сокет блоками и считает все целые строки блока одной пачкой;
+следующий блок читается только после того, как ответы ушли клиенту,
+так что медленный клиент сам притормаживает свой поток. Пачки
+от offload_threshold строк считаются в пуле процессов, чтобы
+цикл событий продолжал обслуживать остальные соединения.
+
+Запуск: python server.py --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+from pipeline import COMPUTE_ERROR, PARSE_ERROR, parse_jsonl, try_compute
+from render import OUTPUT_FORMATS, Row, as_row, render_rows
+from validate import check
+
+CHUNK_SIZE: int = 64 << 10
+MAX_LINE: int = 64 << 10
+OFFLOAD_THRESHOLD: int = 256
+
+
+def _error_line(reason: str, output_format: str, code: str = '') -> str:
+    if output_format == 'text':
+        return f'ошибка: [{code}] {reason}\n' if code else (
+            f'ошибка: {reason}\n'
+        )
+    error = {'error': reason, 'code': code} if code else {'error': reason}
+    return json.dumps(error, ensure_ascii=False) + '\n'
+
+
+def process_batch(lines: Sequence[bytes],
+                  output_format: str = 'text') -> bytes:
+    """Посчитать пачку строк-пакетов и вернуть ответы, строка на строку.
+
+    Пустые строки пропускаются без ответа.
+    """
+    parts: List[str] = []
+    rows: List[Row] = []
+    for raw in lines:
+        line = raw.decode('utf-8', errors='replace').strip()
+        if not line:
+            continue
+        info, code = None, ''
+        try:
+            workout_type, data = parse_jsonl(line)
+        except (ValueError, KeyError, TypeError) as error:
+            code, reason = PARSE_ERROR, f'не разобрана: {error}'
+        else:
+            problem = check(workout_type, data)
+            if problem is None:
+                info, reason = try_compute(workout_type, data)
+                if info is None:
+                    code = COMPUTE_ERROR
+            else:
+                code, reason = problem
+        if info is None:
+            parts.append(render_rows(rows, output_format))
+            parts.append(_error_line(reason, output_format, code))
+            rows = []
+        else:
+            rows.append(as_row(info))
+    parts.append(render_rows(rows, output_format))
+    return ''.join(parts).encode('utf-8')
+
+
+class TrainingServer:
+    """Сервер расчёта тренировок поверх asyncio.start_server."""
+
+    def __init__(self, output_format: str = 'text',
+                 offload_threshold: int = OFFLOAD_THRESHOLD,
+                 executor: Optional[Executor] = None,
+                 chunk_size: int = CHUNK_SIZE) -> None:
+        if output_format not in ('text', 'jsonl'):
+            raise ValueError(
+                f'формат ответа {output_format!r} не поддерживается'
+            )
+        self.output_format = output_format
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0,
+                    path: Optional[str] = None) -> asyncio.AbstractServer:
+        """Начать слушать TCP-порт или, если задан path, Unix-сокет."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def process(self, lines: List[bytes]) -> bytes:
+        if self.executor is not None and len(lines) >= self.offload_threshold:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, process_batch, lines, self.output_format
+            )
+        return process_batch(lines, self.output_format)
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """Обслужить одно соединение до его закрытия клиентом."""
+        tail = b''
+        try:
+            while True:
+                chunk = await reader.read(self.chunk_size)
+                if not chunk:
+                    break
+                lines = (tail + chunk).split(b'\n')
+                tail = lines.pop()
+                if lines:
+                    writer.write(await self.process(lines))
+                    await writer.drain()
+                if len(tail) > MAX_LINE:
+                    # Один ответ на слишком длинную строку, дальше
+                    # соединение закрывается.
+                    writer.write(_error_line(
+                        f'строка длиннее {MAX_LINE} байт',
+                        self.output_format,
+                    ).encode('utf-8'))
+                    tail = b''
+                    break
+            if tail.strip():
+                writer.write(await self.process([tail]))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Сервер расчёта тренировок по пакетам от устройств.'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='слушать Unix-сокет вместо TCP')
+    parser.add_argument('-t', '--output-format', default='text',
+                        choices=[f for f in OUTPUT_FORMATS if f != 'csv'])
+    parser.add_argument('--workers', type=int, default=0,
+                        help='процессов для больших пачек, 0 - не выносить')
+    parser.add_argument('--offload-threshold', type=int,
+                        default=OFFLOAD_THRESHOLD,
+                        help='с какого размера пачка уходит в пул')
+    return parser
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    executor = ProcessPoolExecutor(args.workers) if args.workers else None
+    server = TrainingServer(args.output_format, args.offload_threshold,
+                            executor)
+    listener = await server.start(args.host, args.port, args.unix)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки."""
+    try:
+        asyncio.run(_serve(build_parser().parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
@@ -0,0 +1,177 @@
+"""Тренировки из потока посекундных замеров.
+
+Новые устройства шлют не итоги, а замеры за короткие интервалы:
+шаги или гребки за интервал, его длительность в секундах и, для
+плавания, проплытые бассейны. Session принимает их по одному (add)
+или пачками (feed) и хранит только нарастающие суммы, так что память
+на активную сессию постоянна. Итоговое сообщение finish() считается
+теми же классами из homework по накопленным итогам и совпадает
+с read_package(код, [шаги, часы, вес, ...]).show_training_info().
+
+С split_seconds сессия дополнительно отдаёт сообщения по отрезкам
+(сплитам): скорость и калории отрезка считаются той же формулой по
+итогам отрезка. Калории нелинейны по скорости, поэтому сумма калорий
+сплитов не обязана совпадать с калориями всей тренировки.
+"""
+from dataclasses import MISSING, fields
+from typing import (Dict, Hashable, List, Optional, Sequence, Tuple,
+                    Union)
+
+from homework import WORKOUT_TYPES, InfoMessage, WorkoutType, read_package
+
+SECONDS_IN_HOUR: int = 3600
+# Поля конструктора, которые не задаются при старте, а копятся
+# из замеров: проплытые бассейны у плавания.
+COUNTED_FIELDS: Sequence[str] = ('count_pool',)
+
+Number = Union[int, float]
+
+
+def _layout(workout: Optional[WorkoutType], static: Tuple[Number, ...]
+            ) -> Tuple[Tuple[Number, ...], Optional[int]]:
+    """Постоянные параметры и место накопленного поля в пакете.
+
+    Накопленное поле встаёт в пакет по имени, а не в конец: не заданные
+    при старте поля перед ним (длина бассейна у плавания) берут значения
+    по умолчанию, иначе счётчик встал бы на их место.
+    """
+    if workout is None:
+        return static, None
+    # Первые два поля - шаги и длительность - копятся из замеров.
+    names = fields(workout.training)[2:]
+    for index, field in enumerate(names):
+        if field.name not in COUNTED_FIELDS:
+            continue
+        filled = list(static[:index])
+        for missing in names[len(filled):index]:
+            if missing.default is MISSING:
+                raise TypeError(f'{workout.training.__name__}: не задано '
+                                f'поле {missing.name!r}')
+            filled.append(missing.default)
+        return (*filled, *static[index:]), index + 2
+    return static, None
+
+
+class Session:
+    """Одна тренировка, собираемая из замеров."""
+
+    __slots__ = ('workout_type', 'static', 'laps_index', 'split_seconds',
+                 'action', 'seconds', 'laps',
+                 'interval_action', 'interval_seconds', 'interval_laps')
+
+    def __init__(self, workout_type: str, weight: Number, *extra: Number,
+                 split_seconds: Optional[float] = None) -> None:
+        """extra - остальные постоянные параметры, как в пакете после веса
+        (рост у ходьбы, длина бассейна у плавания).
+        """
+        self.workout_type = workout_type
+        self.static, self.laps_index = _layout(
+            WORKOUT_TYPES.get(workout_type), (weight, *extra)
+        )
+        if split_seconds is not None and split_seconds <= 0:
+            raise ValueError('split_seconds должен быть положительным')
+        self.split_seconds = split_seconds
+        self.action = self.seconds = self.laps = 0
+        self.interval_action = self.interval_seconds = self.interval_laps = 0
+        # Неизвестный вид или неверное число параметров - сразу,
+        # а не в конце тренировки.
+        read_package(workout_type, self._data(0, 1, 0))
+
+    def _data(self, action: Number, seconds: Number,
+              laps: Number) -> List[Number]:
+        data = [action, seconds / SECONDS_IN_HOUR, *self.static]
+        if self.laps_index is not None:
+            data.insert(self.laps_index, laps)
+        return data
+
+    def _info(self, action: Number, seconds: Number,
+              laps: Number) -> InfoMessage:
+        return read_package(
+            self.workout_type, self._data(action, seconds, laps)
+        ).show_training_info()
+
+    def _split(self) -> InfoMessage:
+        info = self._info(self.interval_action, self.interval_seconds,
+                          self.interval_laps)
+        self.interval_action = self.interval_seconds = self.interval_laps = 0
+        return info
+
+    def add(self, action: int, seconds: float = 1,
+            laps: int = 0) -> Optional[InfoMessage]:
+        """Учесть один замер; вернуть сплит, если отрезок завершён."""
+        self.action += action
+        self.seconds += seconds
+        self.laps += laps
+        if self.split_seconds is None:
+            return None
+        self.interval_action += action
+        self.interval_seconds += seconds
+        self.interval_laps += laps
+        if self.interval_seconds >= self.split_seconds:
+            return self._split()
+        return None
+
+    def feed(self, actions: Sequence[int],
+             seconds: Union[float, Sequence[float]] = 1,
+             laps: Optional[Sequence[int]] = None) -> List[InfoMessage]:
+        """Учесть пачку замеров и вернуть завершённые в ней сплиты.
+
+        seconds - длительность каждого замера: одно число на всех
+        или последовательность той же длины, что и actions.
+        """
+        if isinstance(seconds, (int, float)):
+            seconds = [seconds] * len(actions)
+        if self.split_seconds is not None:
+            splits = []
+            for index, (action, duration) in enumerate(zip(actions,
+                                                           seconds)):
+                split = self.add(action, duration,
+                                 laps[index] if laps is not None else 0)
+                if split is not None:
+                    splits.append(split)
+            return splits
+        self.action += sum(actions)
+        self.seconds += sum(seconds)
+        if laps is not None:
+            self.laps += sum(laps)
+        return []
+
+    def current(self) -> InfoMessage:
+        """Сообщение по итогам на данный момент."""
+        if not self.seconds:
+            raise ValueError('в сессии ещё нет замеров')
+        return self._info(self.action, self.seconds, self.laps)
+
+    def finish(self) -> InfoMessage:
+        """Итоговое сообщение о тренировке (недоснятый сплит не выдаётся).
+        """
+        return self.current()
+
+
+class SessionManager:
+    """Активные сессии по идентификатору (например, устройства)."""
+
+    def __init__(self, split_seconds: Optional[float] = None) -> None:
+        self.split_seconds = split_seconds
+        self.sessions: Dict[Hashable, Session] = {}
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def start(self, session_id: Hashable, workout_type: str,
+              weight: Number, *extra: Number) -> Session:
+        if session_id in self.sessions:
+            raise ValueError(f'сессия {session_id!r} уже идёт')
+        session = self.sessions[session_id] = Session(
+            workout_type, weight, *extra, split_seconds=self.split_seconds
+        )
+        return session
+
+    def feed(self, session_id: Hashable, actions: Sequence[int],
+             seconds: Union[float, Sequence[float]] = 1,
+             laps: Optional[Sequence[int]] = None) -> List[InfoMessage]:
+        return self.sessions[session_id].feed(actions, seconds, laps)
+
+    def finish(self, session_id: Hashable) -> InfoMessage:
+        """Завершить сессию и вернуть итоговое сообщение."""
+        return self.sessions.pop(session_id).finish()
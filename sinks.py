@@ -0,0 +1,409 @@
+"""Приёмники отчёта: файл, сжатый файл, файлы с ротацией.
+
+Приёмник принимает готовые пачки байт (render) и пишет их через
+большой буфер. Пачки можно отдавать не по порядку, с номером
+(write_batch): приёмник держит пришедшие раньше времени пачки
+и пишет их строго по возрастанию номера, так что результат
+нескольких обработчиков не зависит от того, кто закончил первым.
+
+Файл пишется во временный файл рядом и переименовывается в целевой
+только при успешном close(): при ошибке (или abort) на диске остаётся
+прежний файл, а не обрывок. Сжатие (gzip, bz2, xz и zstd, если он
+есть в стандартной библиотеке) выбирается по расширению; заголовок
+gzip пишется без времени и имени, так что одинаковый отчёт даёт
+одинаковые байты.
+
+BackgroundWriter переносит запись в отдельный поток: расчёт
+следующей пачки идёт, пока пишется (и сжимается) предыдущая.
+"""
+import os
+import queue
+import sys
+import threading
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+BUFFER_SIZE: int = 1 << 20
+MAX_PENDING: int = 8
+
+_TMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+
+Opener = Callable[[BinaryIO], BinaryIO]
+
+
+# Модули сжатия импортируются только при использовании: CLI без сжатия
+# не должен платить за их загрузку.
+def _gzip(raw: BinaryIO) -> BinaryIO:
+    import gzip
+
+    return gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0)
+
+
+def _bz2(raw: BinaryIO) -> BinaryIO:
+    import bz2
+
+    return bz2.BZ2File(raw, 'wb')
+
+
+def _xz(raw: BinaryIO) -> BinaryIO:
+    import lzma
+
+    return lzma.LZMAFile(raw, 'wb')
+
+
+COMPRESSORS: Dict[str, Opener] = {'gzip': _gzip, 'bz2': _bz2, 'xz': _xz}
+SUFFIXES: Dict[str, str] = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+if sys.version_info >= (3, 14):
+    def _zstd(raw: BinaryIO) -> BinaryIO:
+        from compression import zstd
+
+        return zstd.ZstdFile(raw, 'wb')
+
+    COMPRESSORS['zstd'] = _zstd
+    SUFFIXES['.zst'] = 'zstd'
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """Сжатие по расширению файла или None."""
+    return SUFFIXES.get(os.path.splitext(path)[1])
+
+
+class Sink:
+    """Приёмник пачек байт, упорядоченный по номеру пачки."""
+
+    def __init__(self) -> None:
+        self.bytes_written = 0
+        self._next = 0
+        self._waiting: Dict[int, bytes] = {}
+        self._last = -1
+        self._closed = False
+
+    def write(self, data: bytes) -> int:
+        """Дописать пачку следом за предыдущей (как BinaryIO.write)."""
+        self.write_batch(self._last + 1, data)
+        return len(data)
+
+    def write_batch(self, index: int, data: bytes) -> None:
+        """Принять пачку с номером index (с нуля), в любом порядке."""
+        if self._closed:
+            raise ValueError('приёмник уже закрыт')
+        if index < self._next or index in self._waiting:
+            raise ValueError(f'пачка {index} уже записана')
+        self._last = max(self._last, index)
+        self._waiting[index] = data
+        while self._next in self._waiting:
+            data = self._waiting.pop(self._next)
+            if data:
+                self._emit(data)
+                self.bytes_written += len(data)
+            self._next += 1
+
+    def close(self) -> None:
+        """Дописать всё и сделать результат видимым."""
+        if self._closed:
+            return
+        if self._waiting:
+            missing = self._next
+            self.abort()
+            raise ValueError(f'не пришла пачка {missing}, отчёт не записан')
+        self._closed = True
+        self._commit()
+
+    def abort(self) -> None:
+        """Бросить запись: целевой файл не меняется."""
+        if self._closed:
+            return
+        self._closed = True
+        self._waiting.clear()
+        self._discard()
+
+    def __enter__(self) -> 'Sink':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _emit(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def _commit(self) -> None:
+        pass
+
+    def _discard(self) -> None:
+        pass
+
+
+class StreamSink(Sink):
+    """Запись в уже открытый поток, например stdout; поток не закрывается.
+    """
+
+    def __init__(self, stream: BinaryIO) -> None:
+        super().__init__()
+        self.stream = stream
+
+    def _emit(self, data: bytes) -> None:
+        self.stream.write(data)
+
+    def _commit(self) -> None:
+        self.stream.flush()
+
+
+class _AtomicFile:
+    """Временный файл рядом с path, при commit - на место path."""
+
+    def __init__(self, path: str, compression: Optional[str],
+                 buffer_size: int) -> None:
+        if compression is not None and compression not in COMPRESSORS:
+            raise ValueError(f'неизвестное сжатие {compression!r}, '
+                             f'доступны {sorted(COMPRESSORS)}')
+        self.path = path
+        directory, name = os.path.split(os.path.abspath(path))
+        while True:
+            self.tmp_path = os.path.join(
+                directory, f'.{name}.{os.urandom(6).hex()}.tmp'
+            )
+            try:
+                # Права как у open(): 0666 за вычетом umask применяет
+                # ядро, так что umask процесса трогать не нужно.
+                fd = os.open(self.tmp_path, _TMP_FLAGS, 0o666)
+            except FileExistsError:
+                continue
+            break
+        self.raw = os.fdopen(fd, 'wb', buffering=buffer_size)
+        self.stream = (self.raw if compression is None
+                       else COMPRESSORS[compression](self.raw))
+
+    def finish(self) -> None:
+        """Дописать и закрыть временный файл, не трогая path."""
+        if self.stream is not self.raw:
+            self.stream.close()
+        self.raw.close()
+
+    def replace(self) -> None:
+        """Поставить дописанный временный файл на место path."""
+        os.replace(self.tmp_path, self.path)
+
+    def commit(self) -> None:
+        try:
+            self.finish()
+            self.replace()
+        except BaseException:
+            self.discard()
+            raise
+
+    def discard(self) -> None:
+        try:
+            self.finish()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.unlink(self.tmp_path)
+
+
+class FileSink(Sink):
+    """Запись в файл, атомарно при close()."""
+
+    def __init__(self, path: str, compression: Optional[str] = None,
+                 buffer_size: int = BUFFER_SIZE) -> None:
+        super().__init__()
+        self._file = _AtomicFile(path, compression, buffer_size)
+
+    def _emit(self, data: bytes) -> None:
+        self._file.stream.write(data)
+
+    def _commit(self) -> None:
+        self._file.commit()
+
+    def _discard(self) -> None:
+        self._file.discard()
+
+
+class RotatingSink(Sink):
+    """Запись в несколько файлов не больше max_bytes (до сжатия) каждый.
+
+    Части называются по path с номером перед расширением:
+    report.txt.gz -> report.0000.txt.gz, report.0001.txt.gz, ...
+    Пачка делится между частями по границам строк, так что строка
+    никогда не разрывается; часть больше max_bytes бывает, только
+    если в ней одна строка длиннее предела. Все части пишутся
+    во временные файлы и встают на место вместе при close(); части
+    прошлого, более длинного прогона с большими номерами удаляются.
+    header (например, строка заголовка CSV) повторяется в начале
+    каждой части после первой, чтобы любую часть можно было читать
+    отдельно; в первую его пишет сам источник.
+    """
+
+    def __init__(self, path: str, max_bytes: int,
+                 compression: Optional[str] = None,
+                 buffer_size: int = BUFFER_SIZE,
+                 header: bytes = b'') -> None:
+        if max_bytes <= 0:
+            raise ValueError('max_bytes должен быть положительным')
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.header = header
+        self.paths: List[str] = []
+        self._files: List[_AtomicFile] = []
+        self._size = 0
+        # В текущей части пока нет ничего, кроме заголовка.
+        self._fresh = True
+
+    def part_path(self, number: int) -> str:
+        base, compressed = self.path, ''
+        if detect_compression(base):
+            base, compressed = os.path.splitext(base)
+        root, ext = os.path.splitext(base)
+        return f'{root}.{number:04d}{ext}{compressed}'
+
+    def _next_part(self) -> None:
+        if self._files:
+            self._files[-1].finish()
+        path = self.part_path(len(self.paths))
+        self._files.append(_AtomicFile(path, self.compression,
+                                       self.buffer_size))
+        self._size = 0
+        if self.paths and self.header:
+            self._files[-1].stream.write(self.header)
+            self._size = len(self.header)
+        self.paths.append(path)
+        self._fresh = True
+
+    def _emit(self, data: bytes) -> None:
+        start = 0
+        while start < len(data):
+            if not self._files or (self._size >= self.max_bytes
+                                   and not self._fresh):
+                self._next_part()
+            end = start + max(self.max_bytes - self._size, 0)
+            if end >= len(data):
+                end = len(data)
+            else:
+                cut = data.rfind(b'\n', start, end) + 1
+                if cut:
+                    end = cut
+                elif not self._fresh:
+                    # Строка не влезает в остаток части - в новую.
+                    self._next_part()
+                    continue
+                else:
+                    # Одна строка длиннее предела: целиком в свою часть.
+                    end = data.find(b'\n', end) + 1 or len(data)
+            self._files[-1].stream.write(data[start:end])
+            self._size += end - start
+            self._fresh = False
+            start = end
+
+    def _commit(self) -> None:
+        if not self._files:
+            self._next_part()
+        try:
+            self._files[-1].finish()
+        except BaseException:
+            self._discard()
+            raise
+        for part in self._files:
+            part.replace()
+        number = len(self.paths)
+        while os.path.exists(self.part_path(number)):
+            os.remove(self.part_path(number))
+            number += 1
+
+    def _discard(self) -> None:
+        for part in self._files:
+            part.discard()
+
+
+class BackgroundWriter(Sink):
+    """Запись в приёмник sink из отдельного потока.
+
+    В очереди не больше max_pending пачек: если запись отстаёт,
+    расчёт ждёт, и память не растёт. Ошибка записи поднимается
+    в вызывающем потоке при следующем write_batch или close.
+    """
+
+    _STOP = object()
+
+    def __init__(self, sink: Sink, max_pending: int = MAX_PENDING) -> None:
+        super().__init__()
+        self.sink = sink
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            if self._error is None:
+                try:
+                    self.sink.write_batch(*item)
+                except BaseException as error:
+                    self._error = error
+
+    def _check(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            self.abort()
+            raise error
+
+    def write_batch(self, index: int, data: bytes) -> None:
+        """Передать пачку в поток записи (порядок восстановит sink)."""
+        self._check()
+        if self._closed:
+            raise ValueError('приёмник уже закрыт')
+        self._last = max(self._last, index)
+        self._queue.put((index, data))
+        self.bytes_written += len(data)
+
+    def _stop(self) -> None:
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._stop()
+        self._check()
+        self._closed = True
+        self.sink.close()
+
+    def abort(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._stop()
+        self.sink.abort()
+
+
+def open_sink(path: str, compression: Optional[str] = None,
+              rotate_bytes: Optional[int] = None,
+              background: bool = False,
+              buffer_size: int = BUFFER_SIZE,
+              header: bytes = b'') -> Sink:
+    """Приёмник для пути из командной строки; "-" - стандартный вывод.
+
+    compression=None - по расширению path. header повторяется в начале
+    каждой части при ротации. Сжатие и ротация в стандартный вывод
+    невозможны: вместо молчаливого пропуска - ValueError.
+    """
+    if path == '-':
+        if compression or rotate_bytes:
+            raise ValueError(
+                'сжатие и ротация работают только с файлом (-o)'
+            )
+        sink: Sink = StreamSink(sys.stdout.buffer)
+    else:
+        compression = compression or detect_compression(path)
+        if rotate_bytes:
+            sink = RotatingSink(path, rotate_bytes, compression,
+                                buffer_size, header)
+        else:
+            sink = FileSink(path, compression, buffer_size)
+    return BackgroundWriter(sink) if background else sink
@@ -0,0 +1,381 @@
+"""Хранилище посчитанных тренировок с индексами для поиска.
+
+Вопросы вида «все заплывы (SWM) больше 500 ккал у спортсмена X
+за прошлый месяц» не требуют пересчёта пакетов: результаты лежат
+в файле SQLite с вторичными индексами по спортсмену и дню, по коду
+вида тренировки (как в read_package) и дню, по дню, по калориям
+и по дистанции, и такой запрос читает только нужные строки.
+
+Запись устроена как журнал: новые результаты дописываются пачками
+в таблицу pending без индексов, так что частая загрузка не платит
+за перестройку индексов. Поиск смотрит и в основную таблицу,
+и в журнал. compact() переносит журнал в проиндексированную
+таблицу (упорядочив по спортсмену и дню), по желанию убирает
+полные повторы и сжимает файл; при PENDING_LIMIT строк в журнале
+это происходит само.
+
+Запуск:
+    python store.py ingest results.db trainings.jsonl
+    python store.py query results.db --athlete X --type SWM \\
+        --min-calories 500 --since 2026-09-01 --until 2026-09-30
+    python store.py compact results.db --dedupe --vacuum
+Строка trainings.jsonl - объект с полями athlete, date (ISO),
+workout_type и data, как у read_package.
+"""
+import argparse
+import json
+import sqlite3
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import (Any, Iterable, Iterator, List, Optional, Sequence,
+                    Tuple, Union)
+
+from aggregate import When, period_start
+from homework import InfoMessage, read_package
+from pipeline import (COMPUTE_ERROR, PARSE_ERROR, MalformedRecord,
+                      report_error)
+from validate import check
+
+FLUSH_EVERY: int = 1024
+PENDING_LIMIT: int = 100_000
+
+COLUMNS: Tuple[str, ...] = (
+    'athlete', 'day', 'workout_type', 'training_type', 'duration',
+    'distance', 'speed', 'calories',
+)
+# Имя индекса -> столбцы; индексы есть только у основной таблицы.
+INDEXES = {
+    'results_athlete': ('athlete', 'day'),
+    'results_type': ('workout_type', 'day'),
+    'results_day': ('day',),
+    'results_calories': ('calories',),
+    'results_distance': ('distance',),
+}
+
+_TABLE = """
+CREATE TABLE IF NOT EXISTS {name} (
+    id INTEGER PRIMARY KEY,
+    athlete TEXT NOT NULL,
+    day TEXT NOT NULL,
+    workout_type TEXT NOT NULL,
+    training_type TEXT NOT NULL,
+    duration NOT NULL,
+    distance REAL NOT NULL,
+    speed REAL NOT NULL,
+    calories REAL NOT NULL
+);
+"""
+_SCHEMA = (
+    _TABLE.format(name='results') + _TABLE.format(name='pending')
+    + ''.join(
+        f'CREATE INDEX IF NOT EXISTS {name} ON results '
+        f'({", ".join(columns)});\n'
+        for name, columns in INDEXES.items()
+    )
+)
+_SELECT = ', '.join(COLUMNS)
+_INSERT = (f'INSERT INTO pending ({_SELECT}) '
+           f'VALUES ({", ".join("?" * len(COLUMNS))})')
+
+Day = Union[date, str]
+
+
+@dataclass
+class StoredResult:
+    """Тренировка из хранилища."""
+    athlete: str
+    day: date
+    workout_type: str
+    info: InfoMessage
+
+
+def _day(when: Day) -> str:
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when)
+    elif not isinstance(when, date):
+        raise TypeError(f'дата {when!r}: ожидалась строка ISO или date')
+    return period_start(when).isoformat()
+
+
+class ResultStore:
+    """Результаты тренировок в файле SQLite с индексами для поиска."""
+
+    def __init__(self, path: str,
+                 pending_limit: Optional[int] = PENDING_LIMIT) -> None:
+        self.path = path
+        self.pending_limit = pending_limit
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        self._buffer: List[tuple] = []
+        self._pending = self._db.execute(
+            'SELECT COUNT(*) FROM pending'
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._db.execute(
+            'SELECT (SELECT COUNT(*) FROM results) '
+            '+ (SELECT COUNT(*) FROM pending)'
+        ).fetchone()[0]
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, athlete: str, when: When, workout_type: str,
+            info: InfoMessage) -> None:
+        """Добавить посчитанную тренировку."""
+        self._buffer.append((
+            athlete, _day(when), workout_type, info.training_type,
+            info.duration, info.distance, info.speed, info.calories,
+        ))
+        if len(self._buffer) >= FLUSH_EVERY:
+            self.flush()
+
+    def add_package(self, athlete: str, when: When, workout_type: str,
+                    data: List[Union[int, float]]) -> InfoMessage:
+        """Посчитать пакет и добавить результат."""
+        info = read_package(workout_type, data).show_training_info()
+        self.add(athlete, when, workout_type, info)
+        return info
+
+    def flush(self) -> None:
+        """Дописать накопленное в журнал; при переполнении - compact()."""
+        if self._buffer:
+            with self._db:
+                self._db.executemany(_INSERT, self._buffer)
+            self._pending += len(self._buffer)
+            self._buffer = []
+        if (self.pending_limit is not None
+                and self._pending >= self.pending_limit):
+            self.compact()
+
+    def compact(self, dedupe: bool = False, vacuum: bool = False) -> None:
+        """Перенести журнал в проиндексированную таблицу.
+
+        dedupe - оставить одну строку из полностью совпадающих
+        (повторный импорт того же архива), vacuum - вернуть
+        освободившееся место файлу.
+        """
+        if self._buffer:
+            with self._db:
+                self._db.executemany(_INSERT, self._buffer)
+            self._buffer = []
+        with self._db:
+            self._db.execute(
+                f'INSERT INTO results ({_SELECT}) SELECT {_SELECT} '
+                f'FROM pending ORDER BY athlete, day, id'
+            )
+            self._db.execute('DELETE FROM pending')
+            if dedupe:
+                self._db.execute(
+                    f'DELETE FROM results WHERE id NOT IN '
+                    f'(SELECT MIN(id) FROM results GROUP BY {_SELECT})'
+                )
+        self._pending = 0
+        self._db.execute('ANALYZE')
+        if vacuum:
+            self._db.execute('VACUUM')
+
+    def _where(self, athlete: Optional[str], workout_type: Optional[str],
+               since: Optional[Day], until: Optional[Day],
+               min_calories: Optional[float], max_calories: Optional[float],
+               min_distance: Optional[float],
+               max_distance: Optional[float]) -> Tuple[str, List[Any]]:
+        conditions = []
+        params: List[Any] = []
+        for column, operator, value in (
+                ('athlete', '=', athlete),
+                ('workout_type', '=', workout_type),
+                ('day', '>=', None if since is None else _day(since)),
+                ('day', '<=', None if until is None else _day(until)),
+                ('calories', '>=', min_calories),
+                ('calories', '<=', max_calories),
+                ('distance', '>=', min_distance),
+                ('distance', '<=', max_distance)):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                params.append(value)
+        if not conditions:
+            return '', params
+        return ' WHERE ' + ' AND '.join(conditions), params
+
+    def _sql(self, what: str, *filters: Any) -> Tuple[str, List[Any]]:
+        where, params = self._where(*filters)
+        return (
+            f'SELECT {what}, 0 AS source, id FROM results{where} '
+            f'UNION ALL SELECT {what}, 1, id FROM pending{where}',
+            params * 2,
+        )
+
+    def iter_query(self, athlete: Optional[str] = None,
+                   workout_type: Optional[str] = None,
+                   since: Optional[Day] = None, until: Optional[Day] = None,
+                   min_calories: Optional[float] = None,
+                   max_calories: Optional[float] = None,
+                   min_distance: Optional[float] = None,
+                   max_distance: Optional[float] = None,
+                   limit: Optional[int] = None) -> Iterator[StoredResult]:
+        """Тренировки, подходящие под все заданные условия, по дням.
+
+        Границы дней и диапазонов включаются; workout_type - код
+        пакета ('SWM'), since и until - дата или строка ISO.
+        """
+        self.flush()
+        sql, params = self._sql(
+            _SELECT, athlete, workout_type, since, until, min_calories,
+            max_calories, min_distance, max_distance,
+        )
+        sql += ' ORDER BY day, athlete, source, id'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        for athlete_, day, code, *values, _, _ in self._db.execute(
+                sql, params):
+            yield StoredResult(athlete_, date.fromisoformat(day), code,
+                               InfoMessage(*values))
+
+    def query(self, *args: Any, **kwargs: Any) -> List[StoredResult]:
+        """То же, что iter_query, списком."""
+        return list(self.iter_query(*args, **kwargs))
+
+    def count(self, athlete: Optional[str] = None,
+              workout_type: Optional[str] = None,
+              since: Optional[Day] = None, until: Optional[Day] = None,
+              min_calories: Optional[float] = None,
+              max_calories: Optional[float] = None,
+              min_distance: Optional[float] = None,
+              max_distance: Optional[float] = None) -> int:
+        """Число тренировок под условиями (как у iter_query)."""
+        self.flush()
+        sql, params = self._sql(
+            'athlete', athlete, workout_type, since, until, min_calories,
+            max_calories, min_distance, max_distance,
+        )
+        return self._db.execute(
+            f'SELECT COUNT(*) FROM ({sql})', params
+        ).fetchone()[0]
+
+    def plan(self, **filters: Any) -> List[str]:
+        """План запроса SQLite для iter_query(**filters): видно,
+        какой индекс будет использован.
+        """
+        self.flush()
+        names = ('athlete', 'workout_type', 'since', 'until',
+                 'min_calories', 'max_calories', 'min_distance',
+                 'max_distance')
+        sql, params = self._sql(
+            _SELECT, *(filters.pop(name, None) for name in names)
+        )
+        if filters:
+            raise TypeError(f'неизвестные условия: {sorted(filters)}')
+        return [row[-1] for row in self._db.execute(
+            f'EXPLAIN QUERY PLAN {sql}', params
+        )]
+
+    def close(self) -> None:
+        if self._db is not None:
+            if self._buffer:
+                with self._db:
+                    self._db.executemany(_INSERT, self._buffer)
+                self._buffer = []
+            self._db.close()
+            self._db = None
+
+
+def ingest(store: ResultStore, lines: Iterable[str]) -> Tuple[int, int]:
+    """Загрузить тренировки из строк JSONL; вернуть (добавлено, ошибок).
+    """
+    added = errors = 0
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            raw = json.loads(line)
+            athlete, when = raw['athlete'], raw['date']
+            workout_type, data = raw['workout_type'], raw['data']
+            day = _day(when)
+        except (ValueError, KeyError, TypeError) as error:
+            report_error(MalformedRecord(line_no, line, str(error),
+                                         PARSE_ERROR))
+            errors += 1
+            continue
+        problem = check(workout_type, data)
+        if problem is not None:
+            report_error(MalformedRecord(line_no, line, problem[1],
+                                         problem[0]))
+            errors += 1
+            continue
+        try:
+            store.add_package(athlete, day, workout_type, data)
+        except ArithmeticError as error:
+            report_error(MalformedRecord(line_no, line, str(error),
+                                         COMPUTE_ERROR))
+            errors += 1
+            continue
+        added += 1
+    store.flush()
+    return added, errors
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Хранилище посчитанных тренировок с поиском.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    load = commands.add_parser('ingest', help='загрузить тренировки')
+    load.add_argument('db')
+    load.add_argument('path', help='файл JSONL, "-" - стандартный ввод')
+    find = commands.add_parser('query', help='найти тренировки')
+    find.add_argument('db')
+    find.add_argument('--athlete')
+    find.add_argument('--type', dest='workout_type',
+                      help='код вида тренировки, например SWM')
+    find.add_argument('--since', help='с этого дня (ISO), включительно')
+    find.add_argument('--until', help='по этот день (ISO), включительно')
+    for name in ('calories', 'distance'):
+        find.add_argument(f'--min-{name}', type=float)
+        find.add_argument(f'--max-{name}', type=float)
+    find.add_argument('--limit', type=int)
+    find.add_argument('--count', action='store_true',
+                      help='вывести только число найденных')
+    compact = commands.add_parser('compact', help='перенести журнал '
+                                                  'в индексы')
+    compact.add_argument('db')
+    compact.add_argument('--dedupe', action='store_true')
+    compact.add_argument('--vacuum', action='store_true')
+    return parser
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа командной строки."""
+    args = build_parser().parse_args(argv)
+    with ResultStore(args.db) as store:
+        if args.command == 'ingest':
+            if args.path == '-':
+                _, errors = ingest(store, sys.stdin)
+            else:
+                with open(args.path, encoding='utf-8') as stream:
+                    _, errors = ingest(store, stream)
+            return 1 if errors else 0
+        if args.command == 'compact':
+            store.compact(args.dedupe, args.vacuum)
+            return 0
+        filters = {name: getattr(args, name) for name in (
+            'athlete', 'workout_type', 'since', 'until', 'min_calories',
+            'max_calories', 'min_distance', 'max_distance',
+        )}
+        if args.count:
+            print(store.count(**filters))
+            return 0
+        for item in store.iter_query(limit=args.limit, **filters):
+            print(f'{item.day} {item.athlete}: {item.info.get_message()}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
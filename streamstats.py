@@ -0,0 +1,261 @@
+"""Статистика по потоку результатов с ограниченной памятью.
+
+Для таблиц лидеров и поиска аномалий нужны самые «калорийные»
+тренировки и перцентили скорости по видам спорта на миллиардах
+результатов, которые нельзя держать в памяти.
+
+TopK - k лучших по ключу на куче из k элементов.
+QuantileSketch - квантили с относительной погрешностью alpha
+(DDSketch): значения раскладываются по корзинам с границами
+gamma ** i, gamma = (1 + alpha) / (1 - alpha), а квантиль берётся
+из середины нужной корзины. Корзин не больше max_bins: при
+переполнении сливаются самые младшие, поэтому точность верхних
+перцентилей (p95, p99) сохраняется.
+
+Оба объекта можно складывать (merge): итоги параллельных
+обработчиков складываются в те же ответы, что дал бы один поток,
+у скетча - в точности те же корзины. StreamStats собирает их
+по видам тренировок и встаёт в конвейер через observe() или
+pipeline.run(on_result=...).
+"""
+import heapq
+import math
+from dataclasses import asdict
+from operator import attrgetter
+from typing import (Any, Callable, Dict, Generic, Iterable, Iterator, List,
+                    Optional, Sequence, Tuple, TypeVar)
+
+from homework import InfoMessage
+
+ALPHA: float = 0.01
+MAX_BINS: int = 2048
+TOP_K: int = 10
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+T = TypeVar('T')
+
+
+class TopK(Generic[T]):
+    """k элементов с наибольшим key; при равенстве - пришедшие раньше."""
+
+    def __init__(self, k: int = TOP_K,
+                 key: Callable[[T], float] = attrgetter('calories')) -> None:
+        if k < 1:
+            raise ValueError('k должен быть положительным')
+        self.k = k
+        self.key = key
+        # Минимальная куча (ключ, -номер, элемент): на вершине -
+        # худший из лучших, при равных ключах - самый поздний.
+        self._heap: List[Tuple[float, int, T]] = []
+        self._added = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _push(self, entry: Tuple[float, int, T]) -> None:
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def _next(self) -> int:
+        self._added += 1
+        return -self._added
+
+    def add(self, item: T) -> None:
+        self._push((self.key(item), self._next(), item))
+
+    def merge(self, other: 'TopK[T]') -> None:
+        """Добавить лучшие из other (пришедшие после своих)."""
+        for value, _, item in sorted(other._heap, key=lambda entry: (
+                -entry[0], -entry[1])):
+            self._push((value, self._next(), item))
+
+    def items(self) -> List[T]:
+        """Лучшие элементы по убыванию ключа."""
+        return [item for _, _, item in sorted(
+            self._heap, key=lambda entry: entry[:2], reverse=True
+        )]
+
+
+class QuantileSketch:
+    """Квантили потока чисел с относительной погрешностью alpha."""
+
+    def __init__(self, alpha: float = ALPHA,
+                 max_bins: int = MAX_BINS) -> None:
+        if not 0 < alpha < 1:
+            raise ValueError('alpha должна быть между 0 и 1')
+        if max_bins < 1:
+            raise ValueError('max_bins должен быть положительным')
+        self.alpha = alpha
+        self.max_bins = max_bins
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        # Индекс корзины -> число значений; отдельно нули
+        # и отрицательные (по модулю).
+        self.bins: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float) -> None:
+        if not math.isfinite(value):
+            raise ValueError(f'{value!r}: ожидалось конечное число')
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value > 0:
+            bins = self.bins
+        elif value < 0:
+            bins, value = self.negative, -value
+        else:
+            self.zeros += 1
+            return
+        index = self._index(value)
+        bins[index] = bins.get(index, 0) + 1
+        if len(bins) > self.max_bins:
+            self._collapse(bins)
+
+    def _collapse(self, bins: Dict[int, int]) -> None:
+        """Слить младшие корзины в одну, оставив max_bins."""
+        indexes = sorted(bins)
+        extra = indexes[:len(bins) - self.max_bins + 1]
+        if bins is self.negative:
+            # У отрицательных младшие по модулю - ближние к нулю,
+            # важнее хвост больших по модулю: сливаем их к старшим.
+            extra = indexes[self.max_bins - 1:]
+        target = extra[-1] if bins is self.bins else extra[0]
+        merged = sum(bins.pop(index) for index in extra)
+        bins[target] = merged
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        if other.gamma != self.gamma:
+            raise ValueError('нельзя сложить скетчи с разной точностью')
+        for mine, theirs in ((self.bins, other.bins),
+                             (self.negative, other.negative)):
+            for index, weight in theirs.items():
+                mine[index] = mine.get(index, 0) + weight
+            if len(mine) > self.max_bins:
+                self._collapse(mine)
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Значение с рангом floor(q * (count - 1)) среди отсортированных,
+        с относительной погрешностью alpha.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError('q должен быть от 0 до 1')
+        if not self.count:
+            raise ValueError('скетч пуст')
+        rank = math.floor(q * (self.count - 1))
+        # Края известны точно.
+        if rank == 0:
+            return self.min
+        if rank == self.count - 1:
+            return self.max
+        seen = 0
+        estimate = self.max
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                estimate = -self._value(index)
+                break
+        else:
+            seen += self.zeros
+            if seen > rank:
+                estimate = 0.0
+            else:
+                for index in sorted(self.bins):
+                    seen += self.bins[index]
+                    if seen > rank:
+                        estimate = self._value(index)
+                        break
+        return max(self.min, min(estimate, self.max))
+
+    def get_mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class StreamStats:
+    """Лучшие по калориям и квантили скорости по видам тренировок."""
+
+    def __init__(self, k: int = TOP_K, alpha: float = ALPHA,
+                 max_bins: int = MAX_BINS,
+                 quantiles: Sequence[float] = QUANTILES) -> None:
+        self.k = k
+        self.alpha = alpha
+        self.max_bins = max_bins
+        self.quantiles = tuple(quantiles)
+        self.top: Dict[str, TopK[InfoMessage]] = {}
+        self.speed: Dict[str, QuantileSketch] = {}
+
+    def new(self) -> 'StreamStats':
+        """Пустой объект с теми же настройками (например, для обработчика).
+        """
+        return StreamStats(self.k, self.alpha, self.max_bins,
+                           self.quantiles)
+
+    def add(self, info: InfoMessage) -> None:
+        training_type = info.training_type
+        top = self.top.get(training_type)
+        if top is None:
+            top = self.top[training_type] = TopK(self.k)
+            self.speed[training_type] = QuantileSketch(self.alpha,
+                                                       self.max_bins)
+        top.add(info)
+        self.speed[training_type].add(info.speed)
+
+    def observe(self, messages: Iterable[InfoMessage]
+                ) -> Iterator[InfoMessage]:
+        """Пропустить сообщения дальше, попутно учитывая их."""
+        for info in messages:
+            self.add(info)
+            yield info
+
+    def merge(self, other: 'StreamStats') -> None:
+        for training_type in sorted(other.top):
+            if training_type not in self.top:
+                self.top[training_type] = TopK(self.k)
+                self.speed[training_type] = QuantileSketch(self.alpha,
+                                                           self.max_bins)
+            self.top[training_type].merge(other.top[training_type])
+            self.speed[training_type].merge(other.speed[training_type])
+
+    def leaders(self, k: Optional[int] = None) -> List[InfoMessage]:
+        """Лучшие по калориям среди всех видов."""
+        overall: TopK[InfoMessage] = TopK(k or self.k)
+        for training_type in sorted(self.top):
+            overall.merge(self.top[training_type])
+        return overall.items()
+
+    def summary(self) -> Dict[str, Any]:
+        """Сводка по видам для JSON."""
+        result = {}
+        for training_type in sorted(self.top):
+            sketch = self.speed[training_type]
+            result[training_type] = {
+                'count': sketch.count,
+                'speed': dict(
+                    mean=sketch.get_mean(),
+                    **{f'p{q * 100:g}': sketch.quantile(q)
+                       for q in self.quantiles}
+                ),
+                'top_calories': [
+                    asdict(info) for info in self.top[training_type].items()
+                ],
+            }
+        return result
@@ -0,0 +1,71 @@
+from datetime import date, datetime
+
+import pytest
+
+import aggregate
+import homework
+
+WORKOUTS = [
+    ('anna', date(2026, 10, 12), ('RUN', [15000, 1, 75])),
+    ('anna', datetime(2026, 10, 12, 19, 30), ('RUN', [9000, 1, 75])),
+    ('anna', date(2026, 10, 14), ('SWM', [720, 1, 80, 25, 40])),
+    ('anna', date(2026, 10, 19), ('RUN', [1206, 12, 6])),
+    ('boris', date(2026, 10, 12), ('WLK', [9000, 1, 75, 180])),
+]
+
+
+def build(period, workouts=WORKOUTS):
+    aggregator = aggregate.Aggregator(period)
+    for athlete, when, package in workouts:
+        aggregator.add_training(
+            athlete, when, homework.read_package(*package)
+        )
+    return aggregator
+
+
+def test_daily_totals():
+    aggregator = build('day')
+    totals = aggregator.get('anna', date(2026, 10, 12), 'Running')
+    first, second = (
+        homework.read_package(*package).show_training_info()
+        for _, _, package in WORKOUTS[:2]
+    )
+    assert totals.count == 2
+    assert totals.distance == first.distance + second.distance
+    assert totals.calories == first.calories + second.calories
+    assert totals.get_mean_speed() == (first.speed + second.speed) / 2
+    assert aggregator.get('anna', date(2026, 10, 13), 'Running').count == 0
+
+
+def test_weekly_totals():
+    aggregator = build('week')
+    assert aggregator.get('anna', date(2026, 10, 18), 'Running').count == 2
+    assert aggregator.get('anna', date(2026, 10, 19), 'Running').count == 1
+    assert len(aggregator) == 4
+
+
+def test_merge_matches_sequential():
+    left = build('week', WORKOUTS[:2])
+    left.merge(build('week', WORKOUTS[2:]))
+    assert list(left.items()) == list(build('week').items()), (
+        'Сумма частичных итогов должна совпадать с итогами по всей истории.'
+    )
+    with pytest.raises(ValueError):
+        left.merge(build('day'))
+
+
+def test_snapshot_round_trip(tmp_path):
+    aggregator = build('week')
+    path = str(tmp_path / 'state.json')
+    aggregator.save(path)
+    restored = aggregate.Aggregator.load(path)
+    assert restored.period == 'week'
+    assert list(restored.items()) == list(aggregator.items())
+    restored.add_training('anna', date(2026, 10, 13),
+                          homework.read_package('RUN', [1000, 1, 70]))
+    assert restored.get('anna', date(2026, 10, 13), 'Running').count == 3
+
+
+def test_unknown_period():
+    with pytest.raises(ValueError):
+        aggregate.Aggregator('month')
@@ -0,0 +1,96 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import binfmt
+import homework
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+    ('SWM', [720, 1.5, 80]),
+    ('RUN', [1206, 12, 6]),
+    ('RUN', [1500.0, 1, 75]),
+]
+
+
+def test_record_sizes():
+    assert binfmt.PACKAGE_DTYPE.itemsize == 56
+    assert binfmt.RESULT_DTYPE.itemsize == 40
+
+
+def test_packages_round_trip():
+    records = binfmt.packages_to_array(PACKAGES)
+    restored = list(binfmt.array_to_packages(records))
+    assert [workout_type for workout_type, _ in restored] == [
+        workout_type for workout_type, _ in PACKAGES
+    ]
+    for (_, data), (_, expected) in zip(restored, PACKAGES):
+        assert data[:len(expected)] == expected, (
+            'Пакет должен восстанавливаться из двоичной записи без потерь.'
+        )
+
+
+@pytest.mark.parametrize('package, error', [
+    (('XXX', [1, 2, 3]), KeyError),
+    (('RUN', [1, 2]), TypeError),
+    (('WLK', [1, 2, 3, 4, 5]), TypeError),
+    (('RUN', [720.7, 1, 75]), ValueError),
+    (('SWM', [720, 1, 80, 25, 40.9]), ValueError),
+    (('SWM', [720, 1, 80, 25, float('nan')]), ValueError),
+])
+def test_packages_to_array_rejects(package, error):
+    with pytest.raises(error):
+        binfmt.packages_to_array([package])
+
+
+def test_file_round_trip(tmp_path):
+    path = tmp_path / 'packages.bin'
+    binfmt.write_packages(path, PACKAGES[:2])
+    binfmt.write_packages(path, PACKAGES[2:])
+    records = binfmt.open_packages(path)
+    assert isinstance(records, np.memmap), (
+        'Файл должен читаться через отображение в память.'
+    )
+    assert len(records) == len(PACKAGES)
+    assert np.shares_memory(records['duration'], records), (
+        'Столбцы должны быть представлениями без копирования.'
+    )
+
+    results = binfmt.compute_records(records)
+    binfmt.write_results(tmp_path / 'results.bin', results)
+    messages = list(binfmt.array_to_messages(
+        binfmt.open_results(tmp_path / 'results.bin')
+    ))
+    expected = [
+        homework.read_package(*package).show_training_info()
+        for package in PACKAGES
+    ]
+    assert [message.get_message() for message in messages] == [
+        message.get_message() for message in expected
+    ]
+    assert binfmt.messages_to_array(expected).tobytes() == results.tobytes()
+
+
+def test_open_rejects_wrong_file(tmp_path):
+    path = tmp_path / 'packages.bin'
+    binfmt.write_packages(path, PACKAGES)
+    with pytest.raises(ValueError):
+        binfmt.open_results(path)
+    with open(path, 'ab') as stream:
+        stream.write(b'\0')
+    with pytest.raises(ValueError):
+        binfmt.open_packages(path)
+
+
+def test_append_checks_header(tmp_path):
+    path = tmp_path / 'packages.bin'
+    binfmt.write_packages(path, PACKAGES)
+    before = path.read_bytes()
+    results = binfmt.compute_records(binfmt.open_packages(path))
+    with pytest.raises(ValueError):
+        binfmt.write_results(path, results)
+    assert path.read_bytes() == before, (
+        'Результаты нельзя дописывать в файл с пакетами.'
+    )
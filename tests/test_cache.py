@@ -0,0 +1,130 @@
+from dataclasses import MISSING
+from io import BytesIO
+
+import pytest
+
+import homework
+import pipeline
+import workouts
+from cache import ResultCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def expected(workout_type, data):
+    return homework.read_package(workout_type, data).show_training_info()
+
+
+def test_hits_and_lru_eviction():
+    cache = ResultCache(maxsize=2)
+    assert cache.get('RUN', [15000, 1, 75]) == expected('RUN', [15000, 1, 75])
+    cache.get('WLK', [9000, 1, 75, 180])
+    cache.get('RUN', (15000, 1, 75))
+    cache.get('SWM', [720, 1, 80, 25, 40])
+    assert len(cache) == 2
+    cache.get('RUN', [15000, 1, 75])
+    cache.get('WLK', [9000, 1, 75, 180])
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.evictions) == (2, 4, 2), (
+        'Вытесняться должна самая давно использованная запись.'
+    )
+
+
+def test_int_and_float_are_different_keys():
+    cache = ResultCache()
+    as_int = cache.get('RUN', [15000, 1, 75])
+    as_float = cache.get('RUN', [15000, 1.0, 75])
+    assert type(as_int.duration) is int and type(as_float.duration) is float
+    assert cache.stats.misses == 2
+
+
+def test_ttl():
+    clock = Clock()
+    cache = ResultCache(ttl=60, clock=clock)
+    cache.get('RUN', [15000, 1, 75])
+    clock.now += 30
+    cache.get('RUN', [15000, 1, 75])
+    clock.now += 61
+    cache.get('RUN', [15000, 1, 75])
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.expirations) == (1, 2, 1)
+
+
+def test_errors_are_not_cached():
+    cache = ResultCache()
+    with pytest.raises(KeyError):
+        cache.get('XXX', [1, 2, 3])
+    assert len(cache) == 0
+
+
+def test_disk_store_is_shared_between_runs(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    with ResultCache(path=path) as cache:
+        cache.get('SWM', [720, 1, 80, 25, 40])
+        cache.get('RUN', [15000, 1.0, 75])
+    with ResultCache(path=path) as cache:
+        swimming = cache.get('SWM', [720, 1, 80, 25, 40])
+        running = cache.get('RUN', [15000, 1.0, 75])
+        assert cache.stats.disk_hits == 2 and cache.stats.misses == 0
+    assert swimming == expected('SWM', [720, 1, 80, 25, 40])
+    assert running == expected('RUN', [15000, 1.0, 75])
+    assert type(running.duration) is float, (
+        'Тип значений должен переживать запись на диск.'
+    )
+
+
+def test_changed_workout_is_not_served_from_cache(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    base = (('action', MISSING), ('duration', MISSING), ('weight', MISSING))
+    old = workouts.WorkoutDefinition('XCAL', 'XCal', base,
+                                     calories='weight * 2')
+    new = workouts.WorkoutDefinition('XCAL', 'XCal', base,
+                                     calories='weight * 3')
+    assert workouts.version(old) == workouts.version(
+        workouts.WorkoutDefinition('XCAL', 'XCal', base,
+                                   calories='weight * 2')
+    ), 'Версия не должна зависеть от процесса.'
+    workouts.register(old)
+    try:
+        memory = ResultCache()
+        with ResultCache(path=path) as disk:
+            assert memory.get('XCAL', [1000, 1, 70]).calories == 140
+            assert disk.get('XCAL', [1000, 1, 70]).calories == 140
+        workouts.unregister('XCAL')
+        workouts.register(new)
+        with ResultCache(path=path) as disk:
+            for cache in (memory, disk):
+                assert cache.get('XCAL', [1000, 1, 70]).calories == 210, (
+                    'После правки описания вида кэш не должен отдавать '
+                    'старый результат.'
+                )
+    finally:
+        workouts.unregister('XCAL')
+
+
+def test_pipeline_with_cache():
+    source = b'["RUN", [15000, 1, 75]]\n' * 3 + b'["XXX", [1, 2, 3]]\n'
+    plain, cached = BytesIO(), BytesIO()
+    pipeline.run(BytesIO(source), plain, on_error=lambda record: None)
+    cache = ResultCache()
+    assert pipeline.run(BytesIO(source), cached, cache=cache,
+                        on_error=lambda record: None) == (3, 1)
+    assert cached.getvalue() == plain.getvalue()
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+
+def test_cache_with_workers_is_rejected(tmp_path, capsys):
+    path = tmp_path / 'packages.jsonl'
+    path.write_text('["RUN", [15000, 1, 75]]\n', encoding='utf-8')
+    for flags in (['--cache-size', '10'], ['--cache-file', 'cache.db']):
+        with pytest.raises(SystemExit):
+            pipeline.cli([str(path), '-j', '2', *flags])
+        assert '-j' in capsys.readouterr().err, (
+            'Кэш с -j не должен молча игнорироваться.'
+        )
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PACKAGES = BASE_DIR / 'examples' / 'packages.jsonl'
+# Модули, которые import homework не должен тянуть за собой.
+HEAVY = {'numpy', 'pipeline', 'render', 'binfmt', 'server', 'asyncio',
+         'sqlite3', 'json', 'argparse', 'concurrent.futures'}
+
+
+def python(*args, env=None, stdin=None):
+    return subprocess.run(
+        [sys.executable, *args], cwd=BASE_DIR, env=env, input=stdin,
+        capture_output=True, check=False,
+    )
+
+
+def test_import_homework_is_lazy():
+    result = python('-c', 'import sys, homework; print(*sorted(sys.modules))')
+    loaded = set(result.stdout.decode().split())
+    assert not HEAVY & loaded, (
+        f'`import homework` не должен загружать {sorted(HEAVY & loaded)}.'
+    )
+
+
+@pytest.fixture
+def worker(tmp_path):
+    path = str(tmp_path / 'homework.sock')
+    server = subprocess.Popen(
+        [sys.executable, 'server.py', '--unix', path], cwd=BASE_DIR
+    )
+    deadline = time.monotonic() + 10
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield path
+    server.terminate()
+    server.wait()
+
+
+def test_client_uses_worker(worker):
+    expected = python('homework.py', str(PACKAGES)).stdout
+    env = dict(os.environ, HOMEWORK_SOCKET=worker)
+    result = python('client.py', str(PACKAGES), env=env)
+    assert (result.returncode, result.stdout) == (0, expected), (
+        'Клиент должен печатать то же, что и локальный расчёт.'
+    )
+    bad = b'["XXX", [1, 2, 3]]\n["RUN", [15000, 1, 75]]\n'
+    result = python('client.py', env=env, stdin=bad)
+    local = python('client.py', stdin=bad)
+    assert result.returncode == local.returncode == 1
+    assert result.stdout == local.stdout, (
+        'Ошибки не должны попадать в отчёт, как и без обработчика.'
+    )
+    assert result.stderr.decode().startswith('ошибка: ')
+    assert local.stderr
+
+
+def test_client_falls_back_to_local(tmp_path):
+    env = dict(os.environ, HOMEWORK_SOCKET=str(tmp_path / 'missing.sock'))
+    result = python('client.py', str(PACKAGES), '-t', 'csv', env=env)
+    assert result.returncode == 0
+    assert result.stdout.decode().splitlines()[0] == (
+        'training_type,duration,distance,speed,calories'
+    )
@@ -0,0 +1,235 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from io import BytesIO
+
+import pytest
+
+import cluster
+import pipeline
+
+SOURCE = (
+    '["SWM", [720, 1, 80, 25, 40]]\n'
+    '["RUN", [15000, 1, 75]]\n'
+    '["XXX", [1, 2, 3]]\n'
+    '["WLK", [9000, 1, 75, 180]]\n'
+    '["RUN", [1, 0, 3]]\n'
+    '["RUN", [1206, 12, 6]]'
+) * 5
+
+
+@pytest.fixture
+def packages_file(tmp_path):
+    path = tmp_path / 'packages.jsonl'
+    path.write_text(SOURCE, encoding='utf-8')
+    return str(path)
+
+
+def expected_run():
+    out = BytesIO()
+    errors = []
+    result = pipeline.run(BytesIO(SOURCE.encode('utf-8')), out,
+                          on_error=errors.append)
+    return result, out.getvalue(), errors
+
+
+def run_with_threads(workdir, packages_file, workers, **kwargs):
+    """Координатор и узлы-потоки на одном рабочем каталоге."""
+    coordinator = cluster.Coordinator(workdir, poll=0.001)
+    shards = coordinator.submit(packages_file, shard_size=40)
+    threads = [threading.Thread(target=worker.run) for worker in workers]
+    for thread in threads:
+        thread.start()
+    out = BytesIO()
+    errors = []
+    try:
+        result = coordinator.collect(shards, out, errors.append, **kwargs)
+    finally:
+        coordinator.stop()
+        for thread in threads:
+            thread.join()
+    return coordinator, result, out.getvalue(), errors
+
+
+def test_run_cluster_matches_pipeline(packages_file):
+    (written, failed), expected_out, expected_errors = expected_run()
+    out = BytesIO()
+    errors = []
+    result = cluster.run_cluster(
+        packages_file, out, nodes=2, shard_size=40, on_error=errors.append,
+    )
+    assert result[:2] == (written, failed)
+    assert out.getvalue() == expected_out, (
+        'Отчёт должен склеиваться в порядке диапазонов.'
+    )
+    assert errors == expected_errors, (
+        'Номера ошибочных строк должны считаться от начала файла.'
+    )
+    totals = result[2]
+    assert sum(item.count for item in totals.values()) == written
+    assert set(totals) == {'Swimming', 'Running', 'SportsWalking'}
+
+
+def test_failed_shard_is_retried(packages_file, tmp_path):
+    failures = []
+
+    def flaky(task):
+        if task.shard == 1 and task.attempt == 1:
+            failures.append(task.shard)
+            raise OSError('диск отвалился')
+        return cluster.compute_shard(task)
+
+    workdir = str(tmp_path / 'work')
+    workers = [cluster.Worker(workdir, f'node{index}', flaky, poll=0.001)
+               for index in range(2)]
+    coordinator, result, out, errors = run_with_threads(
+        workdir, packages_file, workers
+    )
+    expected, expected_out, expected_errors = expected_run()
+    assert failures == [1]
+    assert coordinator.retries == 1, 'Упавший диапазон нужно пересчитать.'
+    assert result[:2] == expected
+    assert out == expected_out and errors == expected_errors
+
+
+def test_shard_failing_every_time_stops_run(packages_file, tmp_path):
+    def broken(task):
+        if task.shard == 0:
+            raise ValueError('битый диапазон')
+        return cluster.compute_shard(task)
+
+    workdir = str(tmp_path / 'work')
+    with pytest.raises(RuntimeError, match='битый диапазон'):
+        run_with_threads(workdir, packages_file,
+                         [cluster.Worker(workdir, 'node0', broken, 0.001)])
+
+
+def test_expired_lease_is_requeued(packages_file, tmp_path):
+    workdir = str(tmp_path / 'work')
+    coordinator = cluster.Coordinator(workdir, lease=60)
+    coordinator.submit(packages_file, shard_size=1 << 20)
+    lost = cluster.Worker(workdir, 'lost')
+    running, task = lost.claim()
+    coordinator.check()
+    assert os.path.exists(running), 'Свежее задание забирать рано.'
+    os.utime(running, (0, 0))
+    coordinator.check()
+    assert not os.path.exists(running)
+    assert os.listdir(os.path.join(workdir, cluster.TODO)) == [
+        f'{task.get_name()}.json'
+    ], 'Просроченное задание должно вернуться в очередь.'
+    _, again = cluster.Worker(workdir, 'node1').claim()
+    assert again.attempt == 2
+
+
+def test_dead_worker_tasks_are_requeued(packages_file, tmp_path):
+    workdir = str(tmp_path / 'work')
+    coordinator = cluster.Coordinator(workdir)
+    coordinator.submit(packages_file, shard_size=1 << 20)
+    running, _ = cluster.Worker(workdir, 'node0').claim()
+    coordinator.check(dead_workers=['node0'])
+    assert not os.path.exists(running)
+    assert len(os.listdir(os.path.join(workdir, cluster.TODO))) == 1
+
+
+def test_worker_id_without_dots(tmp_path, monkeypatch):
+    with pytest.raises(ValueError):
+        cluster.Worker(str(tmp_path), 'node.1')
+    monkeypatch.setattr(cluster.socket, 'gethostname',
+                        lambda: 'node1.example.com')
+    worker = cluster.Worker(str(tmp_path))
+    assert '.' not in worker.worker_id, (
+        'Имя хоста с точками не должно мешать запуску узла без --id.'
+    )
+
+
+def test_reused_workdir_ignores_previous_run(packages_file, tmp_path):
+    other = tmp_path / 'other.jsonl'
+    other.write_text('["RUN", [15000, 1, 75]]\n' * 40, encoding='utf-8')
+    workdir = str(tmp_path / 'work')
+    cluster.Coordinator(workdir).submit(str(other), shard_size=40)
+    stale = cluster.Worker(workdir, 'stale')
+    stale.run_once()
+    stale.claim()
+    coordinator, result, out, errors = run_with_threads(
+        workdir, packages_file,
+        [cluster.Worker(workdir, 'node0', poll=0.001)],
+    )
+    expected, expected_out, expected_errors = expected_run()
+    assert result[:2] == expected
+    assert out == expected_out and errors == expected_errors, (
+        'Файлы прошлого прогона не должны попадать в новый отчёт.'
+    )
+
+
+def test_claim_is_fresh_before_coordinator_looks(packages_file, tmp_path,
+                                                 monkeypatch):
+    workdir = str(tmp_path / 'work')
+    coordinator = cluster.Coordinator(workdir, lease=60)
+    coordinator.submit(packages_file, shard_size=1 << 20)
+    todo = os.path.join(workdir, cluster.TODO)
+    for name in os.listdir(todo):
+        os.utime(os.path.join(todo, name), (0, 0))
+    rename = os.rename
+
+    def rename_then_check(source, target):
+        rename(source, target)
+        coordinator.check()
+        assert os.path.exists(target), (
+            'Задание, давно лежавшее в todo, нельзя отобрать сразу '
+            'после переименования.'
+        )
+
+    monkeypatch.setattr(cluster.os, 'rename', rename_then_check)
+    assert cluster.Worker(workdir, 'node0').claim() is not None
+
+
+def test_lease_is_refreshed_while_processing(packages_file, tmp_path):
+    workdir = str(tmp_path / 'work')
+    coordinator = cluster.Coordinator(workdir, lease=1)
+    coordinator.submit(packages_file, shard_size=1 << 20)
+    seen = []
+
+    def slow(task):
+        running = os.path.join(workdir, cluster.RUNNING,
+                               f'{task.get_name()}.node0.json')
+        os.utime(running, (0, 0))
+        time.sleep(0.2)
+        coordinator.check()
+        seen.append(os.path.exists(running))
+        return cluster.compute_shard(task)
+
+    cluster.Worker(workdir, 'node0', slow, heartbeat=0.01).run_once()
+    assert seen == [True], (
+        'Пока задание считается, узел должен обновлять аренду.'
+    )
+    assert coordinator.retries == 0
+
+
+def test_crashing_worker_stops_run(packages_file, monkeypatch):
+    spawned = []
+
+    def crash(workdir, worker_id, heartbeat=cluster.HEARTBEAT):
+        spawned.append(worker_id)
+        return subprocess.Popen([sys.executable, '-c', 'raise SystemExit(3)'])
+
+    monkeypatch.setattr(cluster, '_spawn', crash)
+    with pytest.raises(cluster.WorkerError) as info:
+        cluster.run_cluster(packages_file, BytesIO(), nodes=1,
+                            max_restarts=2)
+    assert info.value.returncode == 3, 'Нужен код выхода самого узла.'
+    assert spawned == ['node0'] * 3, (
+        'Упавший узел перезапускается не больше max_restarts раз.'
+    )
+
+
+def test_nodes_zero_needs_workdir(packages_file, capsys):
+    with pytest.raises(ValueError):
+        cluster.run_cluster(packages_file, BytesIO(), nodes=0)
+    with pytest.raises(SystemExit):
+        cluster.cli(['run', packages_file, '--nodes', '0'])
+    assert '--dir' in capsys.readouterr().err, (
+        'Без --dir координатор ждал бы узлы вечно.'
+    )
@@ -0,0 +1,105 @@
+import os
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import fixedpoint
+import homework
+import render
+
+# Размер каждой случайной выборки; для долгой проверки перед релизом:
+# HOMEWORK_DIFF_ROWS=10000000 pytest tests/test_fixedpoint.py
+ROWS = int(os.environ.get('HOMEWORK_DIFF_ROWS', 50_000))
+NAMES = ('Running', 'SportsWalking', 'Swimming')
+
+
+def random_columns(seed, rows=ROWS):
+    """Значения от 1e-6 до 1e12 обоих знаков и с близкими к середине
+    тысячными: кратные 1/2000, двоичные середины вида k/16 и т. п.
+    """
+    rng = np.random.default_rng(seed)
+    columns = []
+    for _ in range(4):
+        magnitude = 10.0 ** rng.integers(-6, 12, rows)
+        values = rng.random(rows) * magnitude
+        ties = rng.random(rows) < 0.2
+        values[ties] = rng.integers(0, 10 ** 7, ties.sum()) / 2000
+        binary = rng.random(rows) < 0.1
+        values[binary] = rng.integers(0, 10 ** 5, binary.sum()) / 16
+        values[rng.random(rows) < 0.3] *= -1
+        columns.append(values)
+    types = np.asarray(NAMES)[rng.integers(0, len(NAMES), rows)]
+    return types, columns
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_render_fixed_matches_float_path(seed):
+    types, columns = random_columns(seed)
+    assert fixedpoint.render_fixed(types, *columns) == (
+        render.render_columns(types, *columns)
+    ), 'Отчёт через тысячные должен совпадать с форматированием float.'
+
+
+def test_special_values():
+    values = [0.0, -0.0, 0.0625, -0.0004, 0.0005, 999.9995, 1e300,
+              float('inf'), float('-inf'), float('nan'), 2.0 ** 53, 5e-324]
+    columns = [values] * 4
+    types = ['Running'] * len(values)
+    assert fixedpoint.render_fixed(types, *columns) == (
+        render.render_columns(types, *columns)
+    )
+    units, negative, exact = fixedpoint.to_fixed(values)
+    assert units[:2].tolist() == [0, 0] and negative[:2].tolist() == [
+        False, True
+    ], '-0.0 печатается как -0.000.'
+    assert units[2:5].tolist() == [62, 0, 1] and exact[:6].all(), (
+        'Середины округляются как у %.3f: 0.0625 - к чётному.'
+    )
+    assert not exact[6:11].any(), 'inf, nan и огромные числа - через float.'
+
+
+def random_packages(seed, rows):
+    rnd = random.Random(seed)
+    packages = []
+    for _ in range(rows):
+        workout_type = rnd.choice(('RUN', 'WLK', 'SWM'))
+        # Маленькие целые шаги дают дистанции ровно на середине
+        # тысячных (10 шагов - 0.0065 км).
+        action = rnd.choice([rnd.randint(1, 100), rnd.randint(1, 10 ** 6)])
+        duration = rnd.choice([rnd.randint(1, 12),
+                               round(rnd.uniform(0.01, 5), 3)])
+        weight = rnd.choice([rnd.randint(30, 150),
+                             round(rnd.uniform(30, 150), 1)])
+        if workout_type == 'WLK':
+            data = [action, duration, weight, rnd.randint(100, 220)]
+        elif workout_type == 'SWM':
+            data = [action, duration, weight, rnd.choice([25, 50]),
+                    rnd.randint(1, 100)]
+        else:
+            data = [action, duration, weight]
+        packages.append((workout_type, data))
+    return packages
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_render_batch_matches_get_message(seed):
+    packages = random_packages(seed, ROWS // 10)
+    columns = {name: [] for name in ('action', 'duration', 'weight',
+                                     'height', 'length_pool', 'count_pool')}
+    for workout_type, data in packages:
+        training = homework.read_package(workout_type, data)
+        for name in columns:
+            columns[name].append(getattr(training, name, 0))
+    expected = ''.join(
+        homework.read_package(*package).show_training_info().get_message()
+        + '\n' for package in packages
+    ).encode('utf-8')
+    assert fixedpoint.render_batch(
+        [workout_type for workout_type, _ in packages], *columns.values()
+    ) == expected, 'Отчёт должен совпадать с get_message по каждой строке.'
+
+
+def test_empty():
+    assert fixedpoint.render_fixed([], [], [], [], []) == b''
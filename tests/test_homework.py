@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 import pytest
 import types
 import inspect
@@ -384,3 +386,131 @@ def test_main_output(input_data, expected):
     assert get_message_output == expected, (
         'Метод `main` должен печатать результат в консоль.\n'
     )
+
+
+@pytest.mark.parametrize('input_data', [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('SWM', [1206, 12, 6, 12, 6]),
+    ('RUN', [15000, 1, 75]),
+    ('RUN', [1206, 12, 6]),
+    ('WLK', [9000, 1, 75, 180]),
+    ('WLK', [420, 4, 20, 42]),
+])
+def test_compute_batch(input_data):
+    np = pytest.importorskip('numpy')
+    workout_type, data = input_data
+    info = homework.read_package(workout_type, data).show_training_info()
+    height = data[3] if workout_type == 'WLK' else 0
+    length_pool, count_pool = data[3:] if workout_type == 'SWM' else (0, 0)
+    distance, speed, calories = homework.compute_batch(
+        [workout_type], [data[0]], [data[1]], [data[2]],
+        [height], [length_pool], [count_pool]
+    )
+    assert isinstance(distance, np.ndarray), (
+        '`compute_batch` должна возвращать массивы NumPy.'
+    )
+    assert (distance[0], speed[0], calories[0]) == (
+        info.distance, info.speed, info.calories
+    ), (
+        'Результат `compute_batch` должен совпадать '
+        'с результатом `show_training_info`.'
+    )
+
+
+def test_compute_batch_unknown_type():
+    pytest.importorskip('numpy')
+    with pytest.raises(KeyError):
+        homework.compute_batch(['XXX'], [1], [1], [1], [0], [0], [0])
+
+
+@pytest.mark.parametrize('input_data', [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+])
+def test_get_metrics(input_data):
+    training = homework.read_package(*input_data)
+    metrics = training.get_metrics()
+    assert metrics == (
+        training.get_distance(),
+        training.get_mean_speed(),
+        training.get_spent_calories(),
+    ), (
+        '`get_metrics` должен совпадать с отдельными методами.'
+    )
+    training.duration = 2
+    assert training.get_metrics() == (
+        training.get_distance(),
+        training.get_mean_speed(),
+        training.get_spent_calories(),
+    ), (
+        'После изменения полей `get_metrics` должен пересчитать результат.'
+    )
+
+
+def test_get_metrics_uses_overridden_methods():
+    class Fixed(homework.Running):
+        def get_spent_calories(self):
+            return 42
+
+    class Fast(homework.Training):
+        def get_mean_speed(self):
+            return 99
+
+        def get_spent_calories(self):
+            return self.get_mean_speed() * 2
+
+    info = Fixed(15000, 1, 75).show_training_info()
+    assert info.calories == 42, (
+        'Переопределённый `get_spent_calories` должен учитываться.'
+    )
+    info = Fast(15000, 1, 75).show_training_info()
+    assert (info.speed, info.calories) == (99, 198), (
+        'Переопределённый `get_mean_speed` должен учитываться.'
+    )
+
+
+@pytest.mark.parametrize('input_data', [
+    ('RUN', [15000, 1]),
+    ('WLK', [9000, 1, 75]),
+    ('SWM', [720, 1, 80, 25, 40, 1]),
+])
+def test_read_package_wrong_arity(input_data):
+    with pytest.raises(TypeError):
+        homework.read_package(*input_data)
+
+
+def test_read_packages():
+    packages = [
+        ('SWM', [720, 1, 80, 25, 40]),
+        ('SWM', [720, 1, 80]),
+        ('RUN', [15000, 1, 75]),
+        ('WLK', [9000, 1, 75, 180]),
+        ('RUN', [1206, 12, 6]),
+    ]
+    result = list(homework.read_packages(packages))
+    assert result == [homework.read_package(*p) for p in packages], (
+        '`read_packages` должна возвращать то же, что и `read_package`.'
+    )
+    with pytest.raises(KeyError):
+        list(homework.read_packages(packages + [('XXX', [1, 2, 3])]))
+
+
+def test_register(monkeypatch):
+    monkeypatch.setattr(homework, 'WORKOUT_TYPES',
+                        dict(homework.WORKOUT_TYPES))
+
+    @dataclass
+    class Rowing(homework.Training):
+        LEN_STEP = 2.0
+
+        def get_spent_calories(self):
+            return self.get_mean_speed() * self.weight
+
+    homework.register('ROW', Rowing)
+    assert homework.WORKOUT_TYPES['ROW'].min_arity == 3
+    training = homework.read_package('ROW', [1000, 2, 70])
+    assert isinstance(training, Rowing)
+    assert training.show_training_info().get_message().startswith(
+        'Тип тренировки: Rowing;'
+    )
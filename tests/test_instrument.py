@@ -0,0 +1,62 @@
+import json
+from io import BytesIO
+
+import pytest
+
+import homework
+import instrument
+import pipeline
+
+
+@pytest.fixture
+def enabled():
+    instrument.enable()
+    instrument.reset()
+    yield
+    instrument.disable()
+
+
+def test_disabled_leaves_functions_untouched():
+    original = (homework.read_package, pipeline.read_package,
+                homework.Training.show_training_info,
+                homework.InfoMessage.get_message)
+    instrument.enable()
+    assert homework.read_package is not original[0]
+    assert pipeline.read_package is homework.read_package
+    instrument.disable()
+    assert (homework.read_package, pipeline.read_package,
+            homework.Training.show_training_info,
+            homework.InfoMessage.get_message) == original, (
+        'После disable() должны вызываться исходные функции.'
+    )
+
+
+def test_counts_stages_and_types(enabled):
+    source = (
+        b'["RUN", [15000, 1, 75]]\n'
+        b'["SWM", [720, 1, 80, 25, 40]]\n'
+        b'["RUN", [9000, 1, 75]]\n'
+        b'["XXX", [1, 2, 3]]\n'
+    )
+    pipeline.run(BytesIO(source), BytesIO(), on_error=lambda record: None)
+    homework.main(homework.read_package('WLK', [9000, 1, 75, 180]))
+    with pytest.raises(KeyError):
+        homework.read_package('XXX', [1, 2, 3])
+    summary = instrument.summary()
+    stages = summary['stages']
+    assert (stages['read_package']['calls'],
+            stages['read_package']['errors']) == (5, 1)
+    assert stages['show_training_info']['calls'] == 4
+    assert stages['get_message']['calls'] == 1
+    assert summary['workout_types'] == {'RUN': 2, 'SWM': 1, 'WLK': 1,
+                                        'XXX': 1}
+    histogram = stages['show_training_info']['histogram']
+    assert sum(histogram.values()) == 4
+
+
+def test_report_formats(enabled):
+    homework.read_package('RUN', [15000, 1, 75]).show_training_info()
+    data = json.loads(instrument.report('json'))
+    assert data['stages']['read_package']['calls'] == 1
+    text = instrument.report('text')
+    assert 'show_training_info' in text and 'пакетов RUN: 1' in text
@@ -0,0 +1,58 @@
+from io import BytesIO
+
+import pytest
+
+import parallel
+import pipeline
+
+SOURCE = (
+    '["SWM", [720, 1, 80, 25, 40]]\n'
+    '["RUN", [15000, 1, 75]]\n'
+    '["XXX", [1, 2, 3]]\n'
+    '["WLK", [9000, 1, 75, 180]]\n'
+    '["RUN", [1, 0, 3]]\n'
+    '["RUN", [1206, 12, 6]]'
+) * 5
+
+
+@pytest.fixture
+def packages_file(tmp_path):
+    path = tmp_path / 'packages.jsonl'
+    path.write_text(SOURCE, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('shard_size', [1, 40, 1 << 20])
+def test_split_ranges(packages_file, shard_size):
+    ranges = parallel.split_ranges(packages_file, shard_size)
+    data = SOURCE.encode('utf-8')
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b'\n', (
+            'Диапазоны должны идти подряд и заканчиваться на перевод строки.'
+        )
+
+
+@pytest.mark.parametrize('workers, shard_size', [
+    (1, 1), (1, 1 << 20), (2, 1), (2, 100),
+])
+def test_run_parallel_matches_pipeline(packages_file, workers, shard_size):
+    expected_out = BytesIO()
+    expected_errors = []
+    expected = pipeline.run(
+        BytesIO(SOURCE.encode('utf-8')), expected_out,
+        on_error=expected_errors.append,
+    )
+    out = BytesIO()
+    errors = []
+    result = parallel.run_parallel(
+        packages_file, out, workers=workers, shard_size=shard_size,
+        on_error=errors.append,
+    )
+    assert result == expected
+    assert out.getvalue() == expected_out.getvalue(), (
+        'Порядок результатов не должен зависеть от числа процессов.'
+    )
+    assert errors == expected_errors, (
+        'Номера ошибочных строк должны считаться от начала файла.'
+    )
@@ -0,0 +1,121 @@
+from io import BytesIO
+
+import pytest
+
+import homework
+import pipeline
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, pipeline.CHUNK_SIZE])
+def test_iter_lines(chunk_size):
+    stream = BytesIO(b'first\nsecond\n\nlast')
+    result = list(pipeline.iter_lines(stream, chunk_size))
+    assert result == [
+        (1, b'first'), (2, b'second'), (3, b''), (4, b'last')
+    ], (
+        '`iter_lines` должна собирать строки, разрезанные между блоками.'
+    )
+
+
+@pytest.mark.parametrize('fmt, source', [
+    ('jsonl', b'["SWM", [720, 1, 80, 25, 40]]\n["RUN", [15000, 1, 75]]\n'),
+    ('csv', b'SWM,720,1,80,25,40\nRUN,15000,1,75\n'),
+])
+def test_run(fmt, source):
+    out = BytesIO()
+    written, errors = pipeline.run(BytesIO(source), out, fmt, chunk_size=5)
+    expected = [
+        homework.read_package(*package).show_training_info().get_message()
+        for package in [('SWM', [720, 1, 80, 25, 40]), ('RUN', [15000, 1, 75])]
+    ]
+    assert (written, errors) == (2, 0)
+    assert out.getvalue().decode('utf-8').splitlines() == expected, (
+        'Конвейер должен печатать то же, что и `main`.'
+    )
+
+
+def test_run_reports_malformed():
+    source = (
+        b'["RUN", [15000, 1, 75]]\n'
+        b'["XXX", [1, 2, 3]]\n'
+        b'not json\n'
+        b'["RUN", [1, 0, 3]]\n'
+        b'["WLK", [1, 2]]\n'
+        b'["SWM", [720, 1, 80, 25, 40]]\n'
+    )
+    reported = []
+    out = BytesIO()
+    written, errors = pipeline.run(
+        BytesIO(source), out, on_error=reported.append
+    )
+    assert (written, errors) == (2, 4)
+    assert [record.line_no for record in reported] == [2, 3, 4, 5], (
+        'Ошибочные записи должны сообщаться с номером строки, '
+        'а обработка - продолжаться.'
+    )
+
+
+def test_try_compute_overflow():
+    info, reason = pipeline.try_compute('WLK', [1e300, 1e-10, 75, 180])
+    assert info is None and 'переполнение' in reason, (
+        'Переполнение при расчёте должно возвращаться как причина ошибки.'
+    )
+
+
+def test_run_reports_overflow(monkeypatch):
+    class Overflowing(homework.Training):
+        def get_spent_calories(self):
+            return float(self.weight) ** 400
+
+    monkeypatch.setitem(homework.WORKOUT_TYPES, 'OVF',
+                        homework.WorkoutType('OVF', Overflowing, 3, 3))
+    source = (
+        b'["RUN", [15000, 1, 75]]\n'
+        b'["OVF", [15000, 1, 75]]\n'
+        b'["SWM", [720, 1, 80, 25, 40]]\n'
+    )
+    reported = []
+    written, errors = pipeline.run(
+        BytesIO(source), BytesIO(), on_error=reported.append
+    )
+    assert (written, errors) == (2, 1)
+    assert [(record.line_no, record.code) for record in reported] == [
+        (2, pipeline.COMPUTE_ERROR)
+    ], 'Одна запись с переполнением не должна обрывать весь прогон.'
+
+
+def test_cli(tmp_path, capsys):
+    path = tmp_path / 'packages.csv'
+    path.write_text('WLK,9000,1,75,180\n', encoding='utf-8')
+    assert pipeline.cli([str(path)]) == 0
+    assert capsys.readouterr().out == (
+        'Тип тренировки: SportsWalking; '
+        'Длительность: 1.000 ч.; '
+        'Дистанция: 5.850 км; '
+        'Ср. скорость: 5.850 км/ч; '
+        'Потрачено ккал: 157.500.\n'
+    )
+
+
+@pytest.mark.parametrize('flags', [
+    ['--chunk-size', '0'],
+    ['--chunk-size', '-1'],
+    ['-j', '2', '--shard-size', '0'],
+    ['-j', '-1'],
+], ids=' '.join)
+def test_cli_rejects_bad_sizes(tmp_path, capsys, flags):
+    path = tmp_path / 'packages.csv'
+    path.write_text('WLK,9000,1,75,180\n', encoding='utf-8')
+    with pytest.raises(SystemExit):
+        pipeline.cli([str(path), *flags])
+    assert flags[-2] in capsys.readouterr().err, (
+        'Размер без смысла должен давать ошибку, а не терять данные.'
+    )
+
+
+def test_cli_rejects_workers_with_stdin(capsys):
+    with pytest.raises(SystemExit):
+        pipeline.cli(['-', '-j', '2'])
+    assert 'стандартным вводом' in capsys.readouterr().err, (
+        '-j со стандартным вводом не должен молча работать в один процесс.'
+    )
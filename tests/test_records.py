@@ -0,0 +1,57 @@
+import dataclasses
+import pickle
+
+import pytest
+
+import homework
+import records
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('SWM', [720, 1, 80]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+]
+
+
+@pytest.mark.parametrize('package', PACKAGES)
+def test_same_results(package):
+    expected = homework.read_package(*package).show_training_info()
+    training = records.read_package(*package)
+    assert type(training).__name__ == type(
+        homework.read_package(*package)
+    ).__name__
+    result = training.show_training_info()
+    assert isinstance(result, records.InfoMessage)
+    assert dataclasses.astuple(result) == dataclasses.astuple(expected), (
+        'Компактные классы должны считать так же, как обычные.'
+    )
+    assert result.get_message() == expected.get_message()
+
+
+@pytest.mark.parametrize('package', PACKAGES)
+def test_slotted_and_frozen(package):
+    training = records.read_package(*package)
+    assert not hasattr(training, '__dict__'), (
+        'Компактные классы не должны иметь `__dict__`.'
+    )
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        training.weight = 1
+    assert pickle.loads(pickle.dumps(training)) == training
+
+
+@pytest.mark.parametrize('package', PACKAGES)
+def test_from_training(package):
+    training = homework.read_package(*package)
+    assert records.from_training(training) == records.read_package(*package)
+
+
+def test_unknown_workout_type():
+    with pytest.raises(KeyError):
+        records.read_package('XXX', [1, 2, 3])
+
+
+@pytest.mark.parametrize('package', PACKAGES)
+def test_get_metrics(package):
+    expected = homework.read_package(*package).get_metrics()
+    assert records.read_package(*package).get_metrics() == expected
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+
+import pytest
+
+import homework
+import render
+
+MESSAGES = [
+    homework.read_package(*package).show_training_info()
+    for package in [
+        ('SWM', [720, 1, 80, 25, 40]),
+        ('RUN', [1206, 12, 6]),
+        ('WLK', [9000, 1, 75, 180]),
+        ('RUN', [123456789, 0.001, 1e6]),
+    ]
+]
+
+
+class CountingStream(io.BytesIO):
+    writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+def test_render_text():
+    expected = ''.join(message.get_message() + '\n' for message in MESSAGES)
+    assert render.render(MESSAGES).decode('utf-8') == expected, (
+        'Пакетный вывод должен совпадать с `get_message`.'
+    )
+
+
+def test_render_csv():
+    text = (render.header('csv') + render.render(MESSAGES, 'csv'))
+    rows = list(csv.DictReader(io.StringIO(text.decode('utf-8'))))
+    assert [row['training_type'] for row in rows] == [
+        message.training_type for message in MESSAGES
+    ]
+    assert [float(row['calories']) for row in rows] == [
+        message.calories for message in MESSAGES
+    ], 'В CSV числа должны выводиться без потери точности.'
+
+
+def test_render_jsonl():
+    lines = render.render(MESSAGES, 'jsonl').decode('utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [
+        dict(zip(render.FIELDS, render.as_row(message)))
+        for message in MESSAGES
+    ]
+
+
+@pytest.mark.parametrize('output_format', render.OUTPUT_FORMATS)
+def test_render_columns(output_format):
+    pytest.importorskip('numpy')
+    types = ['Swimming', 'Running', 'SportsWalking']
+    distance, speed, calories = homework.compute_batch(
+        ['SWM', 'RUN', 'WLK'], [720, 1206, 9000], [1, 12, 1], [80, 6, 75],
+        [0, 0, 180], [25, 0, 0], [40, 0, 0],
+    )
+    result = render.render_columns(
+        types, [1, 12, 1], distance, speed, calories, output_format
+    )
+    assert result == render.render(MESSAGES[:3], output_format)
+
+
+def test_render_jsonl_non_finite():
+    pytest.importorskip('numpy')
+    distance, speed, calories = homework.compute_batch(
+        ['RUN', 'RUN'], [100, 1206], [0, 12], [75, 6], [0, 0], [0, 0],
+        [0, 0],
+    )
+    lines = render.render_columns(
+        ['Running', 'Running'], [0, 12], distance, speed, calories, 'jsonl'
+    ).decode('utf-8').splitlines()
+    first, second = map(json.loads, lines)
+    assert first['speed'] is None and first['calories'] is None, (
+        'inf и nan в JSONL должны выводиться как null.'
+    )
+    assert second == json.loads(render.render(MESSAGES[1:2], 'jsonl'))
+
+
+@pytest.mark.parametrize('batch_size, writes', [(2, 2), (100, 1)])
+def test_write_messages(batch_size, writes):
+    stream = CountingStream()
+    count = render.write_messages(
+        MESSAGES, stream, 'csv', batch_size=batch_size
+    )
+    assert count == len(MESSAGES)
+    assert stream.writes == writes, (
+        'Каждая пачка должна записываться одним вызовом `write`.'
+    )
+    assert stream.getvalue().startswith(render.CSV_HEADER.encode('utf-8'))
@@ -0,0 +1,121 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import homework
+import server
+
+PACKAGES = [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+]
+
+
+def expected_messages(packages):
+    return [
+        homework.read_package(*package).show_training_info().get_message()
+        for package in packages
+    ]
+
+
+async def exchange(srv, payload, path=None):
+    listener = await srv.start(port=0, path=path)
+    if path is None:
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    else:
+        reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(payload)
+    await writer.drain()
+    writer.write_eof()
+    response = await reader.read()
+    writer.close()
+    listener.close()
+    await listener.wait_closed()
+    return response.decode('utf-8').splitlines()
+
+
+def encode(packages):
+    return b''.join(
+        (json.dumps(package) + '\n').encode('utf-8') for package in packages
+    )
+
+
+def test_process_batch_keeps_order():
+    lines = encode(PACKAGES[:1]) + b'["XXX", [1]]\nnot json\n\n' + encode(
+        PACKAGES[1:]
+    )
+    result = server.process_batch(lines.split(b'\n'))
+    lines = result.decode('utf-8').splitlines()
+    expected = expected_messages(PACKAGES)
+    assert lines[0] == expected[0]
+    assert lines[1].startswith('ошибка: ') and lines[2].startswith('ошибка: ')
+    assert lines[3:] == expected[1:], (
+        'Ответы должны идти в том же порядке, что и запросы.'
+    )
+
+
+def test_compute_error_keeps_connection(monkeypatch):
+    class Overflowing(homework.Training):
+        def get_spent_calories(self):
+            return float(self.weight) ** 400
+
+    monkeypatch.setitem(homework.WORKOUT_TYPES, 'OVF',
+                        homework.WorkoutType('OVF', Overflowing, 3, 3))
+    payload = encode(PACKAGES[:1] + [('OVF', [15000, 1, 75])] + PACKAGES[1:])
+    response = asyncio.run(exchange(server.TrainingServer(), payload))
+    expected = expected_messages(PACKAGES)
+    assert response[1].startswith('ошибка: [compute_error]')
+    assert [response[0]] + response[2:] == expected, (
+        'Ошибка расчёта одного пакета не должна терять остальные ответы.'
+    )
+
+
+@pytest.mark.parametrize('chunk_size', [100, server.MAX_LINE * 2])
+def test_oversized_line_gets_one_reply(chunk_size):
+    payload = encode(PACKAGES) + b'x' * (server.MAX_LINE + 10)
+    response = asyncio.run(exchange(
+        server.TrainingServer(chunk_size=chunk_size), payload
+    ))
+    assert response[:3] == expected_messages(PACKAGES), (
+        'Целые строки перед длинной должны получить ответы.'
+    )
+    assert len(response) == 4 and response[3].startswith('ошибка: '), (
+        'На слишком длинную строку приходит ровно одна ошибка.'
+    )
+
+
+def test_pipelined_requests():
+    packages = PACKAGES * 50
+    response = asyncio.run(exchange(
+        server.TrainingServer(chunk_size=100), encode(packages)
+    ))
+    assert response == expected_messages(packages)
+
+
+def test_offload_to_executor():
+    packages = PACKAGES * 50
+    with ThreadPoolExecutor(2) as executor:
+        srv = server.TrainingServer('jsonl', offload_threshold=1,
+                                    executor=executor)
+        response = asyncio.run(exchange(srv, encode(packages)))
+    assert [json.loads(line)['training_type'] for line in response] == [
+        type(homework.read_package(*package)).__name__
+        for package in packages
+    ]
+
+
+def test_unix_socket(tmp_path):
+    response = asyncio.run(exchange(
+        server.TrainingServer(), encode(PACKAGES),
+        path=str(tmp_path / 'server.sock'),
+    ))
+    assert response == expected_messages(PACKAGES)
+
+
+def test_rejects_csv_output():
+    with pytest.raises(ValueError):
+        server.TrainingServer('csv')
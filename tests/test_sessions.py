@@ -0,0 +1,119 @@
+import random
+from dataclasses import MISSING
+
+import pytest
+
+import homework
+import workouts
+from sessions import SECONDS_IN_HOUR, Session, SessionManager
+
+
+def samples(count, low, high, seed=0):
+    rnd = random.Random(seed)
+    return [rnd.randint(low, high) for _ in range(count)]
+
+
+@pytest.mark.parametrize('workout_type, static', [
+    ('RUN', (75,)),
+    ('WLK', (75, 180)),
+    ('SWM', (80, 25)),
+])
+def test_finish_matches_totals(workout_type, static):
+    actions = samples(3600, 0, 4)
+    laps = [1 if second % 60 == 59 else 0 for second in range(3600)]
+    session = Session(workout_type, *static)
+    for start in range(0, 3600, 500):
+        session.feed(actions[start:start + 500], 1, laps[start:start + 500])
+    data = [sum(actions), 3600 / SECONDS_IN_HOUR, *static]
+    if workout_type == 'SWM':
+        data.append(sum(laps))
+    expected = homework.read_package(workout_type, data).show_training_info()
+    assert session.finish() == expected, (
+        'Итог сессии должен совпадать с расчётом по итоговым суммам.'
+    )
+
+
+def test_laps_without_length_pool():
+    laps = [1 if second % 60 == 59 else 0 for second in range(600)]
+    session = Session('SWM', 80)
+    session.feed([30] * 600, 1, laps)
+    expected = homework.read_package(
+        'SWM', [18000, 600 / SECONDS_IN_HOUR, 80,
+                homework.Swimming.length_pool, 10]
+    ).show_training_info()
+    assert session.finish() == expected
+    # У плавания длина и число бассейнов входят в формулы только
+    # произведением; здесь перепутанные поля дали бы другие калории.
+    pool = workouts.WorkoutDefinition(
+        'XPOOL', 'XPool',
+        (('action', MISSING), ('duration', MISSING), ('weight', MISSING),
+         ('length_pool', 25), ('count_pool', 1)),
+        calories='length_pool * 1000 + count_pool',
+    )
+    workouts.register(pool)
+    try:
+        session = Session('XPOOL', 80)
+        session.feed([30] * 600, 1, laps)
+        assert session.finish().calories == 25010, (
+            'Бассейны должны попадать в count_pool, а не в length_pool.'
+        )
+    finally:
+        workouts.unregister('XPOOL')
+
+
+def test_add_and_feed_agree():
+    actions = samples(600, 0, 3)
+    one_by_one = Session('RUN', 70)
+    for action in actions:
+        one_by_one.add(action)
+    chunked = Session('RUN', 70)
+    chunked.feed(actions)
+    assert one_by_one.finish() == chunked.finish()
+
+
+def test_splits():
+    actions = samples(600, 1, 3)
+    session = Session('RUN', 70, split_seconds=120)
+    splits = session.feed(actions[:250]) + session.feed(actions[250:])
+    assert len(splits) == 5
+    for index, split in enumerate(splits):
+        chunk = actions[index * 120:(index + 1) * 120]
+        expected = homework.read_package(
+            'RUN', [sum(chunk), 120 / SECONDS_IN_HOUR, 70]
+        ).show_training_info()
+        assert split == expected, 'Сплит считается по итогам отрезка.'
+    assert session.finish().distance == pytest.approx(
+        sum(split.distance for split in splits)
+    )
+
+
+def test_state_is_constant_size():
+    session = Session('SWM', 80, 25)
+    assert not hasattr(session, '__dict__')
+    session.feed([1] * 100_000)
+    assert all(
+        isinstance(getattr(session, name), (int, float, str, tuple, bool,
+                                            type(None)))
+        for name in Session.__slots__
+    ), 'Сессия не должна хранить замеры.'
+
+
+def test_errors():
+    with pytest.raises(KeyError):
+        Session('XXX', 70)
+    with pytest.raises(TypeError):
+        Session('WLK', 70)
+    with pytest.raises(ValueError):
+        Session('RUN', 70).finish()
+
+
+def test_manager():
+    manager = SessionManager(split_seconds=60)
+    manager.start('watch-1', 'RUN', 75)
+    manager.start('watch-2', 'WLK', 75, 180)
+    with pytest.raises(ValueError):
+        manager.start('watch-1', 'RUN', 75)
+    assert len(manager.feed('watch-1', [2] * 90)) == 1
+    manager.feed('watch-2', [1] * 30)
+    assert manager.finish('watch-1').training_type == 'Running'
+    assert len(manager) == 1
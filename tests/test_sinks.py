@@ -0,0 +1,179 @@
+import gzip
+import io
+import lzma
+import os
+import random
+
+import pytest
+
+import pipeline
+import render
+import sinks
+
+BATCHES = [f'пачка {index}\n'.encode('utf-8') * (index + 1)
+           for index in range(20)]
+EXPECTED = b''.join(BATCHES)
+
+
+def write_shuffled(sink, seed=1):
+    order = list(range(len(BATCHES)))
+    random.Random(seed).shuffle(order)
+    for index in order:
+        sink.write_batch(index, BATCHES[index])
+
+
+@pytest.mark.parametrize('background', [False, True])
+def test_batches_written_in_order(tmp_path, background):
+    path = tmp_path / 'report.txt'
+    sink = sinks.FileSink(str(path))
+    if background:
+        sink = sinks.BackgroundWriter(sink, max_pending=2)
+    with sink:
+        write_shuffled(sink)
+        assert not path.exists(), 'До close файл не должен появляться.'
+    assert path.read_bytes() == EXPECTED, (
+        'Пачки должны писаться по номерам, а не по порядку прихода.'
+    )
+    assert sink.bytes_written == len(EXPECTED)
+    assert [item.name for item in tmp_path.iterdir()] == ['report.txt']
+
+
+def test_failed_write_keeps_old_file(tmp_path):
+    path = tmp_path / 'report.txt'
+    path.write_bytes(b'old')
+    with pytest.raises(RuntimeError):
+        with sinks.FileSink(str(path)) as sink:
+            sink.write(b'new')
+            raise RuntimeError
+    assert path.read_bytes() == b'old', (
+        'При ошибке прежний файл не должен меняться.'
+    )
+    assert [item.name for item in tmp_path.iterdir()] == ['report.txt']
+
+
+def test_missing_batch_is_an_error(tmp_path):
+    path = tmp_path / 'report.txt'
+    sink = sinks.FileSink(str(path))
+    sink.write_batch(0, b'a')
+    sink.write_batch(2, b'c')
+    with pytest.raises(ValueError, match='пачка 1'):
+        sink.close()
+    assert not path.exists()
+    with sinks.StreamSink(io.BytesIO()) as sink:
+        sink.write(b'a')
+        with pytest.raises(ValueError, match='уже записана'):
+            sink.write_batch(0, b'b')
+
+
+def test_gzip_is_deterministic(tmp_path):
+    outputs = []
+    for name in ('a.txt.gz', 'b.txt.gz'):
+        with sinks.open_sink(str(tmp_path / name)) as sink:
+            write_shuffled(sink, seed=len(name) + len(outputs))
+        outputs.append((tmp_path / name).read_bytes())
+    assert outputs[0] == outputs[1], (
+        'Одинаковый отчёт должен давать одинаковые сжатые байты.'
+    )
+    assert gzip.decompress(outputs[0]) == EXPECTED
+
+
+def test_rotation(tmp_path):
+    path = tmp_path / 'report.txt.xz'
+    sink = sinks.open_sink(str(path), rotate_bytes=100)
+    with sink:
+        for batch in BATCHES:
+            sink.write(batch)
+    assert sink.paths[:2] == [str(tmp_path / 'report.0000.txt.xz'),
+                              str(tmp_path / 'report.0001.txt.xz')]
+    parts = [lzma.decompress(open(part, 'rb').read()) for part in sink.paths]
+    assert b''.join(parts) == EXPECTED
+    assert parts == [part for part in parts if part], 'Пустых частей нет.'
+    for part in parts:
+        assert len(part) <= 100 or part.count(b'\n') == 1, (
+            'Часть больше предела только из одной длинной строки.'
+        )
+        assert part.endswith(b'\n'), 'Строки не должны разрываться.'
+
+
+def test_rotation_replaces_previous_run(tmp_path):
+    path = str(tmp_path / 'report.txt')
+    with sinks.RotatingSink(path, 100) as sink:
+        sink.write(EXPECTED)
+    assert len(sink.paths) > 5
+    with pytest.raises(RuntimeError):
+        with sinks.RotatingSink(path, 100) as failed:
+            failed.write(b'new\n' * 100)
+            raise RuntimeError
+    assert b''.join(
+        open(part, 'rb').read() for part in sink.paths
+    ) == EXPECTED, 'Упавший прогон не должен трогать прежние части.'
+    with sinks.RotatingSink(path, 100) as short:
+        short.write(b'new\n')
+    assert sorted(item.name for item in tmp_path.iterdir()) == [
+        'report.0000.txt'
+    ], 'Части прошлого прогона с большими номерами должны удаляться.'
+
+
+def test_file_mode_follows_umask(tmp_path):
+    old = os.umask(0o027)
+    try:
+        with sinks.FileSink(str(tmp_path / 'report.txt')) as sink:
+            sink.write(b'a')
+    finally:
+        os.umask(old)
+    assert (tmp_path / 'report.txt').stat().st_mode & 0o777 == 0o640
+
+
+def test_background_error_is_raised(tmp_path):
+    class Broken(sinks.Sink):
+        def _emit(self, data):
+            raise OSError('диск полон')
+
+    sink = sinks.BackgroundWriter(Broken())
+    sink.write(b'a')
+    with pytest.raises(OSError, match='диск полон'):
+        sink.close()
+
+
+def test_cli_compressed_output(tmp_path):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('["RUN", [15000, 1, 75]]\n' * 10, encoding='utf-8')
+    plain = tmp_path / 'report.txt'
+    packed = tmp_path / 'report.txt.gz'
+    assert pipeline.cli([str(source), '-o', str(plain)]) == 0
+    assert pipeline.cli([str(source), '-o', str(packed),
+                         '--background-write']) == 0
+    assert gzip.decompress(packed.read_bytes()) == plain.read_bytes()
+
+
+def test_stdout_rejects_compression_and_rotation(tmp_path, capsys):
+    with pytest.raises(ValueError):
+        sinks.open_sink('-', compression='gzip')
+    with pytest.raises(ValueError):
+        sinks.open_sink('-', rotate_bytes=10)
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('["RUN", [15000, 1, 75]]\n', encoding='utf-8')
+    for flags in (['--compress', 'gzip'], ['--rotate-bytes', '10']):
+        with pytest.raises(SystemExit):
+            pipeline.cli([str(source), *flags])
+        assert '-o' in capsys.readouterr().err, (
+            'Параметр без эффекта не должен молча игнорироваться.'
+        )
+
+
+def test_rotated_csv_parts_have_header(tmp_path):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('["RUN", [15000, 1, 75]]\n' * 50, encoding='utf-8')
+    path = tmp_path / 'report.csv'
+    assert pipeline.cli([str(source), '-t', 'csv', '-o', str(path),
+                         '--rotate-bytes', '300']) == 0
+    parts = sorted(tmp_path.glob('report.*.csv'))
+    assert len(parts) > 2
+    rows = []
+    for part in parts:
+        lines = part.read_text(encoding='utf-8').splitlines()
+        assert lines[0] + '\n' == render.CSV_HEADER, (
+            'Каждая часть CSV должна начинаться с заголовка.'
+        )
+        rows.extend(lines[1:])
+    assert len(rows) == 50
@@ -0,0 +1,171 @@
+import json
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import homework
+import store
+
+ATHLETES = ('anna', 'boris', 'vera')
+PACKAGES = {
+    'SWM': lambda rnd: [rnd.randint(100, 3000), rnd.randint(1, 3),
+                        rnd.randint(50, 100), 25, rnd.randint(10, 80)],
+    'RUN': lambda rnd: [rnd.randint(1000, 30000), rnd.randint(1, 3),
+                        rnd.randint(50, 100)],
+    'WLK': lambda rnd: [rnd.randint(1000, 30000), rnd.randint(1, 3),
+                        rnd.randint(50, 100), rnd.randint(150, 200)],
+}
+START = date(2026, 8, 1)
+
+
+def random_rows(count, seed=0):
+    rnd = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        workout_type = rnd.choice(sorted(PACKAGES))
+        data = PACKAGES[workout_type](rnd)
+        rows.append((rnd.choice(ATHLETES),
+                     START + timedelta(days=rnd.randrange(90)),
+                     workout_type, data))
+    return rows
+
+
+def brute_force(rows, athlete=None, workout_type=None, since=None,
+                until=None, min_calories=None):
+    found = []
+    for row_athlete, day, code, data in rows:
+        info = homework.read_package(code, data).show_training_info()
+        if ((athlete is None or row_athlete == athlete)
+                and (workout_type is None or code == workout_type)
+                and (since is None or day >= since)
+                and (until is None or day <= until)
+                and (min_calories is None or info.calories >= min_calories)):
+            found.append((row_athlete, day, code, info))
+    return sorted(found, key=lambda item: (item[1], item[0]))
+
+
+def as_tuples(results):
+    return [(item.athlete, item.day, item.workout_type, item.info)
+            for item in results]
+
+
+QUERIES = [
+    {},
+    {'athlete': 'anna'},
+    {'workout_type': 'SWM', 'min_calories': 500},
+    {'athlete': 'boris', 'workout_type': 'SWM', 'min_calories': 500,
+     'since': date(2026, 9, 1), 'until': date(2026, 9, 30)},
+    {'since': date(2026, 10, 1)},
+]
+
+
+@pytest.mark.parametrize('compact_after', [0, 150, 300])
+@pytest.mark.parametrize('filters', QUERIES)
+def test_query_matches_brute_force(tmp_path, filters, compact_after):
+    rows = random_rows(300)
+    with store.ResultStore(str(tmp_path / 'results.db')) as results:
+        for index, row in enumerate(rows):
+            if index == compact_after:
+                results.compact()
+            results.add_package(*row)
+        expected = brute_force(rows, **filters)
+        found = results.query(**filters)
+        assert sorted(as_tuples(found), key=repr) == sorted(
+            expected, key=repr
+        ), 'Поиск должен находить то же, что полный перебор.'
+        assert [item.day for item in found] == sorted(
+            item.day for item in found
+        ), 'Результаты идут по дням.'
+        assert results.count(**filters) == len(expected)
+
+
+def test_indexes_are_used(tmp_path):
+    with store.ResultStore(str(tmp_path / 'results.db')) as results:
+        for row in random_rows(50):
+            results.add_package(*row)
+        results.compact()
+        for filters, index in [
+            ({'athlete': 'anna', 'since': '2026-09-01'}, 'results_athlete'),
+            ({'workout_type': 'SWM'}, 'results_type'),
+            ({'min_calories': 5000}, 'results_calories'),
+            ({'max_distance': 0.5}, 'results_distance'),
+        ]:
+            plan = ' '.join(results.plan(**filters))
+            assert index in plan, f'{filters}: ожидался индекс {index}'
+
+
+def test_reopen_and_auto_compact(tmp_path):
+    path = str(tmp_path / 'results.db')
+    rows = random_rows(40)
+    with store.ResultStore(path, pending_limit=None) as results:
+        for row in rows[:30]:
+            results.add_package(*row)
+    with store.ResultStore(path, pending_limit=35) as results:
+        assert len(results) == 30, 'Журнал должен переживать перезапуск.'
+        for row in rows[30:]:
+            results.add_package(*row)
+        results.flush()
+        pending = results._db.execute(
+            'SELECT COUNT(*) FROM pending'
+        ).fetchone()[0]
+        assert pending == 0, 'Переполненный журнал переносится в индексы.'
+        assert len(results) == 40
+
+
+def test_compact_dedupe(tmp_path):
+    rows = random_rows(10)
+    with store.ResultStore(str(tmp_path / 'results.db')) as results:
+        for row in rows + rows:
+            results.add_package(*row)
+        results.compact()
+        assert len(results) == 20
+        results.compact(dedupe=True, vacuum=True)
+        assert len(results) == 10, 'Повторный импорт не должен дублировать.'
+
+
+def test_cli(tmp_path, capsys):
+    source = tmp_path / 'trainings.jsonl'
+    lines = [
+        {'athlete': 'anna', 'date': '2026-09-05', 'workout_type': 'SWM',
+         'data': [720, 1, 80, 25, 40]},
+        {'athlete': 'anna', 'date': '2026-09-06T07:30:00',
+         'workout_type': 'RUN', 'data': [15000, 1, 75]},
+        {'athlete': 'anna', 'date': '2026-09-07', 'workout_type': 'XXX',
+         'data': [1]},
+    ]
+    source.write_text(
+        '\n'.join(map(json.dumps, lines)) + '\nnot json\n', encoding='utf-8'
+    )
+    db = str(tmp_path / 'results.db')
+    assert store.cli(['ingest', db, str(source)]) == 1
+    err = capsys.readouterr().err
+    assert '[unknown_type]' in err and '[parse_error]' in err
+    assert store.cli(['query', db, '--athlete', 'anna', '--type', 'RUN',
+                      '--since', '2026-09-01']) == 0
+    expected = homework.read_package('RUN', [15000, 1, 75])
+    assert capsys.readouterr().out == (
+        '2026-09-06 anna: '
+        + expected.show_training_info().get_message() + '\n'
+    )
+    assert store.cli(['compact', db]) == 0
+    assert store.cli(['query', db, '--count', '--min-calories', '0']) == 0
+    assert capsys.readouterr().out == '2\n'
+
+
+def test_ingest_skips_bad_date(tmp_path):
+    lines = [
+        {'athlete': 'anna', 'date': '2026-09-05', 'workout_type': 'RUN',
+         'data': [15000, 1, 75]},
+        {'athlete': 'anna', 'date': 20260906, 'workout_type': 'RUN',
+         'data': [15000, 1, 75]},
+        {'athlete': 'anna', 'date': '2026-09-07', 'workout_type': 'RUN',
+         'data': [9000, 1, 75]},
+    ]
+    with store.ResultStore(str(tmp_path / 'results.db')) as results:
+        assert store.ingest(results, map(json.dumps, lines)) == (2, 1), (
+            'Дата не строкой - ошибка разбора одной записи, а не всего файла.'
+        )
+        assert [item.day for item in results.query()] == [
+            date(2026, 9, 5), date(2026, 9, 7)
+        ]
@@ -0,0 +1,137 @@
+import json
+import math
+import random
+from io import BytesIO
+
+import pytest
+
+import homework
+import parallel
+import pipeline
+import streamstats
+
+QUANTILES = (0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999, 1)
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[math.floor(q * (len(ordered) - 1))]
+
+
+def random_values(seed, count=50_000):
+    rnd = random.Random(seed)
+    return [rnd.lognormvariate(1, 2) for _ in range(count)]
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('alpha', [0.01, 0.05])
+def test_quantiles_within_relative_error(seed, alpha):
+    values = random_values(seed)
+    values += [0.0] * 100 + [-value for value in values[:5000]]
+    sketch = streamstats.QuantileSketch(alpha)
+    for value in values:
+        sketch.add(value)
+    for q in QUANTILES:
+        expected = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - expected) <= alpha * abs(expected), (
+            f'p{q * 100:g}: погрешность больше alpha = {alpha}'
+        )
+    assert sketch.quantile(0) == min(values)
+    assert sketch.quantile(1) == max(values)
+    assert sketch.get_mean() == pytest.approx(sum(values) / len(values))
+
+
+def test_merge_equals_single_stream():
+    values = random_values(7)
+    whole = streamstats.QuantileSketch()
+    parts = [streamstats.QuantileSketch() for _ in range(4)]
+    for index, value in enumerate(values):
+        whole.add(value)
+        parts[index % 4].add(value)
+    merged = streamstats.QuantileSketch()
+    for part in parts:
+        merged.merge(part)
+    assert merged.bins == whole.bins, 'Сложение скетчей должно быть точным.'
+    assert [merged.quantile(q) for q in QUANTILES] == [
+        whole.quantile(q) for q in QUANTILES
+    ]
+    with pytest.raises(ValueError):
+        merged.merge(streamstats.QuantileSketch(alpha=0.05))
+
+
+def test_memory_is_bounded_and_upper_quantiles_survive():
+    rnd = random.Random(3)
+    values = [math.exp(rnd.uniform(-200, 50)) for _ in range(50_000)]
+    sketch = streamstats.QuantileSketch(0.01, max_bins=300)
+    for value in values:
+        sketch.add(value)
+        assert len(sketch.bins) <= 300
+    # 300 корзин по ~2% покрывают верхние ~6 единиц логарифма из 250.
+    for q in (0.98, 0.99, 0.999):
+        expected = exact_quantile(values, q)
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.01), (
+            'Слияние корзин не должно портить верхние перцентили.'
+        )
+
+
+def test_top_k_matches_sorting():
+    rnd = random.Random(1)
+    items = [(rnd.randint(0, 1000), index) for index in range(10_000)]
+    top = streamstats.TopK(25, key=lambda item: item[0])
+    parts = [streamstats.TopK(25, key=lambda item: item[0])
+             for _ in range(3)]
+    for index, item in enumerate(items):
+        top.add(item)
+        parts[index * 3 // len(items)].add(item)
+    expected = sorted(items, key=lambda item: (-item[0], item[1]))[:25]
+    assert top.items() == expected, (
+        'При равных ключах выигрывает пришедший раньше.'
+    )
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    assert merged.items() == expected, (
+        'Сложение по порядку частей даёт тот же результат.'
+    )
+    assert len(merged) == 25
+
+
+SOURCE = (
+    '["SWM", [720, 1, 80, 25, 40]]\n'
+    '["RUN", [15000, 1, 75]]\n'
+    '["WLK", [9000, 1, 75, 180]]\n'
+    '["RUN", [1206, 12, 6]]\n'
+    '["RUN", [9000, 2, 60]]\n'
+) * 20
+
+
+def test_pipeline_stats(tmp_path):
+    stats = streamstats.StreamStats(k=3)
+    pipeline.run(BytesIO(SOURCE.encode('utf-8')), BytesIO(),
+                 on_result=stats.add)
+    runs = [homework.read_package(*package).show_training_info()
+            for package in [('RUN', [15000, 1, 75]), ('RUN', [1206, 12, 6]),
+                            ('RUN', [9000, 2, 60])] * 20]
+    best = max(runs, key=lambda info: info.calories)
+    assert stats.top['Running'].items() == [best] * 3
+    assert stats.leaders(1) == [best]
+    summary = stats.summary()
+    assert summary['Running']['count'] == 60
+    assert set(summary['Running']['speed']) == {'mean', 'p50', 'p95', 'p99'}
+
+    path = tmp_path / 'packages.jsonl'
+    path.write_text(SOURCE, encoding='utf-8')
+    shards = streamstats.StreamStats(k=3)
+    parallel.run_parallel(str(path), BytesIO(), workers=2, shard_size=60,
+                          stats=shards)
+    assert shards.summary() == summary, (
+        'Статистика параллельных обработчиков должна складываться '
+        'в ту же сводку.'
+    )
+
+    out = tmp_path / 'stats.json'
+    assert pipeline.cli([str(path), '-o', str(tmp_path / 'report.txt'),
+                         '--stats', str(out), '--stats-top', '3']) == 0
+    assert json.loads(out.read_text(encoding='utf-8')) == json.loads(
+        json.dumps(summary)
+    )
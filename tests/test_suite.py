@@ -0,0 +1,68 @@
+import json
+import sys
+
+import pytest
+
+from conftest import BASE_DIR
+
+sys.path.append(str(BASE_DIR / 'benchmarks'))
+import suite
+
+
+def stats(ns, alloc=100.0):
+    return {'records': 1000, 'ns_per_record': ns,
+            'records_per_s': 1e9 / ns, 'alloc_bytes_per_record': alloc}
+
+
+def save(path, results):
+    path.write_text(json.dumps({'python': '3.11', 'machine': 'x86_64',
+                                'results': results}), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    return suite.load(save(tmp_path / 'baseline.json', {
+        'read_package': {'1000': stats(500), '100000': stats(400)},
+        'get_message': {'1000': stats(300, alloc=0.0)},
+        'main': {'1000': stats(900)},
+    }))
+
+
+def test_within_threshold_is_not_a_regression(baseline, tmp_path):
+    current = suite.load(save(tmp_path / 'current.json', {
+        'read_package': {'1000': stats(540), '100000': stats(300)},
+        'get_message': {'1000': stats(310, alloc=50.0)},
+        'main': {'1000': stats(900)},
+    }))
+    assert suite.compare(baseline, current, threshold=0.1) == [], (
+        'Ухудшение меньше порога и рост с нулевой базы - не регрессия.'
+    )
+
+
+def test_over_threshold_is_reported(baseline, tmp_path):
+    current = suite.load(save(tmp_path / 'current.json', {
+        'read_package': {'1000': stats(540), '100000': stats(400, 130.0)},
+        'main': {'1000': stats(1200)},
+    }))
+    assert suite.compare(baseline, current, threshold=0.1) == [
+        'read_package [100000] alloc_bytes_per_record: 100 -> 130 (+30%)',
+        'main [1000] ns_per_record: 900 -> 1200 (+33%)',
+    ]
+    assert suite.compare(baseline, current, threshold=0.05) == [
+        'read_package [1000] ns_per_record: 500 -> 540 (+8%)',
+        'read_package [100000] alloc_bytes_per_record: 100 -> 130 (+30%)',
+        'main [1000] ns_per_record: 900 -> 1200 (+33%)',
+    ], 'Порог должен задавать допустимое ухудшение.'
+
+
+def test_missing_and_new_benchmarks_are_skipped(baseline, tmp_path):
+    current = suite.load(save(tmp_path / 'current.json', {
+        'read_package': {'1000': stats(500), '10000000': stats(5000)},
+        'show_training_info': {'1000': stats(9000)},
+    }))
+    assert suite.compare(baseline, current) == [], (
+        'Сравниваются только случаи и размеры, которые есть в обоих '
+        'файлах.'
+    )
+    assert suite.compare(current, baseline) == []
@@ -0,0 +1,115 @@
+import json
+import math
+from dataclasses import MISSING
+
+import pytest
+
+import homework
+import pipeline
+import validate
+import workouts
+
+
+@pytest.mark.parametrize('workout_type, data', [
+    ('RUN', [15000, 1, 75]),
+    ('RUN', (0, 0.5, 60.5)),
+    ('WLK', [9000, 1, 75, 180]),
+    ('SWM', [720, 1, 80]),
+    ('SWM', [720, 1, 80, 25, 0]),
+])
+def test_clean_packages_pass(workout_type, data):
+    assert validate.check(workout_type, data) is None
+    homework.read_package(workout_type, data).show_training_info()
+
+
+@pytest.mark.parametrize('workout_type, data', [
+    ('RUN', [10 ** 9, 1e-6, 1e4]),
+    ('WLK', [10 ** 9, 1e-6, 1e4, 1]),
+    ('SWM', [10 ** 9, 1e-6, 1e4, 1e4, 10 ** 6]),
+])
+def test_extreme_clean_packages_compute(workout_type, data):
+    assert validate.check(workout_type, data) is None
+    info = homework.read_package(workout_type, data).show_training_info()
+    assert all(map(math.isfinite, (info.distance, info.speed,
+                                   info.calories))), (
+        'Чистый пакет на границах диапазона должен считаться без inf.'
+    )
+
+
+@pytest.mark.parametrize('workout_type, data, code', [
+    ('XXX', [1, 2, 3], validate.UNKNOWN_TYPE),
+    (None, [1, 2, 3], validate.UNKNOWN_TYPE),
+    ('RUN', [1, 2], validate.BAD_ARITY),
+    ('WLK', [1, 2, 3], validate.BAD_ARITY),
+    ('SWM', [1, 2, 3, 4, 5, 6], validate.BAD_ARITY),
+    ('RUN', 'abc', validate.BAD_ARITY),
+    ('RUN', [15000, '1', 75], validate.NOT_A_NUMBER),
+    ('RUN', [15000, True, 75], validate.NOT_A_NUMBER),
+    ('RUN', [15000, None, 75], validate.NOT_A_NUMBER),
+    ('RUN', [15000, 0, 75], validate.OUT_OF_RANGE),
+    ('WLK', [9000, 1, 75, 0], validate.OUT_OF_RANGE),
+    ('RUN', [-1, 1, 75], validate.OUT_OF_RANGE),
+    ('RUN', [15000, float('nan'), 75], validate.OUT_OF_RANGE),
+    ('SWM', [720, 1, float('inf')], validate.OUT_OF_RANGE),
+    ('RUN', [10 ** 400, 1, 75], validate.OUT_OF_RANGE),
+    ('WLK', [1e300, 1e-10, 75, 180], validate.OUT_OF_RANGE),
+    ('WLK', [9000, 1e-300, 75, 180], validate.OUT_OF_RANGE),
+])
+def test_rejects_with_reason_code(workout_type, data, code):
+    result = validate.check(workout_type, data)
+    assert result is not None and result[0] == code, (
+        f'Пакет {workout_type} {data} должен отклоняться с кодом {code}.'
+    )
+
+
+def test_split():
+    packages = [
+        (1, 'RUN', [15000, 1, 75]),
+        (2, 'RUN', [15000, 0, 75]),
+        (3, 'XXX', [1, 2, 3]),
+        (4, 'SWM', [720, 1, 80, 25, 40]),
+    ]
+    clean, rejects = validate.split(packages)
+    assert [key for key, _, _ in clean] == [1, 4]
+    assert [(reject.key, reject.code) for reject in rejects] == [
+        (2, validate.OUT_OF_RANGE), (3, validate.UNKNOWN_TYPE),
+    ]
+
+
+def test_cli_rejects_side_channel(tmp_path, capsys):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text(
+        '["RUN", [15000, 1, 75]]\n'
+        'not json\n'
+        '["WLK", [9000, 1, 75, 0]]\n',
+        encoding='utf-8',
+    )
+    rejects = tmp_path / 'rejects.jsonl'
+    assert pipeline.cli([str(source), '--rejects', str(rejects)]) == 1
+    captured = capsys.readouterr()
+    assert captured.out.startswith('Тип тренировки: Running')
+    assert captured.err == ''
+    records = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert [(record['line_no'], record['code']) for record in records] == [
+        (2, pipeline.PARSE_ERROR), (3, validate.OUT_OF_RANGE),
+    ]
+
+
+@pytest.mark.parametrize('cadence', [float('inf'), float('nan'), 10 ** 400],
+                         ids=['inf', 'nan', 'huge'])
+def test_non_finite_in_field_without_limits(cadence):
+    cycling = workouts.register(workouts.WorkoutDefinition(
+        'CYC', 'Cycling',
+        (('action', MISSING), ('duration', MISSING),
+         ('weight', MISSING), ('cadence', MISSING)),
+        (), calories='cadence * duration',
+    ))
+    try:
+        assert 'cadence' not in validate.LIMITS
+        assert validate.check('CYC', [1000, 1, 75, 90]) is None
+        result = validate.check('CYC', [1000, 1, 75, cadence])
+        assert result is not None and result[0] == validate.OUT_OF_RANGE, (
+            'inf и nan отклоняются и в полях без границ.'
+        )
+    finally:
+        workouts.unregister(cycling.definition.code)
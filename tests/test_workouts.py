@@ -0,0 +1,153 @@
+from dataclasses import MISSING
+from pathlib import Path
+
+import pytest
+
+import homework
+import pipeline
+import workouts
+
+EXAMPLES = Path(__file__).resolve().parent.parent / 'examples'
+BASE = (('action', MISSING), ('duration', MISSING), ('weight', MISSING))
+# Встроенные Running и SportsWalking, описанные декларативно.
+RUNNING = workouts.WorkoutDefinition(
+    'XRUN', 'XRunning', BASE, (('COEFF_RUN', 18), ('COEFF_RUN_2', 20)),
+    calories=('(COEFF_RUN * speed - COEFF_RUN_2) * weight / M_IN_KM'
+              ' * (duration * HOUR_IN_MIN)'),
+)
+WALKING = workouts.WorkoutDefinition(
+    'XWLK', 'XWalking', BASE + (('height', MISSING),),
+    (('COEFF_WALK', 0.035), ('COEFF_WALK_2', 0.029)),
+    calories=('(COEFF_WALK * weight + speed ** 2 // height * COEFF_WALK_2'
+              ' * weight) * (duration * HOUR_IN_MIN)'),
+)
+PACKAGES = [
+    ([15000, 1, 75], [9000, 1, 75, 180]),
+    ([1206, 0.33, 61], [12345, 2.25, 90.5, 171]),
+    ([0, 1.5, 80], [800, 0.1, 45, 150]),
+]
+
+
+@pytest.fixture
+def declared():
+    compiled = [workouts.register(RUNNING), workouts.register(WALKING)]
+    yield compiled
+    for item in compiled:
+        workouts.unregister(item.definition.code)
+
+
+@pytest.mark.parametrize('run, walk', PACKAGES)
+def test_scalar_matches_builtin(declared, run, walk):
+    for code, builtin, data in (('XRUN', 'RUN', run), ('XWLK', 'WLK', walk)):
+        expected = homework.read_package(builtin, data).get_metrics()
+        training = homework.read_package(code, data)
+        assert training.get_metrics() == expected, (
+            'Описанный декларативно вид должен считать так же, '
+            'как встроенный.'
+        )
+        assert training.get_spent_calories() == expected[2]
+
+
+def test_batch_matches_scalar(declared):
+    np = pytest.importorskip('numpy')
+    types, rows = [], []
+    for run, walk in PACKAGES:
+        for code, data in (('XRUN', run), ('RUN', run), ('XWLK', walk)):
+            types.append(code)
+            rows.append((data + [0, 0, 0])[:4] + [0, 0])
+    columns = [list(column) for column in zip(*rows)]
+    distance, speed, calories = homework.compute_batch(types, *columns)
+    for index, (code, row) in enumerate(zip(types, rows)):
+        arity = homework.WORKOUT_TYPES[code].max_arity
+        expected = homework.read_package(code, row[:arity]).get_metrics()
+        assert (distance[index], speed[index], calories[index]) == expected
+    assert isinstance(distance, np.ndarray)
+
+
+def test_batch_passes_custom_columns():
+    pytest.importorskip('numpy')
+    definition = workouts.WorkoutDefinition(
+        'XCAD', 'XCadence', BASE + (('cadence', MISSING),), (('K', 0.01),),
+        calories='K * cadence * weight * duration',
+    )
+    workouts.register(definition)
+    try:
+        types = ['XCAD', 'RUN', 'XCAD']
+        rows = [[3000, 0.5, 70, 0, 0, 0], [15000, 1, 75, 0, 0, 0],
+                [9000, 1.5, 82, 0, 0, 0]]
+        cadence = [85, 0, 92]
+        columns = [list(column) for column in zip(*rows)]
+        distance, speed, calories = homework.compute_batch(
+            types, *columns, cadence=cadence
+        )
+        for index, code in enumerate(types):
+            data = rows[index][:3]
+            if code == 'XCAD':
+                data.append(cadence[index])
+            expected = homework.read_package(code, data).get_metrics()
+            assert (distance[index], speed[index],
+                    calories[index]) == expected, (
+                'Собственное поле вида должно доходить до векторного ядра.'
+            )
+        with pytest.raises(KeyError):
+            homework.compute_batch(types, *columns)
+    finally:
+        workouts.unregister('XCAD')
+
+
+def test_batch_uses_defaults():
+    pytest.importorskip('numpy')
+    definition = workouts.WorkoutDefinition(
+        'XCYC', 'XCycling', BASE + (('cadence', 80),), (('K', 0.5),),
+        calories='K * cadence * weight',
+    )
+    compiled = workouts.compile_workout(definition)
+    _, _, calories = compiled.batch({
+        'action': [1000, 2000], 'duration': [1, 2], 'weight': [70, 80],
+    })
+    assert calories.tolist() == [2800.0, 3200.0]
+    assert compiled.training(1000, 1, 70).get_spent_calories() == 2800.0
+
+
+def test_register_file(capsys):
+    compiled = workouts.register_file(str(EXAMPLES / 'workouts.json'))
+    try:
+        assert [item.definition.code for item in compiled] == ['CYC', 'ROW']
+        info = homework.read_package('CYC', [6000, 1.5, 70]
+                                     ).show_training_info()
+        assert (info.training_type, info.distance) == ('Cycling', 33.0)
+        with pytest.raises(ValueError):
+            workouts.register(compiled[0].definition)
+    finally:
+        for item in compiled:
+            workouts.unregister(item.definition.code)
+
+
+def test_cli_workouts(tmp_path, capsys):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text('["ROW", [1500, 0.75, 80]]\n', encoding='utf-8')
+    try:
+        assert pipeline.cli([str(source), '--workouts',
+                             str(EXAMPLES / 'workouts.json')]) == 0
+    finally:
+        workouts.unregister('CYC')
+        workouts.unregister('ROW')
+    assert capsys.readouterr().out.startswith('Тип тренировки: Rowing;')
+
+
+@pytest.mark.parametrize('changes', [
+    {'calories': '__import__("os")'},
+    {'calories': 'weight.real'},
+    {'calories': 'unknown * weight'},
+    {'calories': 'weight *'},
+    {'speed': 'calories / duration'},
+    {'fields': (('duration', MISSING),) + BASE[:1] + BASE[2:]},
+    {'fields': BASE + (('a', 1), ('b', MISSING))},
+    {'fields': BASE + (('np', MISSING),)},
+    {'coefficients': (('k', 1.0),)},
+    {'coefficients': (('K', '1'),)},
+])
+def test_rejects_bad_definitions(changes):
+    raw = dict(RUNNING.__dict__, **changes)
+    with pytest.raises(ValueError):
+        workouts.compile_workout(workouts.WorkoutDefinition(**raw))
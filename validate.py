@@ -0,0 +1,138 @@
+"""Проверка пакетов от датчиков до расчёта, без исключений.
+
+Сейчас плохой пакет обнаруживается исключением при расчёте:
+KeyError от read_package, TypeError при неверном числе параметров,
+ZeroDivisionError при duration == 0 (или height == 0 у ходьбы).
+Бросать и ловить исключение на каждую запись дорого, когда неисправное
+устройство заваливает нас мусором. Здесь те же случаи отсеиваются
+обычными проверками: вид тренировки, число параметров, тип
+и допустимый диапазон каждого значения. Отказы уходят в отдельный
+канал (on_reject) с кодом причины, расчёт получает только чистые пакеты.
+
+Коды причин:
+    unknown_type  - вида тренировки нет в homework.WORKOUT_TYPES;
+    bad_arity     - число параметров не подходит конструктору;
+    not_a_number  - значение не int и не float (bool тоже не число);
+    out_of_range  - значение вне допустимого диапазона (LIMITS), inf
+                    или nan.
+"""
+import sys
+from dataclasses import dataclass, fields
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Sequence, Tuple)
+
+from homework import WORKOUT_TYPES, WorkoutType
+
+UNKNOWN_TYPE: str = 'unknown_type'
+BAD_ARITY: str = 'bad_arity'
+NOT_A_NUMBER: str = 'not_a_number'
+OUT_OF_RANGE: str = 'out_of_range'
+REASON_CODES: Tuple[str, ...] = (
+    UNKNOWN_TYPE, BAD_ARITY, NOT_A_NUMBER, OUT_OF_RANGE,
+)
+
+INF = float('inf')
+# Больше по модулю - не конечное число (или целое, которое float
+# не вместит).
+FLOAT_MAX = sys.float_info.max
+# Допустимый диапазон по имени поля: нижняя граница, допустима ли
+# она сама, и верхняя граница (включительно). Нули в duration
+# и height дают деление на ноль, отрицательных значений датчик выдать
+# не может. Верхние границы (и нижняя у duration) с запасом покрывают
+# реальные тренировки и держат расчёт в пределах float: без них
+# огромное целое не переводится во float, а огромная скорость
+# переполняется при возведении в квадрат.
+LIMITS: Dict[str, Tuple[float, bool, float]] = {
+    'action': (0, True, 1e9),
+    'duration': (1e-6, True, 1e4),
+    'weight': (0, False, 1e4),
+    'height': (1, True, 1e3),
+    'length_pool': (0, False, 1e4),
+    'count_pool': (0, True, 1e6),
+}
+_NO_LIMIT = (-INF, False, INF)
+_NUMBERS = (int, float)
+_SEQUENCES = (list, tuple)
+
+Package = Tuple[Any, str, Sequence[Any]]
+
+
+@dataclass
+class Reject:
+    """Отклонённый пакет: ключ (например, номер строки), данные и причина.
+    """
+    key: Any
+    workout_type: str
+    data: Sequence[Any]
+    code: str
+    reason: str
+
+
+RejectHandler = Callable[[Reject], None]
+
+# Проверки по видам: (мин. и макс. число параметров,
+#                     ((имя поля, низ, включительно, верх), ...)).
+Spec = Tuple[int, int, Tuple[Tuple[str, float, bool, float], ...]]
+# Код вида -> (запись реестра, по которой построена проверка, проверка).
+_specs: Dict[str, Tuple[WorkoutType, Spec]] = {}
+
+
+def _spec(workout: WorkoutType) -> Spec:
+    limits = tuple(
+        (field.name, *LIMITS.get(field.name, _NO_LIMIT))
+        for field in fields(workout.training) if field.init
+    )
+    spec = (workout.min_arity, len(limits), limits)
+    _specs[workout.code] = workout, spec
+    return spec
+
+
+def check(workout_type: str,
+          data: Sequence[Any]) -> Optional[Tuple[str, str]]:
+    """Проверить один пакет: None, если он чистый, иначе (код, причина)."""
+    workout = (WORKOUT_TYPES.get(workout_type) if type(workout_type) is str
+               else None)
+    if workout is None:
+        return UNKNOWN_TYPE, f'неизвестный тип тренировки {workout_type!r}'
+    cached = _specs.get(workout_type)
+    spec = cached[1] if cached and cached[0] is workout else _spec(workout)
+    min_arity, max_arity, limits = spec
+    if (type(data) not in _SEQUENCES
+            or not min_arity <= len(data) <= max_arity):
+        return BAD_ARITY, (
+            f'{workout_type}: ожидалось от {min_arity} до {max_arity} '
+            f'параметров, получено {data!r}'
+        )
+    for value, (name, low, inclusive, high) in zip(data, limits):
+        if type(value) not in _NUMBERS:
+            return NOT_A_NUMBER, f'{name} = {value!r} - не число'
+        # Для всех полей, в том числе без границ в LIMITS.
+        if value != value or not -FLOAT_MAX <= value <= FLOAT_MAX:
+            return OUT_OF_RANGE, f'{name} = {value!r} - не конечное число'
+        if not (low <= value <= high if inclusive else low < value <= high):
+            sign = '>=' if inclusive else '>'
+            return OUT_OF_RANGE, (
+                f'{name} = {value!r}, ожидалось {sign} {low} и <= {high:g}'
+            )
+    return None
+
+
+def validate(packages: Iterable[Package],
+             on_reject: RejectHandler) -> Iterator[Package]:
+    """Пропустить дальше чистые пакеты (ключ, вид, данные).
+
+    Остальные передаются в on_reject вместе с кодом причины.
+    """
+    for package in packages:
+        key, workout_type, data = package
+        problem = check(workout_type, data)
+        if problem is None:
+            yield package
+        else:
+            on_reject(Reject(key, workout_type, data, *problem))
+
+
+def split(packages: Iterable[Package]) -> Tuple[List[Package], List[Reject]]:
+    """Разделить пачку на чистые пакеты и отказы."""
+    rejects: List[Reject] = []
+    return list(validate(packages, rejects.append)), rejects
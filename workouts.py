@@ -0,0 +1,298 @@
+"""Виды тренировок, описанные декларативно, в файле конфигурации.
+
+Новый вид спорта не требует кода: достаточно описать в JSON его код,
+поля пакета, коэффициенты и формулы дистанции, скорости и калорий:
+
+    [{
+        "code": "CYC",
+        "name": "Cycling",
+        "fields": ["action", "duration", "weight",
+                   {"name": "cadence", "default": 80}],
+        "coefficients": {"LEN_STEP": 5.5, "COEFF_CYCLE": 0.004},
+        "calories": "COEFF_CYCLE * weight * speed * duration * HOUR_IN_MIN"
+    }]
+
+Формулы - арифметические выражения Python (+ - * / // ** и скобки)
+над полями, коэффициентами (имена заглавными) и константами Training
+(LEN_STEP, M_IN_KM, HOUR_IN_MIN). В скорости доступна distance,
+в калориях - distance и speed. По умолчанию, как у Training,
+distance = action * LEN_STEP / M_IN_KM и speed = distance / duration.
+
+Каждое описание компилируется один раз в два варианта одной и той же
+формулы: метод _compute_metrics для класса-наследника Training
+(его и регистрирует homework.register) и векторное ядро для
+homework.compute_batch. Порядок операций в них одинаковый, поэтому
+результаты совпадают бит в бит.
+"""
+import ast
+import hashlib
+import json
+import keyword
+from dataclasses import MISSING, dataclass, make_dataclass
+from typing import (Any, Callable, Dict, Iterable, List, Mapping, Tuple, Type,
+                    Union)
+
+import homework
+from homework import Training
+
+DEFAULT_DISTANCE: str = 'action * LEN_STEP / M_IN_KM'
+DEFAULT_SPEED: str = 'distance / duration'
+BASE_FIELDS: Tuple[str, ...] = ('action', 'duration', 'weight')
+# Имена, занятые в скомпилированных функциях.
+RESERVED: Tuple[str, ...] = ('self', 'np', 'distance', 'speed', 'calories',
+                             'shape', 'value')
+
+_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Pow,
+              ast.USub, ast.UAdd)
+_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Load,
+          ast.Constant) + _OPERATORS
+
+Field = Tuple[str, Any]
+Kernel = Callable[..., Tuple[Any, Any, Any]]
+
+
+@dataclass(frozen=True)
+class WorkoutDefinition:
+    """Описание вида тренировки из файла конфигурации."""
+    code: str
+    name: str
+    fields: Tuple[Field, ...]
+    coefficients: Tuple[Tuple[str, float], ...] = ()
+    distance: str = DEFAULT_DISTANCE
+    speed: str = DEFAULT_SPEED
+    calories: str = '0'
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> 'WorkoutDefinition':
+        fields = []
+        for spec in raw['fields']:
+            if isinstance(spec, str):
+                fields.append((spec, MISSING))
+            else:
+                fields.append((spec['name'], spec.get('default', MISSING)))
+        return cls(
+            raw['code'],
+            raw.get('name', raw['code']),
+            tuple(fields),
+            tuple(raw.get('coefficients', {}).items()),
+            raw.get('distance', DEFAULT_DISTANCE),
+            raw.get('speed', DEFAULT_SPEED),
+            raw['calories'],
+        )
+
+
+@dataclass(frozen=True)
+class CompiledWorkout:
+    """Скомпилированный вид: класс тренировки и векторное ядро."""
+    definition: WorkoutDefinition
+    training: Type[Training]
+    batch: Callable[[Mapping[str, Any]], Tuple[Any, Any, Any]]
+
+
+def _check_expression(source: str, allowed: Iterable[str],
+                      what: str) -> None:
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as error:
+        raise ValueError(f'{what}: синтаксическая ошибка в {source!r}') \
+            from error
+    allowed = set(allowed)
+    for node in ast.walk(tree):
+        if not isinstance(node, _NODES):
+            raise ValueError(
+                f'{what}: {type(node).__name__} в формуле {source!r} '
+                f'не поддерживается'
+            )
+        if isinstance(node, ast.Name) and node.id not in allowed:
+            raise ValueError(f'{what}: неизвестное имя {node.id!r} '
+                             f'в формуле {source!r}')
+        if (isinstance(node, ast.Constant)
+                and type(node.value) not in (int, float)):
+            raise ValueError(f'{what}: {node.value!r} - не число')
+
+
+def _check_name(name: Any, what: str) -> None:
+    if (not isinstance(name, str) or not name.isidentifier()
+            or keyword.iskeyword(name) or name in RESERVED):
+        raise ValueError(f'{what}: {name!r} нельзя использовать как имя')
+
+
+def _validate(definition: WorkoutDefinition) -> None:
+    code = definition.code
+    _check_name(definition.name, code)
+    names = [name for name, _ in definition.fields]
+    if tuple(names[:len(BASE_FIELDS)]) != BASE_FIELDS:
+        raise ValueError(f'{code}: поля должны начинаться с {BASE_FIELDS}')
+    if len(set(names)) != len(names):
+        raise ValueError(f'{code}: поля повторяются')
+    extra = definition.fields[len(BASE_FIELDS):]
+    for index, (name, default) in enumerate(extra):
+        _check_name(name, code)
+        if default is MISSING and any(
+                later is not MISSING for _, later in extra[:index]):
+            raise ValueError(f'{code}: поле {name!r} без значения '
+                             f'по умолчанию идёт после поля со значением')
+    constants = {'LEN_STEP', 'M_IN_KM', 'HOUR_IN_MIN'}
+    for name, value in definition.coefficients:
+        _check_name(name, code)
+        if not name.isupper():
+            raise ValueError(f'{code}: коэффициент {name!r} должен '
+                             f'называться заглавными буквами')
+        if type(value) not in (int, float):
+            raise ValueError(f'{code}: коэффициент {name!r} = {value!r} '
+                             f'должен быть числом')
+        constants.add(name)
+    if constants & set(names):
+        raise ValueError(f'{code}: коэффициент и поле называются одинаково')
+    scope = set(names) | constants
+    _check_expression(definition.distance, scope, definition.code)
+    _check_expression(definition.speed, scope | {'distance'},
+                      definition.code)
+    _check_expression(definition.calories, scope | {'distance', 'speed'},
+                      definition.code)
+
+
+def _constants(definition: WorkoutDefinition) -> Dict[str, Any]:
+    constants = {
+        'LEN_STEP': Training.LEN_STEP,
+        'M_IN_KM': Training.M_IN_KM,
+        'HOUR_IN_MIN': Training.HOUR_IN_MIN,
+    }
+    constants.update(definition.coefficients)
+    return constants
+
+
+def _body(definition: WorkoutDefinition) -> List[str]:
+    return [
+        f'    distance = {definition.distance}',
+        f'    speed = {definition.speed}',
+        f'    calories = {definition.calories}',
+    ]
+
+
+def _compile(source: str, name: str, namespace: Dict[str, Any],
+             definition: WorkoutDefinition) -> Callable:
+    code = compile(source, f'<workout {definition.code}>', 'exec')
+    exec(code, namespace)
+    return namespace[name]
+
+
+def _scalar_method(definition: WorkoutDefinition) -> Callable:
+    """_compute_metrics(self): формулы над полями объекта."""
+    lines = ['def _compute_metrics(self):']
+    lines += [f'    {name} = self.{name}' for name, _ in definition.fields]
+    lines += _body(definition)
+    lines.append('    return distance, speed, calories')
+    return _compile('\n'.join(lines), '_compute_metrics',
+                    _constants(definition), definition)
+
+
+def _batch_kernel(definition: WorkoutDefinition) -> Kernel:
+    """kernel(np, поле, ...): те же формулы над массивами NumPy."""
+    names = [name for name, _ in definition.fields]
+    lines = [f'def kernel(np, {", ".join(names)}):']
+    lines += _body(definition)
+    lines += [
+        '    shape = np.broadcast(action, duration, weight).shape',
+        '    return tuple(np.broadcast_to(np.asarray(value, np.float64), '
+        'shape).copy() for value in (distance, speed, calories))',
+    ]
+    return _compile('\n'.join(lines), 'kernel', _constants(definition),
+                    definition)
+
+
+def _metrics_methods(compute_metrics: Callable) -> Dict[str, Callable]:
+    def get_distance(self) -> float:
+        return self._compute_metrics()[0]
+
+    def get_mean_speed(self) -> float:
+        return self._compute_metrics()[1]
+
+    def get_spent_calories(self) -> float:
+        return self._compute_metrics()[2]
+
+    return {
+        '_compute_metrics': compute_metrics,
+        'get_metrics': compute_metrics,
+        'get_distance': get_distance,
+        'get_mean_speed': get_mean_speed,
+        'get_spent_calories': get_spent_calories,
+    }
+
+
+def compile_workout(definition: WorkoutDefinition) -> CompiledWorkout:
+    """Скомпилировать описание в класс тренировки и векторное ядро."""
+    _validate(definition)
+    namespace = _metrics_methods(_scalar_method(definition))
+    namespace.update(
+        (name, value) for name, value in definition.coefficients
+    )
+    namespace['__doc__'] = f'Тренировка: {definition.name} (из описания).'
+    namespace['__module__'] = __name__
+    new_fields: List[Union[Tuple[str, type], Tuple[str, type, Any]]] = [
+        (name, float) if default is MISSING else (name, float, default)
+        for name, default in definition.fields[len(BASE_FIELDS):]
+    ]
+    training = make_dataclass(definition.name, new_fields,
+                              bases=(Training,), namespace=namespace)
+    kernel = _batch_kernel(definition)
+    names = [name for name, _ in definition.fields]
+    defaults = dict(definition.fields)
+
+    def batch(columns: Mapping[str, Any]) -> Tuple[Any, Any, Any]:
+        """Посчитать (дистанцию, скорость, калории) по столбцам."""
+        import numpy as np
+
+        length = len(columns['action'])
+        arrays = []
+        for name in names:
+            if name in columns:
+                arrays.append(np.asarray(columns[name], dtype=np.float64))
+            elif defaults[name] is not MISSING:
+                arrays.append(np.full(length, defaults[name], np.float64))
+            else:
+                raise KeyError(f'{definition.code}: нет столбца {name!r}')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return kernel(np, *arrays)
+
+    return CompiledWorkout(definition, training, batch)
+
+
+def version(definition: WorkoutDefinition) -> str:
+    """Хэш описания: одинаковый в любом процессе, новый при любой правке.
+    """
+    fields = [[name] if default is MISSING else [name, default]
+              for name, default in definition.fields]
+    raw = json.dumps([definition.code, definition.name, fields,
+                      definition.coefficients, definition.distance,
+                      definition.speed, definition.calories])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def register(definition: WorkoutDefinition) -> CompiledWorkout:
+    """Скомпилировать описание и добавить вид в реестр homework."""
+    if definition.code in homework.WORKOUT_TYPES:
+        raise ValueError(f'вид тренировки {definition.code!r} уже есть')
+    compiled = compile_workout(definition)
+    homework.register(definition.code, compiled.training,
+                      version(definition))
+    homework.BATCH_KERNELS[definition.code] = compiled.batch
+    return compiled
+
+
+def unregister(code: str) -> None:
+    """Убрать вид, добавленный register, из реестра homework."""
+    homework.WORKOUT_TYPES.pop(code, None)
+    homework.BATCH_KERNELS.pop(code, None)
+
+
+def load(path: str) -> List[WorkoutDefinition]:
+    """Прочитать описания видов из JSON-файла (список объектов)."""
+    with open(path, encoding='utf-8') as stream:
+        raw = json.load(stream)
+    return [WorkoutDefinition.from_dict(item) for item in raw]
+
+
+def register_file(path: str) -> List[CompiledWorkout]:
+    """Прочитать файл описаний и зарегистрировать все виды из него."""
+    return [register(definition) for definition in load(path)]